@@ -0,0 +1,137 @@
+# ================================================================
+# 🔍 ANÁLISIS RÁPIDO DE PDF (¿VALE LA PENA COMPRIMIR?)
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Recorre los diccionarios de los streams del PDF (imágenes,
+#              contenidos, fuentes, object streams) sin decodificarlos ni
+#              renderizar páginas, y estima cuántos bytes podría ahorrar
+#              Ghostscript. Sirve para saltar los PDFs ya optimizados.
+# Licencia: MIT
+# ================================================================
+
+import mmap
+import os
+import re
+from dataclasses import dataclass
+
+# Máximo de bytes hacia atrás en los que se busca el diccionario de un stream
+VENTANA_DICCIONARIO = 8192
+
+PATRON_INICIO_STREAM = re.compile(rb">>\s*stream(?:\r\n|\n|\r)")
+PATRON_FILTRO = re.compile(rb"/Filter\s*(\[[^\]]*\]|/\w+)")
+PATRON_ANCHO = re.compile(rb"/Width\s+(\d+)")
+PATRON_ALTO = re.compile(rb"/Height\s+(\d+)")
+PATRON_BITS = re.compile(rb"/BitsPerComponent\s+(\d+)")
+PATRON_TIPO = re.compile(rb"/Type\s*/(\w+)")
+
+# Fracción del stream que se estima recuperar según su tipo
+AHORRO_IMAGEN_SIN_COMPRIMIR = 0.80
+AHORRO_IMAGEN_FLATE = 0.55
+AHORRO_JPEG_PESADO = 0.45
+AHORRO_JPEG_LIGERO = 0.08
+AHORRO_STREAM_SIN_COMPRIMIR = 0.60
+AHORRO_FUENTE = 0.15
+AHORRO_STREAM_COMPRIMIDO = 0.03
+
+# Bits por píxel a partir de los cuales un JPEG se considera "pesado"
+BPP_JPEG_PESADO = 1.5
+# Lado (en píxeles) a partir del cual los presets suelen reducir la imagen
+LADO_IMAGEN_GRANDE = 2000
+
+
+@dataclass
+class AnalisisPdf:
+    """Distribución de bytes del PDF y ahorro estimado"""
+    archivo: str
+    tamaño: int
+    streams: int = 0
+    imagenes: int = 0
+    bytes_imagenes: int = 0
+    bytes_streams: int = 0
+    bytes_sin_comprimir: int = 0
+    object_streams: bool = False
+    ahorro_estimado: int = 0
+
+    @property
+    def proporcion_ahorro(self):
+        return self.ahorro_estimado / self.tamaño if self.tamaño else 0.0
+
+
+def filtros_de(diccionario):
+    """Lista de filtros declarados en el diccionario del stream"""
+    coincidencia = PATRON_FILTRO.search(diccionario)
+    if not coincidencia:
+        return []
+    return re.findall(rb"/(\w+)", coincidencia.group(1))
+
+
+def entero(patron, diccionario, defecto=0):
+    coincidencia = patron.search(diccionario)
+    return int(coincidencia.group(1)) if coincidencia else defecto
+
+
+def ahorro_imagen(diccionario, longitud, filtros):
+    """Estimación de bytes recuperables en una imagen según filtro y bits por píxel"""
+    ancho = entero(PATRON_ANCHO, diccionario)
+    alto = entero(PATRON_ALTO, diccionario)
+    bits = entero(PATRON_BITS, diccionario, 8)
+    if bits == 1 or {b"CCITTFaxDecode", b"JBIG2Decode"} & set(filtros):
+        return 0  # imágenes monocromas: los presets apenas las reducen
+    if b"JPXDecode" in filtros:
+        return int(longitud * AHORRO_JPEG_LIGERO)
+    if b"DCTDecode" in filtros:
+        bpp = longitud * 8 / (ancho * alto) if ancho and alto else 0
+        grande = max(ancho, alto) > LADO_IMAGEN_GRANDE
+        pesado = bpp > BPP_JPEG_PESADO or grande
+        return int(longitud * (AHORRO_JPEG_PESADO if pesado else AHORRO_JPEG_LIGERO))
+    if filtros:
+        return int(longitud * AHORRO_IMAGEN_FLATE)
+    return int(longitud * AHORRO_IMAGEN_SIN_COMPRIMIR)
+
+
+def analizar_pdf(archivo):
+    """Estima el ahorro posible leyendo solo los diccionarios de los streams (sin renderizar)"""
+    analisis = AnalisisPdf(archivo=archivo, tamaño=os.path.getsize(archivo))
+    if not analisis.tamaño:
+        return analisis
+
+    with open(archivo, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+        posicion = 0
+        while True:
+            coincidencia = PATRON_INICIO_STREAM.search(datos, posicion)
+            if not coincidencia:
+                break
+            inicio_datos = coincidencia.end()
+            fin_datos = datos.find(b"endstream", inicio_datos)
+            if fin_datos < 0:
+                break
+            inicio_objeto = datos.rfind(b" obj", max(0, coincidencia.start() - VENTANA_DICCIONARIO),
+                                        coincidencia.start())
+            diccionario = datos[inicio_objeto if inicio_objeto >= 0 else coincidencia.start():coincidencia.start()]
+            longitud = fin_datos - inicio_datos
+            filtros = filtros_de(diccionario)
+            tipo = PATRON_TIPO.search(diccionario)
+            tipo = tipo.group(1) if tipo else b""
+
+            analisis.streams += 1
+            analisis.bytes_streams += longitud
+            if not filtros:
+                analisis.bytes_sin_comprimir += longitud
+
+            if re.search(rb"/Subtype\s*/Image\b", diccionario):
+                analisis.imagenes += 1
+                analisis.bytes_imagenes += longitud
+                analisis.ahorro_estimado += ahorro_imagen(diccionario, longitud, filtros)
+            elif tipo in (b"ObjStm", b"XRef"):
+                analisis.object_streams = True
+            elif re.search(rb"/Length[123]\b|/Subtype\s*/(Type1C|CIDFontType0C|OpenType)", diccionario):
+                analisis.ahorro_estimado += int(longitud * AHORRO_FUENTE)
+            elif not filtros:
+                analisis.ahorro_estimado += int(longitud * AHORRO_STREAM_SIN_COMPRIMIR)
+            else:
+                analisis.ahorro_estimado += int(longitud * AHORRO_STREAM_COMPRIMIDO)
+
+            posicion = fin_datos + len(b"endstream")
+
+    return analisis
@@ -0,0 +1,154 @@
+# ================================================================
+# 🗃 CACHÉ DE RESULTADOS DEL COMPRESOR PDF
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Guarda en disco los PDFs ya comprimidos, identificados por
+#              el hash del contenido + preset + versión de Ghostscript, para
+#              devolverlos al instante si el mismo archivo vuelve a llegar.
+#              Tamaño acotado con desalojo LRU (el menos usado se borra).
+# Licencia: MIT
+# ================================================================
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# ==== Configuración por defecto ====
+CARPETA_CACHE = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "compresor-pdf"
+)
+TAMAÑO_MAXIMO_MB = 2048
+TAMAÑO_BLOQUE = 1024 * 1024
+
+
+def hash_archivo(ruta):
+    """Calcula el SHA-256 del contenido leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMAÑO_BLOQUE), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def enlazar_o_copiar(origen, destino):
+    """Crea un enlace duro (instantáneo) y si no es posible copia el archivo"""
+    temporal = f"{destino}.tmp-{threading.get_ident()}"
+    try:
+        os.link(origen, temporal)
+    except OSError:
+        shutil.copyfile(origen, temporal)
+    os.replace(temporal, destino)
+
+
+class CacheCompresion:
+    """Caché en disco de PDFs comprimidos con límite de tamaño y desalojo LRU"""
+
+    def __init__(self, carpeta=CARPETA_CACHE, tamaño_maximo_mb=TAMAÑO_MAXIMO_MB):
+        self.carpeta = carpeta
+        self.tamaño_maximo = int(tamaño_maximo_mb * 1024 * 1024)
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojados = 0
+        self.bytes_servidos = 0
+        self._candado = threading.Lock()
+        os.makedirs(self.carpeta, exist_ok=True)
+        self._tamaño_actual = sum(os.path.getsize(ruta) for ruta in self._entradas())
+
+    def _entradas(self):
+        return [entrada.path for entrada in os.scandir(self.carpeta)
+                if entrada.is_file() and entrada.name.endswith(".pdf")]
+
+    def _ruta(self, clave):
+        return os.path.join(self.carpeta, f"{clave}.pdf")
+
+    def clave(self, archivo, *variante):
+        """Clave de la entrada: hash del contenido + preset, versión de gs y demás opciones"""
+        digest = hashlib.sha256(hash_archivo(archivo).encode())
+        for parte in variante:
+            digest.update(b"\0" + str(parte).encode())
+        return digest.hexdigest()
+
+    def obtener(self, clave, destino):
+        """Copia/enlaza la entrada en `destino` y retorna True si existía"""
+        ruta = self._ruta(clave)
+        try:
+            enlazar_o_copiar(ruta, destino)
+            os.utime(ruta)  # marca la entrada como usada recientemente (LRU por fecha de modificación)
+        except FileNotFoundError:
+            with self._candado:
+                self.fallos += 1
+            return False
+        with self._candado:
+            self.aciertos += 1
+            self.bytes_servidos += os.path.getsize(destino)
+        return True
+
+    def guardar(self, clave, archivo_salida):
+        """Registra un PDF recién comprimido y desaloja entradas antiguas si se supera el límite"""
+        tamaño = os.path.getsize(archivo_salida)
+        if tamaño > self.tamaño_maximo:
+            return
+        ruta = self._ruta(clave)
+        existia = os.path.exists(ruta)
+        enlazar_o_copiar(archivo_salida, ruta)
+        with self._candado:
+            if not existia:
+                self._tamaño_actual += tamaño
+            if self._tamaño_actual > self.tamaño_maximo:
+                self._desalojar()
+
+    def _desalojar(self):
+        """Borra las entradas usadas hace más tiempo hasta volver al 90 % del límite"""
+        entradas = []
+        for ruta in self._entradas():
+            try:
+                info = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, ruta))
+        entradas.sort()
+        self._tamaño_actual = sum(tamaño for _, tamaño, _ in entradas)
+        objetivo = self.tamaño_maximo * 0.9
+        for _, tamaño, ruta in entradas:
+            if self._tamaño_actual <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            self._tamaño_actual -= tamaño
+            self.desalojados += 1
+
+    def estadisticas(self):
+        """Contadores de aciertos/fallos y ocupación actual de la caché"""
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "desalojados": self.desalojados,
+            "bytes_servidos": self.bytes_servidos,
+            "bytes_en_cache": self._tamaño_actual,
+            "bytes_maximo": self.tamaño_maximo,
+        }
+
+    def guardar_estadisticas(self):
+        """Acumula los contadores de esta ejecución en estadisticas.json dentro de la caché"""
+        ruta = os.path.join(self.carpeta, "estadisticas.json")
+        acumulado = {"aciertos": 0, "fallos": 0, "desalojados": 0, "bytes_servidos": 0}
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                acumulado.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        for campo in ("aciertos", "fallos", "desalojados", "bytes_servidos"):
+            acumulado[campo] += getattr(self, campo)
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(acumulado, f, indent=2)
+        os.replace(temporal, ruta)
+        return acumulado
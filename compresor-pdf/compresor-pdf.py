@@ -1,5 +1,4 @@
 import os
-import subprocess
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
@@ -7,6 +6,9 @@ import platform
 import sys
 import webbrowser
 
+from motor_pdf import (OUTPUT_DIR, CALIDADES, NOTAS_ACCION, comprimir_pdf, comprimir_pdf_fragmentado,
+                       comprimir_lote, es_lote, listar_pdfs)
+
 # ================================================================
 # 📄 COMPRESOR DE PDF - APLICACIÓN DE ESCRITORIO
 # ------------------------------------------------
@@ -15,6 +17,7 @@ import webbrowser
 # 💻 GitHub: https://github.com/miguelramosalarcon
 # 🏷 Marca personal: MRStudio (https://mrstudio.dev)
 # Descripción: Compresor de archivos PDF offline, rápido y portable
+#              (la lógica de compresión vive en motor_pdf.py)
 # Versión: 1.0.0 - Noviembre 2025
 # Licencia: MIT
 # ================================================================
@@ -25,11 +28,6 @@ def ruta_recurso(relative_path):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath("."), relative_path)
 
-# ==== Carpeta de salida ====
-OUTPUT_DIR = "pdfs-comprimidos"
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-
 def centrar_ventana(ventana, ancho, alto):
     pantalla_ancho = ventana.winfo_screenwidth()
     pantalla_alto = ventana.winfo_screenheight()
@@ -37,55 +35,65 @@ def centrar_ventana(ventana, ancho, alto):
     y = int((pantalla_alto / 2) - (alto / 2))
     ventana.geometry(f"{ancho}x{alto}+{x}+{y}")
 
-def obtener_gs_path():
-    """Intenta localizar Ghostscript automáticamente"""
-    posibles_rutas = [
-        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gswin64c.exe'),
-        r"C:\Program Files\gs\gs10.06.0\bin\gswin64c.exe",
-        r"C:\Program Files\gs\gs10.03.1\bin\gswin64c.exe",
-        "gswin64c.exe",
-        "gs"
-    ]
-    for ruta in posibles_rutas:
-        if os.path.exists(ruta):
-            return ruta
-    return None
-
-
-def comprimir_pdf(archivo, calidad, ventana_modal):
+def formatear_segundos(segundos):
+    minutos, segundos = divmod(int(segundos), 60)
+    return f"{minutos}:{segundos:02d}"
+
+def hilo_comprimir_pdf(archivo, calidad, fragmentar, ventana_modal, barra, label_progreso):
     try:
-        ruta_gs = obtener_gs_path()
-        if not ruta_gs:
-            raise FileNotFoundError("Ghostscript no encontrado. Instálalo desde https://ghostscript.com/releases/gsdnld.html")
+        def al_progresar(evento):
+            texto = (f"Página {evento.pagina}/{evento.total_paginas or '?'} · "
+                     f"{evento.paginas_por_segundo:.1f} pág/s · "
+                     f"Restante: {formatear_segundos(evento.eta_segundos)}")
+            ventana.after(0, lambda: actualizar_progreso(barra, label_progreso, evento, texto))
 
-        archivo_salida = os.path.join(
-            OUTPUT_DIR,
-            os.path.basename(archivo).replace(".pdf", f"_comprimido_{calidad.lower().split()[0]}.pdf")
+        if fragmentar:
+            resultado = comprimir_pdf_fragmentado(archivo, calidad, al_progresar=al_progresar)
+        else:
+            resultado = comprimir_pdf(archivo, calidad, al_progresar=al_progresar)
+
+        ventana_modal.destroy()
+        label_estado.config(
+            text=(f"✅ PDF comprimido correctamente.\n"
+                  f"🗂 Tamaño: {resultado.tamaño_original / (1024 * 1024):.1f} MB → "
+                  f"{resultado.tamaño_final / (1024 * 1024):.1f} MB{NOTAS_ACCION.get(resultado.accion, '')}\n"
+                  f"📂 Guardado en: {OUTPUT_DIR}"),
+            fg="#F5B83A", font=("Segoe UI", 10, "bold")
         )
+        if platform.system() == "Windows":
+            os.startfile(os.path.abspath(OUTPUT_DIR))
+
+    except Exception as e:
+        ventana_modal.destroy()
+        messagebox.showerror("Error", f"Ocurrió un problema:\n{e}")
+    finally:
+        btn_comprimir.config(state=tk.NORMAL)
+
+def actualizar_progreso(barra, label_progreso, evento, texto):
+    if evento.total_paginas:
+        if str(barra.cget("mode")) != "determinate":
+            barra.stop()
+            barra.config(mode="determinate", maximum=evento.total_paginas)
+        barra.config(value=evento.pagina)
+    label_progreso.config(text=texto)
+
+def hilo_comprimir_lote(archivos, calidad, ventana_modal, barra, label_progreso):
+    try:
+        def al_terminar_archivo(archivo, estado, detalle, resumen):
+            procesados = resumen["correctos"] + resumen["errores"]
+            icono = "✅" if estado == "ok" else "❌"
+            texto = f"{procesados}/{resumen['archivos']}  {icono} {os.path.basename(archivo)}"
+            ventana.after(0, lambda: (barra.config(value=procesados), label_progreso.config(text=texto)))
 
-        configuracion = {
-            "Alta calidad (mayor peso)": "/prepress",
-            "Media calidad": "/ebook",
-            "Alta compresión (menor peso)": "/screen"
-        }.get(calidad, "/ebook")
-
-        comando = [
-            ruta_gs,
-            "-sDEVICE=pdfwrite",
-            "-dCompatibilityLevel=1.4",
-            f"-dPDFSETTINGS={configuracion}",
-            "-dNOPAUSE",
-            "-dQUIET",
-            "-dBATCH",
-            f"-sOutputFile={archivo_salida}",
-            archivo
-        ]
-
-        subprocess.run(comando, check=True)
+        resumen = comprimir_lote(archivos, calidad, al_terminar_archivo=al_terminar_archivo)
 
         ventana_modal.destroy()
         label_estado.config(
-            text=f"✅ PDF comprimido correctamente.\n📂 Guardado en: {OUTPUT_DIR}",
+            text=(f"✅ Lote terminado: {resumen['correctos']} de {resumen['archivos']} PDFs "
+                  f"({resumen['errores']} con error)\n"
+                  f"⚡ {resumen['archivos_por_segundo']:.2f} archivos/s · "
+                  f"💾 Ahorro: {resumen['bytes_ahorrados'] / (1024 * 1024):.1f} MB\n"
+                  f"📂 Guardado en: {OUTPUT_DIR}"),
             fg="#F5B83A", font=("Segoe UI", 10, "bold")
         )
         if platform.system() == "Windows":
@@ -99,6 +107,9 @@ def comprimir_pdf(archivo, calidad, ventana_modal):
 
 def iniciar_compresion():
     archivo = entry_archivo.get()
+    if archivo and es_lote(archivo):
+        iniciar_compresion_lote(archivo)
+        return
     if not archivo or not os.path.exists(archivo):
         messagebox.showerror("Error", "Seleccione un archivo PDF válido.")
         return
@@ -107,20 +118,52 @@ def iniciar_compresion():
 
     modal = tk.Toplevel(ventana)
     modal.title("Comprimiendo PDF...")
-    modal.geometry("360x100")
     modal.configure(bg="#003DA6")
     modal.resizable(False, False)
-    centrar_ventana(modal, 360, 100)
+    centrar_ventana(modal, 360, 130)
     tk.Label(modal, text="🔄 Comprimiendo, por favor espere...",
              font=("Segoe UI", 10), fg="white", bg="#003DA6").pack(pady=10)
+    # Indeterminada mientras se cuentan las páginas; pasa a determinada con el primer evento
     barra = ttk.Progressbar(modal, mode="indeterminate", length=300)
     barra.pack(pady=5)
     barra.start(10)
+    label_progreso = tk.Label(modal, text="Contando páginas...", font=("Segoe UI", 9),
+                              fg="#F5B83A", bg="#003DA6")
+    label_progreso.pack()
+
+    btn_comprimir.config(state=tk.DISABLED)
+    label_estado.config(text="")
+
+    threading.Thread(target=hilo_comprimir_pdf,
+                     args=(archivo, calidad, var_fragmentar.get(), modal, barra, label_progreso),
+                     daemon=True).start()
+
+def iniciar_compresion_lote(origen):
+    archivos = listar_pdfs(origen)
+    if not archivos:
+        messagebox.showerror("Error", "No se encontraron archivos PDF en la carpeta o patrón indicado.")
+        return
+
+    calidad = combo_calidad.get()
+
+    modal = tk.Toplevel(ventana)
+    modal.title("Comprimiendo lote de PDFs...")
+    modal.configure(bg="#003DA6")
+    modal.resizable(False, False)
+    centrar_ventana(modal, 360, 130)
+    tk.Label(modal, text=f"🔄 Comprimiendo {len(archivos)} PDFs con {os.cpu_count() or 1} procesos...",
+             font=("Segoe UI", 10), fg="white", bg="#003DA6").pack(pady=10)
+    barra = ttk.Progressbar(modal, mode="determinate", length=300, maximum=len(archivos))
+    barra.pack(pady=5)
+    label_progreso = tk.Label(modal, text=f"0/{len(archivos)}", font=("Segoe UI", 9),
+                              fg="#F5B83A", bg="#003DA6")
+    label_progreso.pack()
 
     btn_comprimir.config(state=tk.DISABLED)
     label_estado.config(text="")
 
-    threading.Thread(target=comprimir_pdf, args=(archivo, calidad, modal), daemon=True).start()
+    threading.Thread(target=hilo_comprimir_lote,
+                     args=(archivos, calidad, modal, barra, label_progreso), daemon=True).start()
 
 def seleccionar_pdf():
     archivo = filedialog.askopenfilename(filetypes=[("Archivos PDF", "*.pdf")])
@@ -128,11 +171,17 @@ def seleccionar_pdf():
         entry_archivo.delete(0, tk.END)
         entry_archivo.insert(0, archivo)
 
+def seleccionar_carpeta():
+    carpeta = filedialog.askdirectory()
+    if carpeta:
+        entry_archivo.delete(0, tk.END)
+        entry_archivo.insert(0, carpeta)
+
 # ==== Interfaz principal ====
 ventana = tk.Tk()
 ventana.title("Compresor de PDF - Miguel Ramos A. (MRStudio)")
 ventana.configure(bg="#003DA6")
-centrar_ventana(ventana, 650, 380)
+centrar_ventana(ventana, 650, 450)
 ventana.resizable(False, False)
 
 fuente = ("Segoe UI", 11)
@@ -146,26 +195,28 @@ frame_input.pack()
 entry_archivo = tk.Entry(frame_input, width=50, font=fuente, bd=2, relief="solid")
 entry_archivo.pack(side=tk.LEFT, padx=(0, 5))
 tk.Button(frame_input, text="Buscar", command=seleccionar_pdf, bg="white", cursor="hand2").pack(side=tk.LEFT)
+tk.Button(frame_input, text="Carpeta", command=seleccionar_carpeta, bg="white", cursor="hand2").pack(side=tk.LEFT, padx=(5, 0))
 
 tk.Label(ventana, text="📉 Seleccione el nivel de compresión:",
          font=fuente, bg="#003DA6", fg="white").pack(pady=(15, 5))
 
 combo_calidad = ttk.Combobox(
     ventana,
-    values=[
-        "Alta calidad (mayor peso)",
-        "Media calidad",
-        "Alta compresión (menor peso)"
-    ],
+    values=list(CALIDADES),
     state="readonly",
     font=fuente
 )
 combo_calidad.set("Media calidad")
 combo_calidad.pack()
 
-tk.Label(ventana, text="🛈 A menor calidad, menor peso del archivo.",
+tk.Label(ventana, text="🛈 A menor calidad, menor peso del archivo. También acepta carpetas o patrones (*.pdf).",
          font=("Segoe UI", 9), fg="white", bg="#003DA6").pack(pady=(5, 10))
 
+var_fragmentar = tk.BooleanVar(value=False)
+tk.Checkbutton(ventana, text="⚡ PDF muy grande: repartir sus páginas entre todos los núcleos",
+               variable=var_fragmentar, font=("Segoe UI", 9), fg="white", bg="#003DA6",
+               selectcolor="#003DA6", activebackground="#003DA6", activeforeground="white").pack(pady=(0, 10))
+
 btn_comprimir = tk.Button(ventana, text="🔽 Comprimir PDF",
                           font=fuente_boton, bg="#4A90E2", fg="white",
                           activebackground="#3c78c9", relief="flat",
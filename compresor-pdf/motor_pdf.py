@@ -0,0 +1,873 @@
+# ================================================================
+# ⚙️ MOTOR DE COMPRESIÓN PDF (SIN INTERFAZ GRÁFICA)
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Lógica de compresión con Ghostscript reutilizable desde
+#              la app de escritorio, scripts o servidores sin pantalla.
+#
+# Uso desde consola (dentro de la carpeta compresor-pdf):
+#   python -m motor_pdf documento.pdf
+#   python -m motor_pdf escaneos/ --calidad screen --workers 8
+#   python -m motor_pdf "facturas/**/*.pdf" --json
+#   python -m motor_pdf escaneo-900-paginas.pdf --progreso --timeout-pagina 60
+#   python -m motor_pdf escaneo-2gb.pdf --fragmentar --workers 16
+#   python -m motor_pdf bandeja/ --cache --cache-max-mb 4096
+#   python -m motor_pdf facturas/ --perfil escaneos --perfiles perfiles-pdf.json
+#   python -m motor_pdf muestras/ --comparar-perfiles ebook screen escaneos
+#   python -m motor_pdf bandeja/ --min-ahorro 5
+#   python -m motor_pdf documento.pdf --analizar
+#   python -m motor_pdf miles-de-facturas/ --persistente
+#   python -m motor_pdf muestras/ --comparar-latencia
+#   cat entrada.pdf | python -m motor_pdf - > salida.pdf
+#
+# Licencia: MIT
+# ================================================================
+
+import argparse
+import glob
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+
+from analisis_pdf import analizar_pdf
+from cache_pdf import CARPETA_CACHE, TAMAÑO_MAXIMO_MB, CacheCompresion
+from perfiles_pdf import PERFILES_BASE, PerfilGs, cargar_perfiles
+from servidor_gs import PoolServidoresGs, cadena_postscript
+
+# ==== Configuración general ====
+OUTPUT_DIR = "pdfs-comprimidos"
+URL_GHOSTSCRIPT = "https://ghostscript.com/releases/gsdnld.html"
+
+CALIDADES = {
+    "Alta calidad (mayor peso)": "/prepress",
+    "Media calidad": "/ebook",
+    "Alta compresión (menor peso)": "/screen"
+}
+CALIDAD_POR_DEFECTO = "Media calidad"
+
+# Tamaño de los bloques leídos/escritos en el modo flujo (stdin → gs → stdout)
+TAMAÑO_BLOQUE = 64 * 1024
+
+# Acciones posibles de ResultadoCompresion.accion
+ACCION_COMPRIMIDO = "comprimido"
+ACCION_CACHE = "cache"
+ACCION_SIN_AHORRO = "sin_ahorro"          # el análisis previo estimó poca ganancia: se copió el original
+ACCION_ORIGINAL_MENOR = "original_menor"  # gs generó un archivo más grande: se conservó el original
+
+NOTAS_ACCION = {
+    ACCION_CACHE: " (caché)",
+    ACCION_SIN_AHORRO: " (sin ahorro estimado: copiado)",
+    ACCION_ORIGINAL_MENOR: " (se conservó el original, era más liviano)",
+}
+
+# Alias cortos para la consola (nombre del preset de Ghostscript)
+CALIDADES_CLI = {preset.strip("/"): etiqueta for etiqueta, preset in CALIDADES.items()}
+
+
+@dataclass
+class ResultadoCompresion:
+    """Resultado de comprimir un PDF"""
+    archivo: str
+    archivo_salida: str
+    tamaño_original: int
+    tamaño_final: int
+    segundos: float
+    desde_cache: bool = False
+    accion: str = ACCION_COMPRIMIDO
+
+    @property
+    def bytes_ahorrados(self):
+        return self.tamaño_original - self.tamaño_final
+
+
+@dataclass
+class EventoProgreso:
+    """Avance de Ghostscript: página actual, ritmo y tiempo restante estimado"""
+    archivo: str
+    pagina: int
+    total_paginas: int
+    segundos: float
+    paginas_por_segundo: float
+    eta_segundos: float
+
+    @property
+    def porcentaje(self):
+        return 100.0 * self.pagina / self.total_paginas if self.total_paginas else 0.0
+
+
+@lru_cache(maxsize=None)
+def obtener_gs_path():
+    """Intenta localizar Ghostscript automáticamente (el resultado se reutiliza en cada llamada)"""
+    posibles_rutas = [
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gswin64c.exe'),
+        r"C:\Program Files\gs\gs10.06.0\bin\gswin64c.exe",
+        r"C:\Program Files\gs\gs10.03.1\bin\gswin64c.exe",
+        "gswin64c.exe",
+        "gs"
+    ]
+    for ruta in posibles_rutas:
+        if os.path.exists(ruta):
+            return ruta
+        # Los nombres sin carpeta se buscan también en el PATH
+        if not os.path.dirname(ruta) and shutil.which(ruta):
+            return shutil.which(ruta)
+    return None
+
+
+def requerir_gs_path():
+    """Retorna la ruta de Ghostscript o lanza FileNotFoundError"""
+    ruta_gs = obtener_gs_path()
+    if not ruta_gs:
+        raise FileNotFoundError(f"Ghostscript no encontrado. Instálalo desde {URL_GHOSTSCRIPT}")
+    return ruta_gs
+
+
+@lru_cache(maxsize=None)
+def version_gs(ruta_gs):
+    """Versión de Ghostscript (forma parte de la clave de la caché)"""
+    try:
+        return subprocess.run([ruta_gs, "--version"], capture_output=True, text=True, timeout=30,
+                              creationflags=flags_creacion()).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return "desconocida"
+
+
+def nombre_salida(archivo, calidad, carpeta_salida=OUTPUT_DIR):
+    """Genera la ruta del PDF comprimido dentro de la carpeta de salida"""
+    nombre_base = os.path.splitext(os.path.basename(archivo))[0]
+    return os.path.join(carpeta_salida, f"{nombre_base}_comprimido_{calidad.lower().split()[0]}.pdf")
+
+
+def preparar_salida(archivo_salida):
+    """Crea la carpeta de salida y borra un resultado previo
+
+    Borrar en lugar de sobrescribir evita modificar una entrada de la caché
+    que comparta el archivo mediante un enlace duro.
+    """
+    os.makedirs(os.path.dirname(archivo_salida) or ".", exist_ok=True)
+    if os.path.lexists(archivo_salida):
+        os.remove(archivo_salida)
+
+
+def flags_creacion():
+    """Evita que se abra una consola por cada proceso en Windows"""
+    return subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+
+
+def contar_paginas(archivo, ruta_gs=None):
+    """Retorna el número de páginas de un PDF (0 si no se puede determinar)"""
+    ruta_gs = ruta_gs or requerir_gs_path()
+    ruta = os.path.abspath(archivo).replace("\\", "/")
+    # El PDF no es de confianza: se mantiene -dSAFER y solo se permite leer ese archivo
+    comando = [
+        ruta_gs, "-q", "-dNODISPLAY", "-dSAFER", f"--permit-file-read={ruta}", "-dNOPAUSE", "-dBATCH",
+        "-c", f"{cadena_postscript(ruta)} (r) file runpdfbegin pdfpagecount = quit"
+    ]
+    try:
+        salida = subprocess.run(comando, capture_output=True, text=True, timeout=60,
+                                creationflags=flags_creacion()).stdout
+        return int(salida.strip().splitlines()[-1])
+    except (subprocess.SubprocessError, ValueError, IndexError):
+        return contar_paginas_sin_gs(archivo)
+
+
+def contar_paginas_sin_gs(archivo):
+    """Estimación de respaldo: el mayor /Count de los nodos /Pages sin comprimir"""
+    with open(archivo, "rb") as f:
+        contenido = f.read()
+    conteos = [int(n) for n in re.findall(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)", contenido)]
+    conteos += [int(n) for n in re.findall(rb"/Count\s+(\d+)[^>]*?/Type\s*/Pages\b", contenido)]
+    return max(conteos, default=0)
+
+
+PATRON_PAGINA = re.compile(r"^Page (\d+)")
+
+
+def ejecutar_gs(comando, archivo, total_paginas=0, al_progresar=None, timeout_pagina=None):
+    """Ejecuta Ghostscript leyendo su salida línea a línea y emitiendo EventoProgreso por página"""
+    proceso = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               stdin=subprocess.DEVNULL, text=True, errors="replace",
+                               creationflags=flags_creacion())
+    ultimas_lineas = deque(maxlen=40)
+    inicio = time.perf_counter()
+    ultimo_avance = [inicio]
+    colgado = threading.Event()
+    terminado = threading.Event()
+
+    def vigilar():
+        # Si gs no reporta una página nueva en timeout_pagina segundos se considera colgado
+        while not terminado.wait(1):
+            if time.perf_counter() - ultimo_avance[0] > timeout_pagina:
+                colgado.set()
+                proceso.kill()
+                return
+
+    if timeout_pagina:
+        threading.Thread(target=vigilar, daemon=True).start()
+
+    try:
+        for linea in proceso.stdout:
+            ultimas_lineas.append(linea.rstrip())
+            coincidencia = PATRON_PAGINA.match(linea)
+            if not coincidencia:
+                continue
+            ahora = time.perf_counter()
+            ultimo_avance[0] = ahora
+            if al_progresar:
+                pagina = int(coincidencia.group(1))
+                segundos = ahora - inicio
+                ritmo = pagina / segundos if segundos else 0.0
+                restantes = max(total_paginas - pagina, 0)
+                al_progresar(EventoProgreso(archivo, pagina, total_paginas, segundos, ritmo,
+                                            restantes / ritmo if ritmo else 0.0))
+        codigo = proceso.wait()
+    finally:
+        terminado.set()
+        if proceso.poll() is None:
+            proceso.kill()
+            proceso.wait()
+
+    if colgado.is_set():
+        raise TimeoutError(f"Ghostscript no avanzó en {timeout_pagina} s: {archivo}")
+    if codigo != 0:
+        raise subprocess.CalledProcessError(codigo, comando, output="\n".join(ultimas_lineas))
+
+
+def perfil_de_calidad(calidad):
+    """Perfil incluido equivalente a una de las etiquetas de calidad de la interfaz"""
+    return PERFILES_BASE[CALIDADES.get(calidad, "/ebook").strip("/")]
+
+
+def comando_pdfwrite(ruta_gs, perfil, archivo_salida, entradas, opciones=(), silencioso=True):
+    """Arma la línea de comandos de Ghostscript para el dispositivo pdfwrite
+
+    Con archivo_salida=None y sin entradas se obtiene el comando base de un servidor persistente.
+    """
+    comando = [
+        ruta_gs,
+        "-sDEVICE=pdfwrite",
+        f"-dCompatibilityLevel={perfil.compatibilidad}",
+        f"-dPDFSETTINGS={perfil.preset}",
+        "-dNOPAUSE",
+        "-dBATCH",
+        *perfil.argumentos(),
+        *opciones,
+        *([f"-sOutputFile={archivo_salida}"] if archivo_salida else []),
+        *entradas
+    ]
+    if silencioso:
+        comando.insert(comando.index("-dBATCH"), "-dQUIET")
+    if archivo_salida == "-":
+        # El PDF sale por stdout: cualquier print de PostScript o aviso de gs va a stderr, no al PDF
+        comando.insert(comando.index("-dBATCH"), "-sstdout=%stderr")
+    return comando
+
+
+def resultado_desde_cache(cache, clave, archivo, archivo_salida):
+    """Retorna un ResultadoCompresion si la caché ya tiene el PDF comprimido, o None"""
+    inicio = time.perf_counter()
+    if not cache.obtener(clave, archivo_salida):
+        return None
+    return ResultadoCompresion(
+        archivo=archivo,
+        archivo_salida=archivo_salida,
+        tamaño_original=os.path.getsize(archivo),
+        tamaño_final=os.path.getsize(archivo_salida),
+        segundos=time.perf_counter() - inicio,
+        desde_cache=True,
+        accion=ACCION_CACHE
+    )
+
+
+def resultado_sin_ahorro(archivo, archivo_salida, min_ahorro):
+    """Copia el original si el análisis estima un ahorro menor a min_ahorro; retorna None si conviene comprimir"""
+    inicio = time.perf_counter()
+    if analizar_pdf(archivo).proporcion_ahorro >= min_ahorro:
+        return None
+    shutil.copyfile(archivo, archivo_salida)
+    tamaño = os.path.getsize(archivo)
+    return ResultadoCompresion(archivo, archivo_salida, tamaño, tamaño, time.perf_counter() - inicio,
+                               accion=ACCION_SIN_AHORRO)
+
+
+def cerrar_resultado(archivo, archivo_salida, inicio, cache=None, clave=None):
+    """Conserva el original si gs no redujo el tamaño, guarda en caché y arma el ResultadoCompresion"""
+    accion = ACCION_COMPRIMIDO
+    if os.path.getsize(archivo_salida) >= os.path.getsize(archivo):
+        shutil.copyfile(archivo, archivo_salida)
+        accion = ACCION_ORIGINAL_MENOR
+    if cache:
+        cache.guardar(clave, archivo_salida)
+    return ResultadoCompresion(
+        archivo=archivo,
+        archivo_salida=archivo_salida,
+        tamaño_original=os.path.getsize(archivo),
+        tamaño_final=os.path.getsize(archivo_salida),
+        segundos=time.perf_counter() - inicio,
+        accion=accion
+    )
+
+
+def comprimir_pdf(archivo, calidad=CALIDAD_POR_DEFECTO, carpeta_salida=OUTPUT_DIR, ruta_gs=None, archivo_salida=None,
+                  al_progresar=None, timeout_pagina=None, cache=None, perfil=None, min_ahorro=None, servidor=None):
+    """Comprime un PDF con Ghostscript y retorna un ResultadoCompresion
+
+    Si se indica al_progresar, primero se cuentan las páginas y luego se llama con un
+    EventoProgreso por cada página que Ghostscript termina de procesar. Con una
+    CacheCompresion, un PDF ya comprimido con el mismo perfil se devuelve sin ejecutar gs.
+    Un PerfilGs reemplaza a la etiqueta de calidad. Con min_ahorro (fracción, p. ej. 0.05)
+    los PDFs cuyo ahorro estimado por analizar_pdf sea menor se copian sin pasar por gs.
+    Si el resultado de gs pesa más que el original, se conserva el original. Con un
+    PoolServidoresGs (creado con el mismo perfil) el PDF se envía a un proceso ya abierto.
+    """
+    ruta_gs = ruta_gs or requerir_gs_path()
+    archivo_salida = archivo_salida or nombre_salida(archivo, perfil.nombre if perfil else calidad, carpeta_salida)
+    perfil = perfil or perfil_de_calidad(calidad)
+    preparar_salida(archivo_salida)
+    if cache:
+        clave = cache.clave(archivo, perfil.firma(), version_gs(ruta_gs))
+        resultado = resultado_desde_cache(cache, clave, archivo, archivo_salida)
+        if resultado:
+            return resultado
+    if min_ahorro:
+        resultado = resultado_sin_ahorro(archivo, archivo_salida, min_ahorro)
+        if resultado:
+            return resultado
+    total_paginas = contar_paginas(archivo, ruta_gs) if al_progresar else 0
+
+    # Sin -dQUIET Ghostscript imprime "Page N" en stdout al terminar cada página
+    comando = comando_pdfwrite(ruta_gs, perfil, archivo_salida, [archivo],
+                               silencioso=not al_progresar and not timeout_pagina)
+
+    inicio = time.perf_counter()
+    if servidor and not al_progresar:
+        servidor.comprimir(archivo, archivo_salida, timeout_pagina)
+    else:
+        ejecutar_gs(comando, archivo, total_paginas, al_progresar, timeout_pagina)
+    return cerrar_resultado(archivo, archivo_salida, inicio, cache, clave if cache else None)
+
+
+# ==== Modo flujo (bytes / archivos abiertos, sin pasar por OUTPUT_DIR) ====
+def iterar_comprimido(entrada, calidad=CALIDAD_POR_DEFECTO, ruta_gs=None, perfil=None, tamaño_bloque=TAMAÑO_BLOQUE):
+    """Comprime un PDF recibido como bytes o archivo binario y entrega el resultado por bloques
+
+    La entrada se envía a gs por stdin y la salida se lee de su stdout (-sOutputFile=-), de a
+    `tamaño_bloque` bytes, así la memoria usada no depende del tamaño del PDF. Los mensajes del
+    intérprete van a stderr (-sstdout=%stderr) para no mezclarse con el PDF.
+    """
+    ruta_gs = ruta_gs or requerir_gs_path()
+    perfil = perfil or perfil_de_calidad(calidad)
+    comando = comando_pdfwrite(ruta_gs, perfil, "-", ["-"])
+    proceso = subprocess.Popen(comando, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               creationflags=flags_creacion())
+    errores = deque(maxlen=40)
+
+    def enviar_entrada():
+        try:
+            if isinstance(entrada, (bytes, bytearray, memoryview)):
+                vista = memoryview(entrada)
+                for inicio in range(0, len(vista), tamaño_bloque):
+                    proceso.stdin.write(vista[inicio:inicio + tamaño_bloque])
+            else:
+                for bloque in iter(lambda: entrada.read(tamaño_bloque), b""):
+                    proceso.stdin.write(bloque)
+        except (BrokenPipeError, OSError):
+            pass  # gs terminó antes (p. ej. por un error); se reporta con su código de salida
+        finally:
+            try:
+                proceso.stdin.close()
+            except OSError:
+                pass
+
+    def leer_errores():
+        for linea in proceso.stderr:
+            errores.append(linea.decode(errors="replace").rstrip())
+
+    hilos = [threading.Thread(target=enviar_entrada, daemon=True),
+             threading.Thread(target=leer_errores, daemon=True)]
+    for hilo in hilos:
+        hilo.start()
+    try:
+        for bloque in iter(lambda: proceso.stdout.read(tamaño_bloque), b""):
+            yield bloque
+        codigo = proceso.wait()
+    finally:
+        if proceso.poll() is None:
+            proceso.kill()
+            proceso.wait()
+        for hilo in hilos:
+            hilo.join(timeout=5)
+    if codigo != 0:
+        raise subprocess.CalledProcessError(codigo, comando, output="\n".join(errores))
+
+
+def comprimir_flujo(entrada, salida=None, calidad=CALIDAD_POR_DEFECTO, ruta_gs=None, perfil=None):
+    """Comprime bytes o un archivo binario abierto
+
+    Si se indica `salida` (archivo binario abierto) el resultado se escribe ahí y se retorna
+    la cantidad de bytes escritos; si no, se retornan los bytes del PDF comprimido.
+    """
+    if salida is None:
+        return b"".join(iterar_comprimido(entrada, calidad, ruta_gs, perfil))
+    escritos = 0
+    for bloque in iterar_comprimido(entrada, calidad, ruta_gs, perfil):
+        salida.write(bloque)
+        escritos += len(bloque)
+    return escritos
+
+
+# ==== Modo fragmentado (un PDF grande repartido en varios procesos) ====
+def rangos_paginas(total_paginas, partes):
+    """Divide 1..total_paginas en hasta `partes` rangos contiguos (primera, última)"""
+    partes = max(1, min(partes, total_paginas))
+    base, resto = divmod(total_paginas, partes)
+    rangos, primera = [], 1
+    for indice in range(partes):
+        ultima = primera + base - 1 + (1 if indice < resto else 0)
+        rangos.append((primera, ultima))
+        primera = ultima + 1
+    return rangos
+
+
+def comprimir_pdf_fragmentado(archivo, calidad=CALIDAD_POR_DEFECTO, carpeta_salida=OUTPUT_DIR, workers=None,
+                              ruta_gs=None, archivo_salida=None, al_progresar=None, timeout_pagina=None, cache=None,
+                              perfil=None, min_ahorro=None):
+    """Comprime un PDF grande por rangos de páginas en paralelo y une los fragmentos en orden
+
+    Cada fragmento se procesa con -dFirstPage/-dLastPage en su propio proceso Ghostscript.
+    Se verifica que cada fragmento y el PDF final tengan el número de páginas esperado.
+    """
+    ruta_gs = ruta_gs or requerir_gs_path()
+    workers = workers or os.cpu_count() or 1
+    if workers < 2:
+        return comprimir_pdf(archivo, calidad, carpeta_salida, ruta_gs, archivo_salida, al_progresar, timeout_pagina,
+                             cache, perfil, min_ahorro)
+
+    archivo_salida = archivo_salida or nombre_salida(archivo, perfil.nombre if perfil else calidad, carpeta_salida)
+    perfil = perfil or perfil_de_calidad(calidad)
+    preparar_salida(archivo_salida)
+    if cache:
+        clave = cache.clave(archivo, perfil.firma(), version_gs(ruta_gs), "fragmentado")
+        resultado = resultado_desde_cache(cache, clave, archivo, archivo_salida)
+        if resultado:
+            return resultado
+    if min_ahorro:
+        resultado = resultado_sin_ahorro(archivo, archivo_salida, min_ahorro)
+        if resultado:
+            return resultado
+    # Las páginas se cuentan solo si la caché no tenía el resultado (contarlas ya lanza gs)
+    total_paginas = contar_paginas(archivo, ruta_gs)
+    if total_paginas < 2:
+        return comprimir_pdf(archivo, calidad, carpeta_salida, ruta_gs, archivo_salida, al_progresar, timeout_pagina,
+                             cache, perfil)
+    rangos = rangos_paginas(total_paginas, workers)
+    carpeta_temporal = tempfile.mkdtemp(prefix="fragmentos-", dir=os.path.dirname(archivo_salida) or ".")
+    paginas_listas = [0]
+    candado = threading.Lock()
+    inicio = time.perf_counter()
+
+    def al_progresar_fragmento(_evento):
+        # Suma las páginas de todos los fragmentos en un único evento global
+        with candado:
+            paginas_listas[0] += 1
+            pagina = paginas_listas[0]
+        segundos = time.perf_counter() - inicio
+        ritmo = pagina / segundos if segundos else 0.0
+        al_progresar(EventoProgreso(archivo, pagina, total_paginas, segundos, ritmo,
+                                    (total_paginas - pagina) / ritmo if ritmo else 0.0))
+
+    def comprimir_fragmento(indice, primera, ultima):
+        salida = os.path.join(carpeta_temporal, f"fragmento_{indice:04d}.pdf")
+        comando = comando_pdfwrite(ruta_gs, perfil, salida, [archivo],
+                                   opciones=[f"-dFirstPage={primera}", f"-dLastPage={ultima}"],
+                                   silencioso=not al_progresar and not timeout_pagina)
+        ejecutar_gs(comando, archivo, total_paginas,
+                    al_progresar_fragmento if al_progresar else None, timeout_pagina)
+        paginas = contar_paginas(salida, ruta_gs)
+        if paginas != ultima - primera + 1:
+            raise RuntimeError(f"El fragmento {primera}-{ultima} tiene {paginas} páginas en lugar de "
+                               f"{ultima - primera + 1}")
+        return salida
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(rangos)) as pool:
+            futuros = [pool.submit(comprimir_fragmento, indice, primera, ultima)
+                       for indice, (primera, ultima) in enumerate(rangos)]
+            fragmentos = [futuro.result() for futuro in futuros]
+
+        # La unión solo reescribe la estructura: las imágenes ya vienen reducidas y se copian tal cual
+        union = PerfilGs("union", preset="/default", compatibilidad=perfil.compatibilidad, opciones_extra=[
+            "-dAutoRotatePages=/None",
+            "-dPassThroughJPEGImages=true",
+            "-dPassThroughJPXImages=true",
+            "-dDownsampleColorImages=false",
+            "-dDownsampleGrayImages=false",
+            "-dDownsampleMonoImages=false",
+        ])
+        comando = comando_pdfwrite(ruta_gs, union, archivo_salida, fragmentos)
+        ejecutar_gs(comando, archivo_salida)
+    finally:
+        shutil.rmtree(carpeta_temporal, ignore_errors=True)
+
+    paginas_finales = contar_paginas(archivo_salida, ruta_gs)
+    if paginas_finales != total_paginas:
+        raise RuntimeError(f"El PDF unido tiene {paginas_finales} páginas en lugar de {total_paginas}")
+    return cerrar_resultado(archivo, archivo_salida, inicio, cache, clave if cache else None)
+
+
+# ==== Modo lote (carpeta o patrón glob) ====
+def es_lote(origen):
+    """Indica si el origen es una carpeta o un patrón glob en lugar de un único PDF"""
+    return os.path.isdir(origen) or glob.has_magic(origen)
+
+
+def listar_pdfs(origen):
+    """Retorna los PDFs de una carpeta (recursivo) o los que coinciden con un patrón glob"""
+    if os.path.isdir(origen):
+        patron = os.path.join(origen, "**", "*")
+    else:
+        patron = origen
+    return sorted(
+        ruta for ruta in glob.glob(patron, recursive=True)
+        if os.path.isfile(ruta) and ruta.lower().endswith(".pdf")
+    )
+
+
+def ejecutar_cola(archivos, tarea, workers, estados, resumen, al_terminar_archivo=None):
+    """Reparte los archivos entre `workers` hilos y acumula en `resumen` el resultado de cada uno"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(tarea, archivo): archivo for archivo in archivos}
+        for futuro in as_completed(futuros):
+            archivo = futuros[futuro]
+            try:
+                resultado = futuro.result()
+                estados[archivo] = "ok"
+                resumen["correctos"] += 1
+                resumen["bytes_originales"] += resultado.tamaño_original
+                resumen["bytes_finales"] += resultado.tamaño_final
+                resumen["resultados"].append(resultado)
+                resumen["acciones"][resultado.accion] = resumen["acciones"].get(resultado.accion, 0) + 1
+                detalle = (f"{resultado.tamaño_original / 1024:.0f} KB → {resultado.tamaño_final / 1024:.0f} KB"
+                           f"{NOTAS_ACCION.get(resultado.accion, '')}")
+            except Exception as e:
+                estados[archivo] = "error"
+                resumen["errores"] += 1
+                detalle = str(e)
+            if al_terminar_archivo:
+                al_terminar_archivo(archivo, estados[archivo], detalle, resumen)
+
+
+def comprimir_lote(archivos, calidad=CALIDAD_POR_DEFECTO, workers=None, al_terminar_archivo=None,
+                   carpeta_salida=OUTPUT_DIR, timeout_pagina=None, cache=None, perfil=None, min_ahorro=None,
+                   persistente=False):
+    """Comprime una cola de PDFs con un pool acotado de procesos Ghostscript y retorna el resumen
+
+    Con persistente=True se abren `workers` procesos Ghostscript al inicio y se reutilizan
+    para todos los archivos en lugar de lanzar uno por PDF; con timeout_pagina, el proceso
+    que se cuelga se mata y se reemplaza.
+    """
+    ruta_gs = requerir_gs_path()
+    workers = workers or os.cpu_count() or 1
+    servidor = None
+    if persistente:
+        # Sin -dQUIET gs escribe "Page N" por página: así el tiempo límite es por página y no por PDF
+        comando_base = comando_pdfwrite(ruta_gs, perfil or perfil_de_calidad(calidad), None, [],
+                                        ["-dNOPROMPT"] if timeout_pagina else (), silencioso=not timeout_pagina)
+        servidor = PoolServidoresGs(comando_base, workers, flags_creacion())
+    estados = {archivo: "pendiente" for archivo in archivos}
+    resumen = {"archivos": len(archivos), "correctos": 0, "errores": 0,
+               "bytes_originales": 0, "bytes_finales": 0, "resultados": [], "acciones": {}}
+
+    def tarea(archivo):
+        estados[archivo] = "procesando"
+        return comprimir_pdf(archivo, calidad, carpeta_salida, ruta_gs=ruta_gs, timeout_pagina=timeout_pagina,
+                             cache=cache, perfil=perfil, min_ahorro=min_ahorro, servidor=servidor)
+
+    inicio = time.perf_counter()
+    # Cada hilo solo espera a su proceso gs, por lo que N hilos equivalen a N núcleos ocupados
+    try:
+        ejecutar_cola(archivos, tarea, workers, estados, resumen, al_terminar_archivo)
+    finally:
+        if servidor:
+            servidor.cerrar()
+
+    resumen["segundos"] = time.perf_counter() - inicio
+    resumen["archivos_por_segundo"] = len(archivos) / resumen["segundos"] if resumen["segundos"] else 0.0
+    resumen["bytes_ahorrados"] = resumen["bytes_originales"] - resumen["bytes_finales"]
+    resumen["estados"] = estados
+    if cache:
+        resumen["cache"] = cache.estadisticas()
+    return resumen
+
+
+# ==== Comparación de perfiles (tiempo vs. tamaño) ====
+def comparar_perfiles(archivos, perfiles, workers=None, al_terminar_perfil=None):
+    """Comprime los mismos PDFs con cada perfil y retorna tiempo y tamaño obtenidos por perfil"""
+    filas = []
+    for perfil in perfiles:
+        carpeta_temporal = tempfile.mkdtemp(prefix=f"perfil-{perfil.nombre}-")
+        try:
+            resumen = comprimir_lote(archivos, workers=workers, carpeta_salida=carpeta_temporal, perfil=perfil)
+        finally:
+            shutil.rmtree(carpeta_temporal, ignore_errors=True)
+        fila = {
+            "perfil": perfil.nombre,
+            "argumentos": perfil.firma(),
+            "archivos": resumen["correctos"],
+            "errores": resumen["errores"],
+            "segundos": resumen["segundos"],
+            "archivos_por_segundo": resumen["archivos_por_segundo"],
+            "bytes_originales": resumen["bytes_originales"],
+            "bytes_finales": resumen["bytes_finales"],
+            "proporcion": (resumen["bytes_finales"] / resumen["bytes_originales"]
+                           if resumen["bytes_originales"] else 0.0),
+        }
+        filas.append(fila)
+        if al_terminar_perfil:
+            al_terminar_perfil(fila)
+    return filas
+
+
+# ==== Comparación de latencia: un proceso por PDF vs. servidor persistente ====
+def estadisticas_latencia(segundos):
+    """Media, mediana y percentil 95 (en milisegundos) de una lista de duraciones"""
+    ordenados = sorted(segundos)
+    if not ordenados:
+        return {"media_ms": 0.0, "mediana_ms": 0.0, "p95_ms": 0.0}
+    return {
+        "media_ms": 1000 * sum(ordenados) / len(ordenados),
+        "mediana_ms": 1000 * ordenados[len(ordenados) // 2],
+        "p95_ms": 1000 * ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))],
+    }
+
+
+def comparar_latencia(archivos, calidad=CALIDAD_POR_DEFECTO, perfil=None):
+    """Comprime los mismos PDFs de uno en uno con ambos modos y retorna la latencia por archivo"""
+    filas = []
+    for modo, persistente in (("proceso_por_archivo", False), ("persistente", True)):
+        carpeta_temporal = tempfile.mkdtemp(prefix=f"latencia-{modo}-")
+        try:
+            resumen = comprimir_lote(archivos, calidad, workers=1, carpeta_salida=carpeta_temporal,
+                                     perfil=perfil, persistente=persistente)
+        finally:
+            shutil.rmtree(carpeta_temporal, ignore_errors=True)
+        fila = {"modo": modo, "archivos": resumen["correctos"], "errores": resumen["errores"],
+                "segundos": resumen["segundos"]}
+        fila.update(estadisticas_latencia([r.segundos for r in resumen["resultados"]]))
+        filas.append(fila)
+    return filas
+
+
+# ==== Interfaz de línea de comandos ====
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m motor_pdf",
+        description="Comprime PDFs con Ghostscript sin abrir la interfaz gráfica."
+    )
+    parser.add_argument("origen", nargs="?",
+                        help="PDF, carpeta o patrón glob (entre comillas) a comprimir; '-' lee de stdin y escribe en stdout")
+    parser.add_argument("-c", "--calidad", choices=list(CALIDADES_CLI), default="ebook",
+                        help="preset de Ghostscript: prepress (alta calidad), ebook (media), screen (alta compresión)")
+    parser.add_argument("-o", "--salida", default=OUTPUT_DIR, help=f"carpeta de salida (por defecto: {OUTPUT_DIR})")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="procesos Ghostscript simultáneos en modo lote (por defecto: núcleos de CPU)")
+    parser.add_argument("--json", action="store_true", help="imprime el resultado en JSON")
+    parser.add_argument("--fragmentar", action="store_true",
+                        help="divide un PDF grande en rangos de páginas y los comprime en paralelo (--workers procesos)")
+    parser.add_argument("--perfil", default=None,
+                        help="perfil de ajuste a usar en lugar de --calidad (ver --listar-perfiles)")
+    parser.add_argument("--perfiles", default=None, metavar="ARCHIVO",
+                        help="archivo JSON/TOML con perfiles propios (por defecto: perfiles-pdf.json si existe)")
+    parser.add_argument("--listar-perfiles", action="store_true", help="muestra los perfiles disponibles y sale")
+    parser.add_argument("--comparar-perfiles", nargs="*", default=None, metavar="PERFIL",
+                        help="comprime el origen con cada perfil (todos si no se indican) y reporta tiempo vs. tamaño")
+    parser.add_argument("--persistente", action="store_true",
+                        help="en modo lote reutiliza --workers procesos Ghostscript abiertos (solo PDFs confiables)")
+    parser.add_argument("--comparar-latencia", action="store_true",
+                        help="mide la latencia por PDF lanzando un proceso por archivo vs. un servidor persistente")
+    parser.add_argument("--min-ahorro", type=float, default=None, metavar="PORC",
+                        help="copia sin comprimir los PDFs cuyo ahorro estimado sea menor a PORC %% (p. ej. 5)")
+    parser.add_argument("--analizar", action="store_true",
+                        help="solo estima el ahorro posible de cada PDF, sin comprimir")
+    parser.add_argument("--cache", action="store_true",
+                        help="reutiliza resultados anteriores del mismo PDF + preset + versión de Ghostscript")
+    parser.add_argument("--carpeta-cache", default=CARPETA_CACHE, help=f"carpeta de la caché (por defecto: {CARPETA_CACHE})")
+    parser.add_argument("--cache-max-mb", type=float, default=TAMAÑO_MAXIMO_MB,
+                        help=f"tamaño máximo de la caché antes de borrar lo menos usado (por defecto: {TAMAÑO_MAXIMO_MB})")
+    parser.add_argument("--progreso", action="store_true",
+                        help="muestra página actual, páginas/s y tiempo restante (en JSON, una línea por evento)")
+    parser.add_argument("--timeout-pagina", type=float, default=None, metavar="SEG",
+                        help="aborta si Ghostscript pasa más de SEG segundos sin terminar una página")
+    return parser
+
+
+def imprimir_progreso(evento, como_json=False):
+    """Muestra un EventoProgreso en stderr para no mezclarlo con el resultado"""
+    if como_json:
+        datos = asdict(evento)
+        datos["porcentaje"] = round(evento.porcentaje, 1)
+        print(json.dumps(datos, ensure_ascii=False), file=sys.stderr, flush=True)
+        return
+    print(f"\rPágina {evento.pagina}/{evento.total_paginas or '?'} ({evento.porcentaje:.0f}%) · "
+          f"{evento.paginas_por_segundo:.1f} pág/s · ETA {evento.eta_segundos:.0f} s   ",
+          end="", file=sys.stderr, flush=True)
+
+
+def imprimir_estadisticas_cache(cache):
+    """Muestra los aciertos y fallos de la caché de esta ejecución"""
+    datos = cache.estadisticas()
+    print(f"Caché: {datos['aciertos']} aciertos, {datos['fallos']} fallos "
+          f"({datos['tasa_aciertos']:.0%}), {datos['bytes_en_cache'] / (1024 * 1024):.1f} MB en uso")
+
+
+def imprimir_comparacion(fila):
+    print(f"{fila['perfil']:<16} {fila['segundos']:>8.2f} s {fila['archivos_por_segundo']:>8.2f} arch/s "
+          f"{fila['bytes_finales'] / (1024 * 1024):>9.1f} MB {fila['proporcion']:>7.1%}"
+          f"{'  (' + str(fila['errores']) + ' errores)' if fila['errores'] else ''}")
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    calidad = CALIDADES_CLI[args.calidad]
+    try:
+        perfiles = cargar_perfiles(args.perfiles)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"No se pudieron cargar los perfiles: {e}", file=sys.stderr)
+        return 2
+
+    if args.listar_perfiles:
+        for perfil in perfiles.values():
+            print(f"{perfil.nombre:<16} {perfil.firma()}")
+        return 0
+    if not args.origen:
+        parser.error("falta el PDF, carpeta o patrón de origen")
+    nombres = [args.perfil] if args.perfil else []
+    if args.comparar_perfiles:
+        nombres += args.comparar_perfiles
+    desconocidos = [nombre for nombre in nombres if nombre not in perfiles]
+    if desconocidos:
+        print(f"Perfiles desconocidos: {', '.join(desconocidos)}", file=sys.stderr)
+        return 2
+    perfil = perfiles[args.perfil] if args.perfil else None
+    cache = CacheCompresion(args.carpeta_cache, args.cache_max_mb) if args.cache else None
+
+    min_ahorro = args.min_ahorro / 100 if args.min_ahorro else None
+
+    try:
+        if args.origen == "-":
+            escritos = comprimir_flujo(sys.stdin.buffer, sys.stdout.buffer, calidad, perfil=perfil)
+            sys.stdout.buffer.flush()
+            print(f"{escritos / 1024:.0f} KB escritos en stdout", file=sys.stderr)
+            return 0
+
+        if args.analizar:
+            archivos = listar_pdfs(args.origen) if es_lote(args.origen) else [args.origen]
+            analisis = [analizar_pdf(archivo) for archivo in archivos]
+            if args.json:
+                print(json.dumps([dict(asdict(a), proporcion_ahorro=a.proporcion_ahorro) for a in analisis],
+                                 ensure_ascii=False, indent=2))
+            else:
+                for a in analisis:
+                    print(f"{a.archivo}: {a.tamaño / 1024:.0f} KB, {a.imagenes} imágenes "
+                          f"({a.bytes_imagenes / 1024:.0f} KB), ahorro estimado {a.proporcion_ahorro:.0%}")
+            return 0
+
+        if args.comparar_latencia:
+            archivos = listar_pdfs(args.origen) if es_lote(args.origen) else [args.origen]
+            filas = comparar_latencia(archivos, calidad, perfil)
+            if args.json:
+                print(json.dumps(filas, ensure_ascii=False, indent=2))
+            else:
+                for fila in filas:
+                    print(f"{fila['modo']:<20} media {fila['media_ms']:>8.1f} ms  mediana {fila['mediana_ms']:>8.1f} ms"
+                          f"  p95 {fila['p95_ms']:>8.1f} ms  total {fila['segundos']:>7.2f} s")
+            return 0
+
+        if args.comparar_perfiles is not None:
+            archivos = listar_pdfs(args.origen) if es_lote(args.origen) else [args.origen]
+            elegidos = [perfiles[nombre] for nombre in args.comparar_perfiles] or list(perfiles.values())
+            if not args.json:
+                print(f"{'perfil':<16} {'tiempo':>10} {'velocidad':>15} {'tamaño':>12} {'vs. orig':>8}")
+            filas = comparar_perfiles(archivos, elegidos, args.workers,
+                                      None if args.json else imprimir_comparacion)
+            if args.json:
+                print(json.dumps(filas, ensure_ascii=False, indent=2))
+            return 0
+
+        if es_lote(args.origen):
+            archivos = listar_pdfs(args.origen)
+            if not archivos:
+                print(f"No se encontraron PDFs en: {args.origen}", file=sys.stderr)
+                return 1
+
+            def al_terminar_archivo(archivo, estado, detalle, resumen):
+                if not args.json:
+                    procesados = resumen["correctos"] + resumen["errores"]
+                    print(f"[{procesados}/{resumen['archivos']}] {estado:5} {archivo} ({detalle})")
+
+            resumen = comprimir_lote(archivos, calidad, args.workers, al_terminar_archivo, args.salida,
+                                     args.timeout_pagina, cache, perfil, min_ahorro, args.persistente)
+            if args.json:
+                resumen["resultados"] = [asdict(r) for r in resumen["resultados"]]
+                print(json.dumps(resumen, ensure_ascii=False, indent=2))
+            else:
+                print(f"Lote: {resumen['correctos']}/{resumen['archivos']} correctos, {resumen['errores']} errores, "
+                      f"{resumen['archivos_por_segundo']:.2f} archivos/s, "
+                      f"{resumen['bytes_ahorrados'] / (1024 * 1024):.1f} MB ahorrados")
+                if cache:
+                    imprimir_estadisticas_cache(cache)
+            return 1 if resumen["errores"] else 0
+
+        if not os.path.isfile(args.origen):
+            print(f"No existe el archivo: {args.origen}", file=sys.stderr)
+            return 1
+        al_progresar = (lambda evento: imprimir_progreso(evento, args.json)) if args.progreso else None
+        if args.fragmentar:
+            resultado = comprimir_pdf_fragmentado(args.origen, calidad, args.salida, args.workers,
+                                                  al_progresar=al_progresar, timeout_pagina=args.timeout_pagina,
+                                                  cache=cache, perfil=perfil, min_ahorro=min_ahorro)
+        else:
+            resultado = comprimir_pdf(args.origen, calidad, args.salida, al_progresar=al_progresar,
+                                      timeout_pagina=args.timeout_pagina, cache=cache, perfil=perfil,
+                                      min_ahorro=min_ahorro)
+        if args.progreso and not args.json:
+            print(file=sys.stderr)
+        if args.json:
+            print(json.dumps(asdict(resultado), ensure_ascii=False, indent=2))
+        else:
+            print(f"{resultado.archivo_salida}: {resultado.tamaño_original / 1024:.0f} KB → "
+                  f"{resultado.tamaño_final / 1024:.0f} KB en {resultado.segundos:.2f} s"
+                  f"{NOTAS_ACCION.get(resultado.accion, '')}")
+            if cache:
+                imprimir_estadisticas_cache(cache)
+        return 0
+
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 2
+    except (TimeoutError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    except subprocess.CalledProcessError as e:
+        print(f"Ghostscript falló:\n{e.output or e}", file=sys.stderr)
+        return 1
+    finally:
+        if cache:
+            cache.guardar_estadisticas()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# ================================================================
+# 🎛 PERFILES DE AJUSTE DE GHOSTSCRIPT
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Perfiles con nombre que amplían los tres presets fijos
+#              (/prepress, /ebook, /screen) con resolución de imágenes,
+#              hilos, memoria, imágenes duplicadas y subconjunto de fuentes.
+#              Se pueden definir en JSON o TOML, por ejemplo:
+#
+#   {
+#     "facturas": {"preset": "/ebook", "resolucion_color": 120,
+#                  "resolucion_gris": 120, "detectar_duplicadas": true},
+#     "escaneos": {"preset": "/screen", "resolucion_mono": 300,
+#                  "hilos_render": 4, "buffer_space_mb": 64}
+#   }
+#
+# Licencia: MIT
+# ================================================================
+
+import json
+import os
+from dataclasses import dataclass, field, fields
+
+# Archivo de perfiles que se carga automáticamente si existe en la carpeta actual
+ARCHIVO_PERFILES = "perfiles-pdf.json"
+
+
+@dataclass
+class PerfilGs:
+    """Conjunto de parámetros de Ghostscript para pdfwrite"""
+    nombre: str
+    preset: str = "/ebook"
+    compatibilidad: str = "1.4"
+    resolucion_color: int = None
+    resolucion_gris: int = None
+    resolucion_mono: int = None
+    hilos_render: int = None
+    buffer_space_mb: int = None
+    max_bitmap_mb: int = None
+    detectar_duplicadas: bool = None
+    subconjunto_fuentes: bool = None
+    opciones_extra: list = field(default_factory=list)
+
+    def argumentos(self):
+        """Opciones de línea de comandos de Ghostscript (además del preset)"""
+        args = []
+        for tipo, resolucion, filtro in (("Color", self.resolucion_color, "/Bicubic"),
+                                         ("Gray", self.resolucion_gris, "/Bicubic"),
+                                         ("Mono", self.resolucion_mono, "/Subsample")):
+            if resolucion:
+                args += [f"-dDownsample{tipo}Images=true",
+                         f"-d{tipo}ImageDownsampleType={filtro}",
+                         f"-d{tipo}ImageResolution={resolucion}",
+                         f"-d{tipo}ImageDownsampleThreshold=1.0"]
+        if self.hilos_render:
+            args.append(f"-dNumRenderingThreads={self.hilos_render}")
+        if self.buffer_space_mb:
+            args.append(f"-dBufferSpace={self.buffer_space_mb * 1024 * 1024}")
+        if self.max_bitmap_mb:
+            args.append(f"-dMaxBitmap={self.max_bitmap_mb * 1024 * 1024}")
+        if self.detectar_duplicadas is not None:
+            args.append(f"-dDetectDuplicateImages={str(self.detectar_duplicadas).lower()}")
+        if self.subconjunto_fuentes is not None:
+            args.append(f"-dSubsetFonts={str(self.subconjunto_fuentes).lower()}")
+        return args + list(self.opciones_extra)
+
+    def firma(self):
+        """Texto que identifica la configuración completa (para la clave de la caché)"""
+        return " ".join([self.preset, f"-dCompatibilityLevel={self.compatibilidad}", *self.argumentos()])
+
+
+# ==== Perfiles incluidos (equivalentes a los tres niveles de la interfaz) ====
+PERFILES_BASE = {
+    "prepress": PerfilGs("prepress", preset="/prepress"),
+    "ebook": PerfilGs("ebook", preset="/ebook"),
+    "screen": PerfilGs("screen", preset="/screen"),
+    # Variantes de ejemplo para documentos de oficina
+    "ebook-rapido": PerfilGs("ebook-rapido", preset="/ebook", hilos_render=os.cpu_count() or 1,
+                             buffer_space_mb=64, detectar_duplicadas=True),
+    "escaneos": PerfilGs("escaneos", preset="/screen", resolucion_color=110, resolucion_gris=110,
+                         resolucion_mono=300, detectar_duplicadas=True, subconjunto_fuentes=True),
+}
+
+
+def leer_archivo_perfiles(ruta):
+    """Lee un archivo .json o .toml y retorna el diccionario de perfiles"""
+    if ruta.lower().endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("Los perfiles en TOML requieren Python 3.11 o superior; usa JSON")
+        with open(ruta, "rb") as f:
+            datos = tomllib.load(f)
+    else:
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+    return datos.get("perfiles", datos)
+
+
+def cargar_perfiles(ruta=None):
+    """Retorna los perfiles incluidos más los definidos por el usuario (estos tienen prioridad)"""
+    perfiles = dict(PERFILES_BASE)
+    if ruta is None and os.path.exists(ARCHIVO_PERFILES):
+        ruta = ARCHIVO_PERFILES
+    if not ruta:
+        return perfiles
+
+    campos = {campo.name for campo in fields(PerfilGs)} - {"nombre"}
+    for nombre, valores in leer_archivo_perfiles(ruta).items():
+        desconocidos = set(valores) - campos
+        if desconocidos:
+            raise ValueError(f"Perfil '{nombre}': opciones desconocidas {sorted(desconocidos)}")
+        perfiles[nombre] = PerfilGs(nombre, **valores)
+    return perfiles
@@ -0,0 +1,163 @@
+# ================================================================
+# 🔁 SERVIDOR GHOSTSCRIPT PERSISTENTE
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Mantiene procesos Ghostscript abiertos en modo interactivo
+#              y les envía un PDF tras otro por stdin, evitando pagar el
+#              arranque del proceso, la carga de fuentes y recursos en
+#              cada archivo. Útil para lotes de muchos PDFs pequeños.
+#
+# Cada trabajo se envía como PostScript:
+#   { << /OutputFile (salida.pdf) >> setpagedevice
+#     (entrada.pdf) run
+#     << /OutputFile (/dev/null) >> setpagedevice }   % cierra salida.pdf
+#   stopped { (__ERROR__ n) } { (__LISTO__ n) } ifelse print flush
+#
+# Con un tiempo límite por página, el proceso que deja de avanzar se mata
+# y el siguiente trabajo abre uno nuevo.
+#
+# ⚠️ Cambiar OutputFile y leer archivos arbitrarios requiere -dNOSAFER:
+#    usar solo con PDFs de origen confiable.
+# Licencia: MIT
+# ================================================================
+
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+
+# Reinicia el proceso tras este número de trabajos para acotar la memoria acumulada
+TRABAJOS_POR_PROCESO = 200
+MARCA_LISTO = "__LISTO__"
+MARCA_ERROR = "__ERROR__"
+
+
+def cadena_postscript(texto):
+    """Escapa un texto para usarlo como cadena literal de PostScript"""
+    return "(" + texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def ruta_postscript(ruta):
+    """Ruta absoluta con barras normales (Ghostscript las acepta también en Windows)"""
+    return cadena_postscript(os.path.abspath(ruta).replace("\\", "/"))
+
+
+class ServidorGs:
+    """Un proceso Ghostscript interactivo que comprime PDFs de uno en uno"""
+
+    def __init__(self, comando_base, creationflags=0):
+        # comando_base: ruta de gs + opciones de pdfwrite (sin -sOutputFile ni archivos de entrada)
+        self.comando_base = list(comando_base)
+        self.creationflags = creationflags
+        self.proceso = None
+        self.trabajos = 0
+        self._contador = 0
+
+    def iniciar(self):
+        comando = [*self.comando_base, "-dNOSAFER", f"-sOutputFile={os.devnull}", "-"]
+        comando = [arg for arg in comando if arg != "-dBATCH"]
+        self.proceso = subprocess.Popen(comando, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, text=True, errors="replace", bufsize=1,
+                                        creationflags=self.creationflags)
+        self.trabajos = 0
+
+    def activo(self):
+        return self.proceso is not None and self.proceso.poll() is None
+
+    def comprimir(self, archivo, archivo_salida, timeout_pagina=None):
+        """Envía un PDF al proceso y espera a que el archivo de salida quede cerrado
+
+        Con timeout_pagina, si gs pasa ese tiempo sin escribir nada (sin -dQUIET escribe "Page N"
+        por página) se mata el proceso y se lanza TimeoutError.
+        """
+        if not self.activo() or self.trabajos >= TRABAJOS_POR_PROCESO:
+            self.cerrar()
+            self.iniciar()
+        self._contador += 1
+        identificador = self._contador
+        programa = (
+            f"{{ << /OutputFile {ruta_postscript(archivo_salida)} >> setpagedevice "
+            f"{ruta_postscript(archivo)} run "
+            f"<< /OutputFile {cadena_postscript(os.devnull)} >> setpagedevice }} stopped "
+            f"{{ (\\n{MARCA_ERROR} {identificador}\\n) }} {{ (\\n{MARCA_LISTO} {identificador}\\n) }} ifelse "
+            f"print flush clear\n"
+        )
+        ultimas_lineas = deque(maxlen=40)
+        proceso = self.proceso
+        ultimo_avance = [time.perf_counter()]
+        colgado = threading.Event()
+        terminado = threading.Event()
+
+        def vigilar():
+            while not terminado.wait(1):
+                if time.perf_counter() - ultimo_avance[0] > timeout_pagina:
+                    colgado.set()
+                    proceso.kill()
+                    return
+
+        if timeout_pagina:
+            threading.Thread(target=vigilar, daemon=True).start()
+        try:
+            proceso.stdin.write(programa)
+            proceso.stdin.flush()
+            for linea in proceso.stdout:
+                ultimo_avance[0] = time.perf_counter()
+                linea = linea.rstrip()
+                if linea == f"{MARCA_LISTO} {identificador}":
+                    self.trabajos += 1
+                    return
+                if linea == f"{MARCA_ERROR} {identificador}":
+                    break
+                ultimas_lineas.append(linea)
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            terminado.set()
+        # Tras un error el estado del intérprete no es confiable: se reinicia en el próximo trabajo
+        self.cerrar()
+        if colgado.is_set():
+            raise TimeoutError(f"Ghostscript no avanzó en {timeout_pagina} s: {archivo}")
+        raise subprocess.CalledProcessError(1, self.comando_base, output="\n".join(ultimas_lineas))
+
+    def cerrar(self):
+        if not self.proceso:
+            return
+        try:
+            if self.proceso.poll() is None:
+                self.proceso.stdin.write("quit\n")
+                self.proceso.stdin.flush()
+                self.proceso.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proceso.kill()
+            self.proceso.wait()
+        self.proceso = None
+
+
+class PoolServidoresGs:
+    """Grupo de N servidores Ghostscript; cada trabajo toma uno libre"""
+
+    def __init__(self, comando_base, cantidad, creationflags=0):
+        self.libres = queue.Queue()
+        self.servidores = [ServidorGs(comando_base, creationflags) for _ in range(cantidad)]
+        for servidor in self.servidores:
+            self.libres.put(servidor)
+
+    def comprimir(self, archivo, archivo_salida, timeout_pagina=None):
+        servidor = self.libres.get()
+        try:
+            servidor.comprimir(archivo, archivo_salida, timeout_pagina)
+        finally:
+            self.libres.put(servidor)
+
+    def cerrar(self):
+        for servidor in self.servidores:
+            servidor.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
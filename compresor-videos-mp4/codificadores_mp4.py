@@ -0,0 +1,196 @@
+# ================================================================
+# 🎛 CODIFICADORES DE VIDEO DISPONIBLES
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Catálogo de codificadores (x264, x265, SVT-AV1, VP9 y los
+#              de GPU NVENC/Quick Sync) con sus opciones por nivel de
+#              calidad. Detecta una sola vez cuáles trae el FFmpeg instalado
+#              y elige el más rápido o el que deja el archivo más pequeño.
+#
+# Velocidad y tamaño son relativos a x264 medium (1.0). Los valores
+# incluidos son de referencia; `python -m motor_mp4 --medir-codificadores
+# muestra.mp4` los mide en esta máquina y los guarda en
+# mediciones-codificadores.json, que tiene prioridad al elegir.
+# Licencia: MIT
+# ================================================================
+
+import json
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Archivo con las mediciones locales (se carga automáticamente si existe en la carpeta actual)
+ARCHIVO_MEDICIONES = "mediciones-codificadores.json"
+
+CODIFICADOR_POR_DEFECTO = "x264-medium"
+OBJETIVO_RAPIDO = "rapido"
+OBJETIVO_PEQUEÑO = "pequeño"
+OBJETIVOS = (OBJETIVO_RAPIDO, OBJETIVO_PEQUEÑO)
+
+PATRON_ENCODER = re.compile(r"^\s*V[A-Z.]{5}\s+(\S+)", re.MULTILINE)
+
+
+@dataclass
+class Codificador:
+    """Un codificador de FFmpeg con su preset y el valor de calidad para cada nivel"""
+    nombre: str
+    encoder: str
+    descripcion: str
+    # Valor de calidad para (alta calidad, media, alta compresión)
+    calidad: tuple
+    parametro_calidad: str = "-crf"
+    opciones: list = field(default_factory=list)
+    # Opciones que solo aplican en modo calidad constante (p. ej. "-b:v 0" de VP9/NVENC)
+    opciones_calidad: list = field(default_factory=list)
+    velocidad: float = 1.0
+    tamaño: float = 1.0
+    hardware: bool = False
+    # Admite -pass 1/2 (x264, VP9) o pass=1/2 en x265-params
+    dos_pasadas: bool = False
+
+    def _hilos(self, hilos):
+        # Limita los hilos del codificador para que varios trabajos en paralelo no saturen la CPU
+        return ["-threads", str(hilos)] if hilos and not self.hardware else []
+
+    def argumentos(self, nivel, hilos=None):
+        """Opciones de video de FFmpeg para el nivel de calidad 0, 1 o 2"""
+        return ["-c:v", self.encoder, *self.opciones, *self.opciones_calidad,
+                self.parametro_calidad, str(self.calidad[nivel]), *self._hilos(hilos)]
+
+    def argumentos_bitrate(self, kbps, hilos=None, pasada=None, registro_pasadas=None):
+        """Opciones para un bitrate promedio; pasada 1 o 2 con `registro_pasadas` para dos pasadas"""
+        args = ["-c:v", self.encoder, *self.opciones, "-b:v", f"{int(kbps)}k", *self._hilos(hilos)]
+        if pasada and self.encoder == "libx265":
+            args += ["-x265-params", f"pass={pasada}:stats={escapar_opcion_x265(registro_pasadas + '.log')}"]
+        elif pasada:
+            args += ["-pass", str(pasada), "-passlogfile", registro_pasadas]
+        return args
+
+
+def escapar_opcion_x265(valor):
+    """Escapa un valor para -x265-params, que separa con ":" (p. ej. la unidad en C:\\Users\\...)"""
+    for especial in ("\\", ":", "'"):
+        valor = valor.replace(especial, "\\" + especial)
+    return valor
+
+
+CODIFICADORES = {c.nombre: c for c in (
+    Codificador("x264-veryfast", "libx264", "H.264 veryfast (rápido, algo más pesado)",
+                (20, 28, 35), opciones=["-preset", "veryfast"], velocidad=2.6, tamaño=1.12, dos_pasadas=True),
+    Codificador("x264-medium", "libx264", "H.264 medium (compatible con todo)",
+                (20, 28, 35), opciones=["-preset", "medium"], dos_pasadas=True),
+    Codificador("x264-slow", "libx264", "H.264 slow (algo más liviano, más lento)",
+                (20, 28, 35), opciones=["-preset", "slow"], velocidad=0.5, tamaño=0.94, dos_pasadas=True),
+    Codificador("x265-fast", "libx265", "H.265/HEVC fast",
+                (22, 30, 36), opciones=["-preset", "fast", "-tag:v", "hvc1"], velocidad=0.45, tamaño=0.78,
+                dos_pasadas=True),
+    Codificador("x265-medium", "libx265", "H.265/HEVC medium",
+                (22, 30, 36), opciones=["-preset", "medium", "-tag:v", "hvc1"], velocidad=0.25, tamaño=0.70,
+                dos_pasadas=True),
+    Codificador("svtav1-10", "libsvtav1", "AV1 (SVT) preset 10, rápido",
+                (30, 40, 48), opciones=["-preset", "10"], velocidad=1.8, tamaño=0.85),
+    Codificador("svtav1-8", "libsvtav1", "AV1 (SVT) preset 8",
+                (28, 38, 46), opciones=["-preset", "8"], velocidad=1.1, tamaño=0.74),
+    Codificador("svtav1-5", "libsvtav1", "AV1 (SVT) preset 5, el más liviano",
+                (26, 36, 44), opciones=["-preset", "5"], velocidad=0.3, tamaño=0.64),
+    Codificador("vp9-rapido", "libvpx-vp9", "VP9 tiempo real",
+                (24, 36, 46), opciones=["-deadline", "realtime", "-cpu-used", "8", "-row-mt", "1"],
+                opciones_calidad=["-b:v", "0"], velocidad=1.6, tamaño=1.05, dos_pasadas=True),
+    Codificador("vp9-bueno", "libvpx-vp9", "VP9 calidad buena",
+                (24, 36, 46), opciones=["-deadline", "good", "-cpu-used", "2", "-row-mt", "1"],
+                opciones_calidad=["-b:v", "0"], velocidad=0.15, tamaño=0.76, dos_pasadas=True),
+    Codificador("nvenc-h264", "h264_nvenc", "H.264 por GPU NVIDIA",
+                (21, 29, 36), parametro_calidad="-cq", opciones=["-preset", "p5", "-rc", "vbr"],
+                opciones_calidad=["-b:v", "0"], velocidad=8.0, tamaño=1.25, hardware=True),
+    Codificador("nvenc-hevc", "hevc_nvenc", "H.265 por GPU NVIDIA",
+                (23, 31, 37), parametro_calidad="-cq",
+                opciones=["-preset", "p5", "-rc", "vbr", "-tag:v", "hvc1"], opciones_calidad=["-b:v", "0"],
+                velocidad=7.0, tamaño=0.90, hardware=True),
+    Codificador("qsv-h264", "h264_qsv", "H.264 por Intel Quick Sync",
+                (21, 29, 36), parametro_calidad="-global_quality", opciones=["-preset", "medium"],
+                velocidad=5.0, tamaño=1.20, hardware=True),
+)}
+
+
+# ==== Detección (una sola vez por ejecución) ====
+@lru_cache(maxsize=None)
+def encoders_compilados(ffmpeg_path, creationflags=0):
+    """Nombres de los encoders de video que trae el FFmpeg (vacío si FFmpeg no está disponible)"""
+    try:
+        salida = subprocess.run([ffmpeg_path, "-hide_banner", "-encoders"], capture_output=True, text=True,
+                                errors="replace", creationflags=creationflags)
+    except OSError:
+        return frozenset()
+    if salida.returncode != 0:
+        return frozenset()
+    return frozenset(PATRON_ENCODER.findall(salida.stdout))
+
+
+@lru_cache(maxsize=None)
+def hardware_funciona(ffmpeg_path, encoder, creationflags=0):
+    """Los encoders de GPU aparecen compilados aunque no haya GPU: se prueba con un fotograma sintético"""
+    try:
+        salida = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-v", "error", "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+             "-frames:v", "1", "-c:v", encoder, "-f", "null", "-"],
+            capture_output=True, timeout=20, creationflags=creationflags
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return salida.returncode == 0
+
+
+def codificadores_disponibles(ffmpeg_path, creationflags=0):
+    """Codificadores del catálogo que se pueden usar con este FFmpeg y esta máquina"""
+    compilados = encoders_compilados(ffmpeg_path, creationflags)
+    return {
+        nombre: codificador for nombre, codificador in CODIFICADORES.items()
+        if codificador.encoder in compilados
+        and (not codificador.hardware or hardware_funciona(ffmpeg_path, codificador.encoder, creationflags))
+    }
+
+
+@lru_cache(maxsize=None)
+def filtros_compilados(ffmpeg_path, creationflags=0):
+    """Nombres de los filtros de FFmpeg (para saber si hay ssim, libvmaf, etc.)"""
+    try:
+        salida = subprocess.run([ffmpeg_path, "-hide_banner", "-filters"], capture_output=True, text=True,
+                                errors="replace", creationflags=creationflags)
+    except OSError:
+        return frozenset()
+    return frozenset(re.findall(r"^\s*[TSC.]{2,3}\s+(\w+)\s", salida.stdout, re.MULTILINE))
+
+
+# ==== Mediciones y elección ====
+def cargar_mediciones(ruta=None):
+    """Velocidad y tamaño medidos en esta máquina: {"x264-medium": {"velocidad": 1.0, "tamaño": 1.0}, ...}"""
+    if ruta is None and os.path.exists(ARCHIVO_MEDICIONES):
+        ruta = ARCHIVO_MEDICIONES
+    if not ruta:
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_mediciones(mediciones, ruta=ARCHIVO_MEDICIONES):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(mediciones, f, ensure_ascii=False, indent=2)
+
+
+def elegir_codificador(objetivo, disponibles, mediciones=None):
+    """Nombre del codificador disponible más rápido o el de menor tamaño según el objetivo"""
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo desconocido: {objetivo} (usa {' o '.join(OBJETIVOS)})")
+    if not disponibles:
+        raise ValueError("No hay codificadores de video disponibles en este FFmpeg")
+    mediciones = mediciones or {}
+
+    def valor(nombre, clave):
+        return mediciones.get(nombre, {}).get(clave, getattr(disponibles[nombre], clave))
+
+    if objetivo == OBJETIVO_RAPIDO:
+        return max(disponibles, key=lambda nombre: (valor(nombre, "velocidad"), -valor(nombre, "tamaño")))
+    return min(disponibles, key=lambda nombre: (valor(nombre, "tamaño"), -valor(nombre, "velocidad")))
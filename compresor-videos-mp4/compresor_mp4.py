@@ -25,8 +25,19 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import webbrowser
 import platform
-import threading
 import sys
+import threading
+
+from motor_mp4 import (OUTPUT_DIR, ARCHIVO_DIARIO, CALIDADES, CALIDAD_POR_DEFECTO, PENDIENTE, PROCESANDO,
+                       TERMINADO, ERROR, CANCELADO, CODIFICADOR_POR_DEFECTO, CODIFICADORES, DESTINOS,
+                       DESTINO_POR_DEFECTO, OBJETIVOS, MODO_AUTO, MODO_AUDIO, MODO_COMPLETO, MODO_REMUX, ColaVideos,
+                       DiarioTrabajos, disponibles, formatear_segundos, metrica_disponible, previsualizar,
+                       verificar_ffmpeg)
+
+# ==== Modo carpeta vigilada (sin ventana): Compresor_MP4.exe --vigilar bandeja/ ====
+if __name__ == "__main__" and "--vigilar" in sys.argv[1:]:
+    import vigilante_mp4
+    sys.exit(vigilante_mp4.main([argumento for argumento in sys.argv[1:] if argumento != "--vigilar"]))
 
 # ==== Ruta segura para PyInstaller ====
 def ruta_recurso(relative_path):
@@ -38,40 +49,6 @@ def ruta_recurso(relative_path):
         # Cuando se ejecuta desde el script original
         return os.path.join(os.path.abspath("."), relative_path)
 
-# ==== Función para obtener la ruta de ffmpeg ====
-def obtener_ffmpeg_path():
-    """Obtiene la ruta correcta de ffmpeg para la aplicación portable"""
-    if hasattr(sys, '_MEIPASS'):
-        # Cuando está ejecutándose como exe empaquetado
-        ffmpeg_path = os.path.join(sys._MEIPASS, 'ffmpeg.exe')
-        if os.path.exists(ffmpeg_path):
-            return ffmpeg_path
-    else:
-        # Cuando está ejecutándose como script Python
-        # Buscar ffmpeg en el mismo directorio del script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        ffmpeg_path = os.path.join(script_dir, 'ffmpeg.exe')
-        if os.path.exists(ffmpeg_path):
-            return ffmpeg_path
-    
-    # Fallback: intentar usar ffmpeg del sistema
-    return 'ffmpeg'
-
-# ==== Función para verificar ffmpeg ====
-def verificar_ffmpeg():
-    """Verifica si ffmpeg está disponible"""
-    ffmpeg_path = obtener_ffmpeg_path()
-    try:
-        result = subprocess.run([ffmpeg_path, '-version'], 
-                              capture_output=True, 
-                              text=True,
-                              creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
-    except Exception:
-        return False
-
 # ==== Función para configurar ícono de manera segura ====
 def configurar_icono(ventana, nombre_icono="logo_miguel.ico"):
     """Configura el ícono de la ventana de manera segura"""
@@ -91,7 +68,6 @@ def configurar_icono(ventana, nombre_icono="logo_miguel.ico"):
         return False
 
 # ==== Carpeta de salida ====
-OUTPUT_DIR = "videos-comprimidos"
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
@@ -113,111 +89,234 @@ def abrir_carpeta():
     else:
         subprocess.run(["xdg-open", ruta_abs])
 
-# ==== Selección de archivo ====
+# ==== Selección de archivos ====
+# Varios videos se separan con ";" en el campo de texto
+SEPARADOR_ARCHIVOS = "; "
+
 def seleccionar_archivo():
-    archivo = filedialog.askopenfilename(filetypes=[("Archivos MP4", "*.mp4")])
-    if archivo:
+    archivos = filedialog.askopenfilenames(filetypes=[("Archivos MP4", "*.mp4")])
+    if archivos:
         entry_archivo.delete(0, tk.END)
-        entry_archivo.insert(0, archivo)
-
-# ==== Hilo de compresión ====
-def hilo_comprimir_video(archivo, crf, calidad, ventana_modal):
+        entry_archivo.insert(0, SEPARADOR_ARCHIVOS.join(archivos))
+
+# ==== Cola de compresión ====
+cola = None
+# El resumen final se muestra una sola vez por tanda: vuelve a False cuando se encolan videos
+cola_terminada = True
+# Diario en disco: si la aplicación se cierra a mitad de un lote, al volver a abrirla se puede reanudar
+diario = DiarioTrabajos(os.path.join(OUTPUT_DIR, ARCHIVO_DIARIO))
+
+def obtener_cola():
+    """Crea la cola la primera vez; las notificaciones llegan desde hilos de trabajo"""
+    global cola
+    if cola is None:
+        cola = ColaVideos(al_cambiar_estado=lambda trabajo, c: notificar_ventana(actualizar_estado_cola),
+                          al_progresar=lambda trabajo, evento: notificar_ventana(actualizar_progreso_cola),
+                          diario=diario)
+    return cola
+
+def notificar_ventana(funcion):
+    """Pasa la notificación al hilo de Tk; tras cerrar la ventana los avisos tardíos se descartan"""
     try:
-        size_original = os.path.getsize(archivo) / (1024 * 1024)
-
-        archivo_salida = os.path.join(
-            OUTPUT_DIR,
-            os.path.basename(archivo).replace(".mp4", f"_comprimido_{calidad.lower().split()[0]}.mp4")
-        )
-
-        # Usar la función para obtener la ruta correcta de ffmpeg
-        ffmpeg_path = obtener_ffmpeg_path()
-        
-        comando = [
-            ffmpeg_path, "-i", archivo,
-            "-vcodec", "libx264",
-            "-crf", crf,
-            "-preset", "medium",
-            "-y", archivo_salida
-        ]
-        
-        resultado = subprocess.run(
-            comando,
-            check=True,
-            capture_output=True,
-            text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+        ventana.after(0, funcion)
+    except (RuntimeError, tk.TclError):
+        pass
+
+def marcar_cola_activa():
+    global cola_terminada
+    cola_terminada = False
+
+def ofrecer_reanudar():
+    """Al abrir: si quedaron videos sin terminar en la sesión anterior, pregunta si continuar"""
+    pendientes = diario.pendientes()
+    if not pendientes:
+        return
+    tramos = sum(diario.tramos_listos(clave) for clave, _ in pendientes)
+    pasadas = sum(diario.pasadas_listas(clave) for clave, _ in pendientes)
+    nombres = "\n".join(f"• {os.path.basename(ajustes['archivo'])}" for _, ajustes in pendientes[:10])
+    if messagebox.askyesno(
+            "Reanudar compresión",
+            f"Quedaron {len(pendientes)} video(s) sin terminar de la sesión anterior:\n{nombres}\n\n"
+            + (f"Ya hay {tramos} tramo(s) codificados que no se repetirán.\n\n" if tramos else "")
+            + (f"{pasadas} video(s) ya tienen la primera pasada hecha.\n\n" if pasadas else "")
+            + "¿Continuar con ellos?"):
+        cola_actual = obtener_cola()
+        marcar_cola_activa()
+        cola_actual.reanudar()
+        cola_actual.iniciar()
+    else:
+        for clave, _ in pendientes:
+            diario.descartar(clave)
+
+def al_cerrar():
+    """Detiene los FFmpeg en curso (no quedan procesos huérfanos) y deja los trabajos para reanudar"""
+    global cola_terminada
+    if cola and (cola.conteo()[PENDIENTE] or cola.conteo()[PROCESANDO]):
+        if not messagebox.askyesno("Salir", "Hay videos en proceso. Se detendrán y podrás reanudarlos al "
+                                            "volver a abrir la aplicación.\n\n¿Salir?"):
+            return
+        cola_terminada = True  # los cancelados al cerrar no deben mostrar el resumen ni abrir la carpeta
+        cola.detener()
+    diario.cerrar()
+    ventana.destroy()
+
+def progreso_total():
+    """Porcentaje de la cola completa: los videos terminados cuentan 100 %, los en curso su avance"""
+    trabajos = [t for t in cola.trabajos.values() if t.estado != CANCELADO]
+    if not trabajos:
+        return 0.0
+    avance = 0.0
+    for trabajo in trabajos:
+        if trabajo.estado in (TERMINADO, ERROR):
+            avance += 100
+        elif trabajo.estado == PROCESANDO and trabajo.progreso:
+            avance += trabajo.progreso.porcentaje
+    return avance / len(trabajos)
+
+def actualizar_progreso_cola():
+    """Los avisos de progreso solo refrescan la barra: el fin de la cola lo decide un cambio de estado"""
+    if cola.conteo()[PENDIENTE] or cola.conteo()[PROCESANDO]:
+        actualizar_estado_cola()
+
+def actualizar_estado_cola():
+    global cola_terminada
+    conteo = cola.conteo()
+    en_curso = conteo[PENDIENTE] + conteo[PROCESANDO]
+    if en_curso:
+        barra_cola.config(value=progreso_total())
+        detalle = "\n".join(
+            f"🎞 {os.path.basename(t.archivo)}: {t.progreso.porcentaje:.0f}% · {t.progreso.fps:.0f} fps · "
+            f"{t.progreso.velocidad:.1f}x · Restante: {formatear_segundos(t.progreso.eta_segundos)}"
+            for t in cola.trabajos.values() if t.estado == PROCESANDO and t.progreso
         )
-
-        size_final = os.path.getsize(archivo_salida) / (1024 * 1024)
-
-        ventana_modal.destroy()
         label_estado.config(
-            text=f"✅ Video comprimido correctamente.\n🗂 Tamaño: {size_original:.1f} MB → {size_final:.1f} MB",
+            text=(f"🔄 Procesando: {conteo[PROCESANDO]} · En cola: {conteo[PENDIENTE]} · "
+                  f"Listos: {conteo[TERMINADO]} · Errores: {conteo[ERROR]}" + (f"\n{detalle}" if detalle else "")),
             font=("Segoe UI", 10, "bold"), fg="#F5B83A"
         )
+        return
+
+    # Avisos que quedaron encolados en Tk después de vaciarse la cola: el resumen ya se mostró
+    if cola_terminada:
+        return
+    cola_terminada = True
+    barra_cola.config(value=100 if conteo[TERMINADO] else 0)
+    resumen = cola.resumen()
+    label_estado.config(
+        text=(f"✅ Cola terminada: {resumen[TERMINADO]} listos, {resumen[ERROR]} con error, "
+              f"{resumen[CANCELADO]} cancelados.\n"
+              f"🗂 {resumen['bytes_originales'] / (1024 * 1024):.1f} MB → {resumen['bytes_finales'] / (1024 * 1024):.1f} MB · "
+              f"{resumen['videos_por_minuto']:.1f} videos/min · {resumen['mb_por_segundo']:.1f} MB/s\n"
+              f"♻ Copiados sin recodificar: {resumen['por_modo'][MODO_REMUX]} · "
+              f"Solo audio: {resumen['por_modo'][MODO_AUDIO]} · Recodificados: {resumen['por_modo'][MODO_COMPLETO]} · "
+              f"Pasadas: {resumen['pasadas']}"),
+        font=("Segoe UI", 10, "bold"), fg="#F5B83A"
+    )
+    fallidos = [t for t in cola.trabajos.values() if t.estado == ERROR]
+    if fallidos:
+        detalle = "\n".join(f"• {os.path.basename(t.archivo)}: {(t.error.splitlines() or [''])[-1]}" for t in fallidos)
+        messagebox.showerror("Error de FFmpeg", f"No se pudieron comprimir {len(fallidos)} video(s):\n{detalle}")
+    if resumen[TERMINADO]:
         abrir_carpeta()
 
-    except subprocess.CalledProcessError as e:
-        ventana_modal.destroy()
-        messagebox.showerror("Error de FFmpeg", f"Error al comprimir el video:\n{e.stderr if e.stderr else str(e)}")
-    except FileNotFoundError:
-        ventana_modal.destroy()
-        messagebox.showerror("Error", "No se encontró FFmpeg. Asegúrate de que esté incluido en la aplicación.")
+def cancelar_cola():
+    if cola:
+        cola.cancelar_todo()
+
+def reintentar_fallidos():
+    if not cola:
+        return
+    reintentables = [t for t in cola.trabajos.values() if t.estado in (ERROR, CANCELADO)]
+    if reintentables:
+        marcar_cola_activa()
+    for trabajo in reintentables:
+        cola.reintentar(trabajo.id)
+
+# ==== Codificadores ====
+def opciones_codificador():
+    """Texto del combo → objetivo o nombre del codificador; solo se listan los que trae FFmpeg"""
+    opciones = {
+        "⚡ Automático: el más rápido": OBJETIVOS[0],
+        "🪶 Automático: el más liviano": OBJETIVOS[1],
+    }
+    for nombre in disponibles() or [CODIFICADOR_POR_DEFECTO]:
+        opciones[CODIFICADORES[nombre].descripcion] = nombre
+    return opciones
+
+# ==== Vista previa por muestras ====
+def hilo_previsualizar(archivo, codificador, destino):
+    try:
+        metrica = "ssim" if metrica_disponible("ssim") else None
+        previas = previsualizar(archivo, metrica=metrica, codificador=codificador, escalado=destino)
+        lineas = []
+        for previa in previas:
+            puntaje = f" · SSIM {previa.puntaje:.3f}" if previa.puntaje is not None else ""
+            lineas.append(f"• {previa.calidad}: ~{previa.tamaño_estimado / (1024 * 1024):.1f} MB "
+                          f"({previa.proporcion:.0%}) en ~{formatear_segundos(previa.segundos_estimados)}{puntaje}")
+        texto = (f"{os.path.basename(archivo)} ({os.path.getsize(archivo) / (1024 * 1024):.1f} MB)\n\n"
+                 + "\n".join(lineas)
+                 + ("\n\nSSIM: 1.000 = idéntico al original; por encima de 0.95 la diferencia apenas se nota."
+                    if metrica else ""))
+        ventana.after(0, lambda: messagebox.showinfo("Vista previa de calidades", texto))
     except Exception as e:
-        ventana_modal.destroy()
-        messagebox.showerror("Error", f"Ocurrió un problema:\n{e}")
+        ventana.after(0, lambda: messagebox.showerror("Error", f"No se pudo generar la vista previa:\n{e}"))
     finally:
-        btn_comprimir.config(state=tk.NORMAL)
+        ventana.after(0, lambda: (btn_previa.config(state=tk.NORMAL), label_estado.config(text="")))
+
+def vista_previa():
+    archivos = [ruta.strip() for ruta in entry_archivo.get().split(";") if ruta.strip()]
+    if not archivos or not os.path.exists(archivos[0]):
+        messagebox.showerror("Error", "Seleccione un archivo MP4 válido.")
+        return
+    if not verificar_ffmpeg():
+        messagebox.showerror("Error", "FFmpeg no está disponible. La aplicación no puede comprimir videos sin FFmpeg.")
+        return
+
+    btn_previa.config(state=tk.DISABLED)
+    label_estado.config(text="🔎 Codificando muestras cortas en cada calidad...", font=("Segoe UI", 10, "bold"),
+                        fg="#F5B83A")
+    threading.Thread(target=hilo_previsualizar,
+                     args=(archivos[0], OPCIONES_CODIFICADOR[combo_codificador.get()],
+                           OPCIONES_DESTINO[combo_destino.get()]),
+                     daemon=True).start()
 
 # ==== Inicia compresión ====
 def comprimir_video():
-    archivo = entry_archivo.get()
-    if not archivo or not os.path.exists(archivo):
-        messagebox.showerror("Error", "Seleccione un archivo MP4 válido.")
+    archivos = [ruta.strip() for ruta in entry_archivo.get().split(";") if ruta.strip()]
+    if not archivos or not all(os.path.exists(archivo) for archivo in archivos):
+        messagebox.showerror("Error", "Seleccione uno o más archivos MP4 válidos.")
         return
 
-    # Verificar que ffmpeg esté disponible antes de comprimir
+    tamaño_objetivo_mb = None
+    if var_tamaño.get():
+        try:
+            tamaño_objetivo_mb = float(entry_tamaño.get().replace(",", "."))
+        except ValueError:
+            tamaño_objetivo_mb = 0
+        if tamaño_objetivo_mb <= 0:
+            messagebox.showerror("Error", "Ingrese un tamaño máximo válido en MB (por ejemplo 16).")
+            return
+
+    # Verificar que ffmpeg esté disponible antes de comprimir (consulta en caché, no lanza un proceso por clic)
     if not verificar_ffmpeg():
         messagebox.showerror("Error", "FFmpeg no está disponible. La aplicación no puede comprimir videos sin FFmpeg.")
         return
 
-    calidad = combo_calidad.get()
-    crf = {
-        "Alta calidad (mayor peso)": "20",
-        "Media calidad": "28",
-        "Alta compresión (menor peso)": "35"
-    }.get(calidad, "28")
-
-    modal = tk.Toplevel(ventana)
-    modal.title("Comprimiendo...")
-    
-    # Configurar ícono para la ventana modal
-    configurar_icono(modal)
-    
-    modal.geometry("360x100")
-    modal.configure(bg="#003DA6")
-    modal.resizable(False, False)
-    modal.grab_set()
-    modal.transient(ventana)
-    centrar_ventana(modal, 360, 100)
-
-    tk.Label(modal, text="🔄 Comprimiendo video, por favor espere...",
-             font=("Segoe UI", 10), fg="white", bg="#003DA6").pack(pady=10)
-
-    barra = ttk.Progressbar(modal, mode="indeterminate", length=300)
-    barra.pack(pady=5)
-    barra.start(10)
-
-    btn_comprimir.config(state=tk.DISABLED)
-    label_estado.config(text="")
-
-    hilo = threading.Thread(
-        target=hilo_comprimir_video,
-        args=(archivo, crf, calidad, modal),
-        daemon=True
-    )
-    hilo.start()
+    # El botón sigue activo: los videos nuevos se suman a la cola en curso
+    cola_actual = obtener_cola()
+    prioridad = 1 if var_prioritario.get() else 0
+    codificador = OPCIONES_CODIFICADOR[combo_codificador.get()]
+    modo = MODO_COMPLETO if var_recodificar.get() else MODO_AUTO
+    destino = OPCIONES_DESTINO[combo_destino.get()]
+    # Cada tramo usa un hilo: los procesos por video reemplazan a los hilos que tendría un solo FFmpeg
+    segmentos = max(2, cola_actual.hilos_por_trabajo) if var_segmentos.get() else None
+    marcar_cola_activa()
+    for archivo in archivos:
+        cola_actual.agregar(archivo, combo_calidad.get(), prioridad, codificador=codificador, modo=modo,
+                            tamaño_objetivo_mb=tamaño_objetivo_mb, segmentos=segmentos, escalado=destino,
+                            miniaturas=var_miniaturas.get())
+    cola_actual.iniciar()
+    entry_archivo.delete(0, tk.END)
 
 # ==== Ventana principal ====
 ventana = tk.Tk()
@@ -227,13 +326,14 @@ ventana.title("Compresor de Videos MP4 - Miguel Ramos A.")
 configurar_icono(ventana)
 
 ventana.configure(bg="#003DA6")
-centrar_ventana(ventana, 650, 400)
+centrar_ventana(ventana, 650, 780)
+ventana.protocol("WM_DELETE_WINDOW", al_cerrar)
 ventana.resizable(False, False)
 
 fuente = ("Segoe UI", 11)
 fuente_boton = ("Segoe UI", 10, "bold")
 
-tk.Label(ventana, text="📁 Seleccione un archivo MP4 para comprimir:",
+tk.Label(ventana, text="📁 Seleccione uno o más archivos MP4 para comprimir:",
          font=fuente, bg="#003DA6", fg="white").pack(pady=(20, 5))
 
 frame_input = tk.Frame(ventana, bg="#003DA6")
@@ -251,17 +351,56 @@ tk.Label(ventana, text="📉 Seleccione el nivel de calidad:",
 
 combo_calidad = ttk.Combobox(
     ventana,
-    values=[
-        "Alta calidad (mayor peso)",
-        "Media calidad",
-        "Alta compresión (menor peso)"
-    ],
+    values=list(CALIDADES),
     state="readonly",
     font=fuente
 )
-combo_calidad.set("Media calidad")
+combo_calidad.set(CALIDAD_POR_DEFECTO)
 combo_calidad.pack()
 
+# Tamaño máximo: reemplaza al nivel de calidad (p. ej. 16 MB para un adjunto)
+frame_tamaño = tk.Frame(ventana, bg="#003DA6")
+frame_tamaño.pack(pady=(6, 0))
+
+var_tamaño = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    frame_tamaño,
+    text="🎯 No superar",
+    variable=var_tamaño,
+    font=("Segoe UI", 9),
+    fg="white",
+    bg="#003DA6",
+    selectcolor="#003DA6",
+    activebackground="#003DA6",
+    activeforeground="white"
+).pack(side=tk.LEFT)
+
+entry_tamaño = tk.Entry(frame_tamaño, width=6, font=("Segoe UI", 10), bd=1, relief="solid", fg="#000")
+entry_tamaño.insert(0, "16")
+entry_tamaño.pack(side=tk.LEFT, padx=(0, 4))
+
+tk.Label(frame_tamaño, text="MB (dos pasadas, ignora la calidad)", font=("Segoe UI", 9),
+         fg="white", bg="#003DA6").pack(side=tk.LEFT)
+
+tk.Label(ventana, text="🎛 Codificador:", font=("Segoe UI", 10), bg="#003DA6", fg="white").pack(pady=(8, 2))
+
+# Los encoders de FFmpeg se consultan una sola vez al abrir la aplicación
+OPCIONES_CODIFICADOR = opciones_codificador()
+combo_codificador = ttk.Combobox(ventana, values=list(OPCIONES_CODIFICADOR), state="readonly", width=40,
+                                 font=("Segoe UI", 10))
+combo_codificador.set(CODIFICADORES[CODIFICADOR_POR_DEFECTO].descripcion)
+combo_codificador.pack()
+
+tk.Label(ventana, text="📐 Destino (resolución y fps máximos):", font=("Segoe UI", 10), bg="#003DA6",
+         fg="white").pack(pady=(8, 2))
+
+# Solo reduce: un video que ya está por debajo del límite conserva su resolución y fps
+OPCIONES_DESTINO = {escalado.descripcion: nombre for nombre, escalado in DESTINOS.items()}
+combo_destino = ttk.Combobox(ventana, values=list(OPCIONES_DESTINO), state="readonly", width=40,
+                             font=("Segoe UI", 10))
+combo_destino.set(DESTINOS[DESTINO_POR_DEFECTO].descripcion)
+combo_destino.pack()
+
 tk.Label(
     ventana,
     text="🛈 A mayor calidad, mayor tamaño del archivo. A mayor compresión, menor calidad visual.",
@@ -273,7 +412,75 @@ tk.Label(
 btn_comprimir = tk.Button(ventana, text="🔽 Comprimir Video", font=fuente_boton,
                           bg="#4A90E2", fg="white", activebackground="#3c78c9",
                           relief="flat", cursor="hand2", command=comprimir_video)
-btn_comprimir.pack(pady=(0, 10))
+btn_comprimir.pack(pady=(0, 5))
+
+btn_previa = tk.Button(ventana, text="👁 Vista previa: tamaño y tiempo por calidad", font=("Segoe UI", 9),
+                       bg="white", fg="#003DA6", activebackground="#d9d9d9", relief="ridge", cursor="hand2",
+                       command=vista_previa)
+btn_previa.pack(pady=(0, 5))
+
+var_prioritario = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    ventana,
+    text="⚡ Prioritario (se procesa antes que lo que ya está en cola)",
+    variable=var_prioritario,
+    font=("Segoe UI", 9),
+    fg="white",
+    bg="#003DA6",
+    selectcolor="#003DA6",
+    activebackground="#003DA6",
+    activeforeground="white"
+).pack(pady=(0, 5))
+
+# Videos de más de 5 minutos: tramos por keyframes codificados en paralelo y unidos sin pérdida
+var_segmentos = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    ventana,
+    text="🧩 Repartir videos largos entre todos los núcleos",
+    variable=var_segmentos,
+    font=("Segoe UI", 9),
+    fg="white",
+    bg="#003DA6",
+    selectcolor="#003DA6",
+    activebackground="#003DA6",
+    activeforeground="white"
+).pack(pady=(0, 5))
+
+# Por defecto los videos que ya están bien comprimidos solo se copian (segundos en lugar de minutos)
+var_recodificar = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    ventana,
+    text="🔁 Recodificar siempre (aunque el video ya esté comprimido)",
+    variable=var_recodificar,
+    font=("Segoe UI", 9),
+    fg="white",
+    bg="#003DA6",
+    selectcolor="#003DA6",
+    activebackground="#003DA6",
+    activeforeground="white"
+).pack(pady=(0, 5))
+
+# Póster y hoja de contactos junto al MP4 comprimido (solo se leen unos keyframes, no el video entero)
+var_miniaturas = tk.BooleanVar(value=False)
+tk.Checkbutton(
+    ventana,
+    text="🖼 Guardar póster y hoja de contactos de cada video",
+    variable=var_miniaturas,
+    font=("Segoe UI", 9),
+    fg="white",
+    bg="#003DA6",
+    selectcolor="#003DA6",
+    activebackground="#003DA6",
+    activeforeground="white"
+).pack(pady=(0, 5))
+
+frame_cola = tk.Frame(ventana, bg="#003DA6")
+frame_cola.pack(pady=(0, 10))
+
+tk.Button(frame_cola, text="⏹ Cancelar cola", font=("Segoe UI", 9), bg="white", fg="#003DA6",
+          relief="ridge", cursor="hand2", command=cancelar_cola).pack(side=tk.LEFT, padx=5)
+tk.Button(frame_cola, text="↻ Reintentar fallidos", font=("Segoe UI", 9), bg="white", fg="#003DA6",
+          relief="ridge", cursor="hand2", command=reintentar_fallidos).pack(side=tk.LEFT, padx=5)
 
 btn_abrir_carpeta = tk.Button(
     ventana,
@@ -288,6 +495,9 @@ btn_abrir_carpeta = tk.Button(
 )
 btn_abrir_carpeta.pack(pady=(0, 10))
 
+barra_cola = ttk.Progressbar(ventana, mode="determinate", maximum=100, length=300)
+barra_cola.pack(pady=(0, 5))
+
 label_estado = tk.Label(ventana, text="", font=("Segoe UI", 10), fg="white", bg="#003DA6")
 label_estado.pack()
 
@@ -319,5 +529,6 @@ if __name__ == "__main__":
     # Verificar ffmpeg al inicio
     if not verificar_ffmpeg():
         print("Advertencia: FFmpeg no detectado. Asegúrate de incluirlo en el build.")
-    
+
+    ventana.after(300, ofrecer_reanudar)
     ventana.mainloop()
\ No newline at end of file
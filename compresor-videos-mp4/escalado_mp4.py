@@ -0,0 +1,87 @@
+# ================================================================
+# 📐 ESCALADO DE RESOLUCIÓN Y FOTOGRAMAS
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Límites de resolución y fps según el destino del video
+#              (web, mensajería...). Se aplican con -vf antes del
+#              codificador y solo reducen: un video de 720p no se agranda.
+#              Menos píxeles por fotograma = codificación más rápida y
+#              archivos mucho más pequeños.
+#
+# El límite de "alto" se aplica al lado corto, así un video vertical de
+# celular (1080x1920) con límite 720 queda en 720x1280 y no en 405x720.
+# Licencia: MIT
+# ================================================================
+
+from dataclasses import dataclass, replace
+
+# Algoritmos de escalado de FFmpeg (sws_flags)
+ESCALADORES = {
+    "rapido": "fast_bilinear",
+    "equilibrado": "bicubic",
+    "calidad": "lanczos",
+}
+
+
+@dataclass
+class Escalado:
+    """Límite de lado corto y de fps, con el algoritmo de escalado"""
+    nombre: str
+    descripcion: str
+    alto_maximo: int = None
+    fps_maximo: float = None
+    escalador: str = "equilibrado"
+
+    def necesita_escalar(self, ancho, alto):
+        return bool(self.alto_maximo and ancho and alto and min(ancho, alto) > self.alto_maximo)
+
+    def necesita_reducir_fps(self, fps):
+        return bool(self.fps_maximo and fps and fps > self.fps_maximo + 0.01)
+
+    def cambia(self, info):
+        """Indica si el escalado modifica el video (si no, se puede copiar sin recodificar)"""
+        if info is None:
+            return bool(self.alto_maximo or self.fps_maximo)
+        return self.necesita_escalar(info.ancho, info.alto) or self.necesita_reducir_fps(info.fps)
+
+    def filtro(self, info=None):
+        """Cadena para -vf, o None si no hay nada que cambiar; sin `info` se aplican los límites siempre"""
+        filtros = []
+        if self.alto_maximo and (info is None or self.necesita_escalar(info.ancho, info.alto)):
+            lado = self.alto_maximo
+            filtros.append(f"scale=w='if(gte(iw,ih),-2,min(iw,{lado}))':h='if(gte(iw,ih),min(ih,{lado}),-2)'"
+                           f":flags={ESCALADORES[self.escalador]}")
+        if self.fps_maximo and (info is None or self.necesita_reducir_fps(info.fps)):
+            filtros.append(f"fps={self.fps_maximo:g}")
+        return ",".join(filtros) or None
+
+    def resumen(self, info):
+        """Texto corto con el cambio aplicado, p. ej. "2160p→1080p, 60→30 fps" """
+        cambios = []
+        if self.necesita_escalar(info.ancho, info.alto):
+            cambios.append(f"{min(info.ancho, info.alto)}p→{self.alto_maximo}p")
+        if self.necesita_reducir_fps(info.fps):
+            cambios.append(f"{info.fps:.0f}→{self.fps_maximo:g} fps")
+        return ", ".join(cambios)
+
+
+DESTINOS = {e.nombre: e for e in (
+    Escalado("original", "Original (sin escalar)"),
+    Escalado("web", "Web (máx. 1080p, 30 fps)", 1080, 30),
+    Escalado("mensajeria", "Mensajería (máx. 720p, 30 fps)", 720, 30),
+    Escalado("liviano", "Liviano (máx. 480p, 24 fps)", 480, 24, "rapido"),
+)}
+DESTINO_POR_DEFECTO = "web"
+
+
+def resolver_escalado(escalado=None, alto_maximo=None, fps_maximo=None, escalador=None):
+    """Acepta un nombre de destino o un Escalado; los demás argumentos reemplazan sus límites"""
+    if escalado is None or isinstance(escalado, str):
+        nombre = escalado or "original"
+        if nombre not in DESTINOS:
+            raise ValueError(f"Destino desconocido: {nombre} (usa {', '.join(DESTINOS)})")
+        escalado = DESTINOS[nombre]
+    cambios = {clave: valor for clave, valor in (("alto_maximo", alto_maximo), ("fps_maximo", fps_maximo),
+                                                 ("escalador", escalador)) if valor}
+    return replace(escalado, **cambios) if cambios else escalado
@@ -0,0 +1,1641 @@
+# ================================================================
+# ⚙️ MOTOR DE COMPRESIÓN MP4 (SIN INTERFAZ GRÁFICA)
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Lógica de compresión con FFmpeg y cola de trabajos con
+#              concurrencia configurable, reutilizable desde la app de
+#              escritorio, scripts o servidores sin pantalla.
+#
+# Uso desde consola (dentro de la carpeta compresor-videos-mp4):
+#   python -m motor_mp4 video.mp4
+#   python -m motor_mp4 grabaciones/ --concurrencia 3 --hilos 4
+#   python -m motor_mp4 "sesiones/**/*.mp4" --calidad 35 --reintentos 1
+#   python -m motor_mp4 largo.mp4 --progreso --registro progreso.jsonl
+#   python -m motor_mp4 sesiones/ --codificador rapido
+#   python -m motor_mp4 sesiones/ --analizar        (solo muestra qué haría con cada video)
+#   python -m motor_mp4 --reanudar                  (continúa lo que quedó a medias; Ctrl+C detiene)
+#   python -m motor_mp4 sesiones/ --miniaturas      (póster y hoja de contactos junto a cada resultado)
+#   python -m motor_mp4 reunion.mp4 --tamaño-mb 16   (dos pasadas para no pasar de 16 MB)
+#   python -m motor_mp4 clase-3h.mp4 --segmentos 8    (un video largo repartido entre núcleos)
+#   python -m motor_mp4 charla.mp4 --previsualizar --metrica ssim
+#   python -m motor_mp4 celular-4k.mp4 --destino mensajeria --escalador rapido
+#   python -m motor_mp4 muestra.mp4 --medir-codificadores
+#
+# Licencia: MIT
+# ================================================================
+
+import argparse
+import concurrent.futures
+import contextlib
+import glob
+import itertools
+import json
+import math
+import os
+import platform
+import queue
+import re
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field, is_dataclass, replace
+
+from codificadores_mp4 import (CODIFICADORES, CODIFICADOR_POR_DEFECTO, OBJETIVOS, cargar_mediciones,
+                               codificadores_disponibles, elegir_codificador, encoders_compilados,
+                               filtros_compilados, guardar_mediciones)
+from escalado_mp4 import DESTINOS, DESTINO_POR_DEFECTO, ESCALADORES, Escalado, resolver_escalado
+
+# ==== Configuración general ====
+OUTPUT_DIR = "videos-comprimidos"
+
+CALIDADES = {
+    "Alta calidad (mayor peso)": "20",
+    "Media calidad": "28",
+    "Alta compresión (menor peso)": "35"
+}
+CALIDAD_POR_DEFECTO = "Media calidad"
+
+# Alias para la consola: el valor CRF
+CALIDADES_CLI = {crf: etiqueta for etiqueta, crf in CALIDADES.items()}
+
+# Modos de procesamiento que decide el análisis con ffprobe
+MODO_AUTO = "auto"
+MODO_REMUX = "remux"              # solo se copia (-c copy) y se mueve el índice al inicio
+MODO_AUDIO = "solo_audio"         # el video se copia y solo se recodifica el audio
+MODO_COMPLETO = "recodificar"     # codificación completa
+NOTAS_MODO = {
+    MODO_REMUX: " (copiado sin recodificar)",
+    MODO_AUDIO: " (solo se recodificó el audio)",
+    MODO_COMPLETO: "",
+}
+
+# Bits por píxel y fotograma que deja x264 en cada nivel (alta calidad, media, alta compresión)
+BPP_OBJETIVO = (0.10, 0.05, 0.025)
+# Si el video ya está hasta un 20 % por encima del objetivo, recodificar no compensa
+MARGEN_REMUX = 1.2
+# Códecs que se pueden copiar a MP4 sin recodificar
+CODECS_VIDEO_EFICIENTES = {"h264", "hevc", "av1", "vp9"}
+CODECS_AUDIO_COPIABLES = {"aac", "mp3"}
+# Audio AAC de destino y máximo aceptable (kbit/s por cada 2 canales)
+AUDIO_KBPS = 128
+AUDIO_MAX_KBPS = 192
+ARGUMENTOS_AUDIO = ["-c:a", "aac", "-b:a", f"{AUDIO_KBPS}k"]
+
+# Modo tamaño objetivo: reserva para la estructura del MP4 y el error del control de bitrate
+MARGEN_CONTENEDOR = 0.03
+# Los codificadores de una sola pasada se desvían más del bitrate pedido
+MARGEN_UNA_PASADA = 0.07
+# Fracción máxima del presupuesto que puede llevarse el audio
+FRACCION_AUDIO = 0.15
+AUDIO_MIN_KBPS = 32
+VIDEO_MIN_KBPS = 60
+
+# Modo por segmentos: solo para videos largos, con tramos de al menos un minuto
+DURACION_MINIMA_SEGMENTOS = 300
+SEGUNDOS_MINIMOS_SEGMENTO = 60
+# Tramos por proceso: más de uno equilibra la carga si algunos tramos son más difíciles
+SEGMENTOS_POR_PROCESO = 2
+
+# Vista previa: tramos cortos repartidos a lo largo del video
+MUESTRAS_PREVIA = 4
+SEGUNDOS_MUESTRA = 4
+METRICAS = {"ssim": "ssim", "vmaf": "libvmaf"}
+PATRON_SSIM = re.compile(r"SSIM .*All:([\d.]+)")
+PATRON_VMAF = re.compile(r"VMAF score[:=]\s*([\d.]+)")
+
+# Póster y hoja de contactos: cuadros tomados con -ss antes de -i, decodificando solo keyframes
+CUADROS_HOJA = 12
+COLUMNAS_HOJA = 4
+ANCHO_MINIATURA = 320
+ANCHO_POSTER = 1280
+# El póster se toma al 10 % del video (los primeros segundos suelen ser negro o un título)
+POSICION_POSTER = 0.1
+
+# Diario de trabajos (dentro de la carpeta de salida) y carpeta con los tramos de los trabajos a medias
+ARCHIVO_DIARIO = "diario-trabajos.jsonl"
+CARPETA_EN_CURSO = ".en-curso"
+
+# Estados de un trabajo de la cola
+PENDIENTE = "pendiente"
+PROCESANDO = "procesando"
+TERMINADO = "terminado"
+ERROR = "error"
+CANCELADO = "cancelado"
+
+
+class TrabajoCancelado(Exception):
+    """Se lanzó cuando el proceso de FFmpeg fue detenido a pedido del usuario"""
+
+
+@dataclass
+class EventoProgreso:
+    """Estado de una codificación según la salida de -progress de FFmpeg"""
+    archivo: str
+    segundos_procesados: float
+    duracion: float
+    fps: float
+    velocidad: float
+    bitrate_kbps: float
+    tamaño_actual: int
+    eta_segundos: float
+    terminado: bool = False
+
+    @property
+    def porcentaje(self):
+        if not self.duracion:
+            return 0.0
+        return min(100.0, 100 * self.segundos_procesados / self.duracion)
+
+
+@dataclass
+class ResultadoVideo:
+    """Resultado de comprimir un video"""
+    archivo: str
+    archivo_salida: str
+    tamaño_original: int
+    tamaño_final: int
+    segundos: float
+    codificador: str = CODIFICADOR_POR_DEFECTO
+    modo: str = MODO_COMPLETO
+    motivo: str = ""
+    pasadas: int = 1
+    # Póster y hoja de contactos, si se pidieron
+    imagenes: list = field(default_factory=list)
+
+    @property
+    def bytes_ahorrados(self):
+        return self.tamaño_original - self.tamaño_final
+
+
+# ==== Rutas de FFmpeg ====
+def obtener_ffmpeg_path():
+    """Obtiene la ruta correcta de ffmpeg para la aplicación portable"""
+    if hasattr(sys, '_MEIPASS'):
+        # Cuando está ejecutándose como exe empaquetado
+        ffmpeg_path = os.path.join(sys._MEIPASS, 'ffmpeg.exe')
+        if os.path.exists(ffmpeg_path):
+            return ffmpeg_path
+    else:
+        # Cuando está ejecutándose como script Python
+        # Buscar ffmpeg en el mismo directorio del script
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        ffmpeg_path = os.path.join(script_dir, 'ffmpeg.exe')
+        if os.path.exists(ffmpeg_path):
+            return ffmpeg_path
+
+    # Fallback: intentar usar ffmpeg del sistema
+    return 'ffmpeg'
+
+
+def obtener_ffprobe_path():
+    """ffprobe se distribuye junto a ffmpeg; se busca en el mismo lugar"""
+    ffmpeg_path = obtener_ffmpeg_path()
+    if ffmpeg_path == 'ffmpeg':
+        return 'ffprobe'
+    return os.path.join(os.path.dirname(ffmpeg_path), 'ffprobe.exe')
+
+
+def flags_creacion():
+    """Evita que se abra una consola por cada proceso en Windows"""
+    return subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+
+
+def verificar_ffmpeg():
+    """Verifica si ffmpeg está disponible (la consulta de encoders se hace una sola vez y queda en caché)"""
+    return bool(encoders_compilados(obtener_ffmpeg_path(), flags_creacion()))
+
+
+def disponibles():
+    """Codificadores del catálogo utilizables con el FFmpeg actual"""
+    return codificadores_disponibles(obtener_ffmpeg_path(), flags_creacion())
+
+
+def resolver_codificador(codificador=None):
+    """Acepta un nombre del catálogo, un objetivo ("rapido"/"pequeño") o None (x264 medium)"""
+    if isinstance(codificador, str) and codificador in OBJETIVOS:
+        codificador = elegir_codificador(codificador, disponibles(), cargar_mediciones())
+    nombre = codificador or CODIFICADOR_POR_DEFECTO
+    if nombre not in CODIFICADORES:
+        raise ValueError(f"Codificador desconocido: {nombre}")
+    if nombre != CODIFICADOR_POR_DEFECTO and nombre not in disponibles():
+        raise ValueError(f"El codificador {nombre} no está disponible en este FFmpeg")
+    return CODIFICADORES[nombre]
+
+
+def nombre_salida(archivo, calidad, carpeta_salida=OUTPUT_DIR):
+    """Genera la ruta del video comprimido dentro de la carpeta de salida"""
+    nombre_base = os.path.splitext(os.path.basename(archivo))[0]
+    return os.path.join(carpeta_salida, f"{nombre_base}_comprimido_{calidad.lower().split()[0]}.mp4")
+
+
+# ==== Lectura de metadatos ====
+@dataclass
+class InfoVideo:
+    """Datos del archivo según ffprobe (bitrates en kbit/s)"""
+    archivo: str
+    duracion: float = 0.0
+    bitrate_total: float = 0.0
+    codec_video: str = ""
+    bitrate_video: float = 0.0
+    ancho: int = 0
+    alto: int = 0
+    fps: float = 0.0
+    codec_audio: str = ""
+    bitrate_audio: float = 0.0
+    canales: int = 0
+    moov_al_inicio: bool = False
+
+    @property
+    def bits_por_pixel(self):
+        """Bits por píxel y fotograma del video (la medida que compara bitrates entre resoluciones)"""
+        pixeles = self.ancho * self.alto * self.fps
+        return self.bitrate_video * 1000 / pixeles if pixeles else 0.0
+
+
+def fraccion(texto):
+    """Convierte "30000/1001" o "25" a float"""
+    numerador, _, denominador = (texto or "0").partition("/")
+    try:
+        return float(numerador) / float(denominador or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def moov_al_inicio(archivo):
+    """Recorre las cajas de primer nivel del MP4: True si el índice (moov) está antes de los datos (mdat)"""
+    try:
+        with open(archivo, "rb") as f:
+            for _ in range(64):
+                cabecera = f.read(8)
+                if len(cabecera) < 8:
+                    return False
+                tamaño, tipo = struct.unpack(">I4s", cabecera)
+                if tipo == b"moov":
+                    return True
+                if tipo == b"mdat" or tamaño == 0:
+                    return False
+                if tamaño == 1:
+                    tamaño = struct.unpack(">Q", f.read(8))[0] - 8
+                f.seek(tamaño - 8, os.SEEK_CUR)
+    except (OSError, struct.error):
+        pass
+    return False
+
+
+def sondear_video(archivo, ffprobe_path=None):
+    """Lee códecs, bitrates, resolución y duración con ffprobe (None si ffprobe no está disponible)"""
+    try:
+        salida = subprocess.run(
+            [ffprobe_path or obtener_ffprobe_path(), "-v", "error", "-show_format", "-show_streams",
+             "-of", "json", archivo],
+            capture_output=True, text=True, errors="replace", creationflags=flags_creacion()
+        )
+        datos = json.loads(salida.stdout)
+    except (OSError, ValueError):
+        return None
+    formato = datos.get("format", {})
+    info = InfoVideo(
+        archivo=archivo,
+        duracion=fraccion(formato.get("duration")),
+        bitrate_total=fraccion(formato.get("bit_rate")) / 1000,
+        moov_al_inicio=moov_al_inicio(archivo)
+    )
+    for stream in datos.get("streams", []):
+        if stream.get("codec_type") == "video" and not info.codec_video:
+            if stream.get("disposition", {}).get("attached_pic"):
+                continue  # carátula incrustada, no es el video
+            info.codec_video = stream.get("codec_name", "")
+            info.ancho = int(stream.get("width") or 0)
+            info.alto = int(stream.get("height") or 0)
+            info.fps = fraccion(stream.get("avg_frame_rate")) or fraccion(stream.get("r_frame_rate"))
+            info.bitrate_video = fraccion(stream.get("bit_rate")) / 1000
+        elif stream.get("codec_type") == "audio" and not info.codec_audio:
+            info.codec_audio = stream.get("codec_name", "")
+            info.bitrate_audio = fraccion(stream.get("bit_rate")) / 1000
+            info.canales = int(stream.get("channels") or 2)
+    if not info.bitrate_video and info.bitrate_total:
+        info.bitrate_video = max(0.0, info.bitrate_total - info.bitrate_audio)
+    return info
+
+
+def audio_aceptable(info):
+    """El audio se puede copiar tal cual: códec compatible y bitrate razonable (o no hay audio)"""
+    if not info.codec_audio:
+        return True
+    limite = AUDIO_MAX_KBPS * max(1, info.canales / 2)
+    return info.codec_audio in CODECS_AUDIO_COPIABLES and 0 < info.bitrate_audio <= limite
+
+
+def decidir_modo(info, nivel, codificador, escalado=None):
+    """Elige remux, solo audio o codificación completa y retorna (modo, motivo)"""
+    if info is None or not info.codec_video:
+        return MODO_COMPLETO, "sin datos de ffprobe"
+    if escalado and escalado.cambia(info):
+        return MODO_COMPLETO, f"se reduce {escalado.resumen(info)}"
+    objetivo = BPP_OBJETIVO[nivel] * codificador.tamaño
+    video_aceptable = (info.codec_video in CODECS_VIDEO_EFICIENTES
+                       and 0 < info.bits_por_pixel <= objetivo * MARGEN_REMUX)
+    if not video_aceptable:
+        return MODO_COMPLETO, (f"video {info.codec_video} a {info.bits_por_pixel:.3f} bpp "
+                               f"(objetivo {objetivo:.3f})")
+    if audio_aceptable(info):
+        indice = "" if info.moov_al_inicio else "; se mueve el índice al inicio"
+        return MODO_REMUX, f"video {info.codec_video} ya en {info.bits_por_pixel:.3f} bpp y audio aceptable{indice}"
+    return MODO_AUDIO, (f"video {info.codec_video} ya en {info.bits_por_pixel:.3f} bpp; "
+                        f"audio {info.codec_audio} a {info.bitrate_audio:.0f} kbit/s")
+
+
+# ==== Compresión de un video ====
+def argumentos_filtro(filtro_video):
+    """-vf con el escalado (va antes del codificador), o nada si no hay que cambiar el video"""
+    return ["-vf", filtro_video] if filtro_video else []
+
+
+def construir_comando(ffmpeg_path, archivo, archivo_salida, codificador, nivel, hilos=None, opciones=(),
+                      modo=MODO_COMPLETO, copiar_audio=False, filtro_video=None):
+    """Arma la línea de comandos de FFmpeg para el modo, el codificador y el nivel de calidad (0, 1 o 2)"""
+    if modo == MODO_REMUX:
+        argumentos = ["-c", "copy"]
+    elif modo == MODO_AUDIO:
+        argumentos = ["-c:v", "copy", *ARGUMENTOS_AUDIO]
+    else:
+        argumentos = [*argumentos_filtro(filtro_video), *codificador.argumentos(nivel, hilos),
+                      *(["-c:a", "copy"] if copiar_audio else ARGUMENTOS_AUDIO)]
+    # +faststart deja el índice al inicio: el video empieza a reproducirse antes de descargarse completo
+    return [ffmpeg_path, "-i", archivo, *argumentos, "-movflags", "+faststart", *opciones, "-y", archivo_salida]
+
+
+def numero(valor, sufijo=""):
+    """Convierte un valor de -progress ("2.3x", "1500.2kbits/s", "N/A") a float"""
+    try:
+        valor = valor.strip()
+        return float(valor[:-len(sufijo)] if sufijo and valor.endswith(sufijo) else valor)
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def evento_desde_bloque(bloque, archivo, duracion, segundos):
+    """Arma un EventoProgreso con las claves de un bloque de -progress"""
+    microsegundos = bloque.get("out_time_us") or bloque.get("out_time_ms")
+    procesados = max(0.0, numero(microsegundos) / 1_000_000)
+    velocidad = numero(bloque.get("speed"), "x")
+    if not velocidad and segundos:
+        velocidad = procesados / segundos
+    restante = max(0.0, duracion - procesados)
+    terminado = bloque.get("progress") == "end"
+    return EventoProgreso(
+        archivo=archivo,
+        segundos_procesados=duracion if terminado and duracion else procesados,
+        duracion=duracion,
+        fps=numero(bloque.get("fps")),
+        velocidad=velocidad,
+        bitrate_kbps=numero(bloque.get("bitrate"), "kbits/s"),
+        tamaño_actual=int(numero(bloque.get("total_size"))),
+        eta_segundos=0.0 if terminado else (restante / velocidad if velocidad else 0.0),
+        terminado=terminado
+    )
+
+
+def ejecutar_ffmpeg(comando, al_iniciar_proceso=None, archivo="", duracion=0.0, al_progresar=None):
+    """Ejecuta FFmpeg leyendo -progress por stdout; de stderr solo guarda las últimas líneas"""
+    comando = [comando[0], "-nostats", "-progress", "pipe:1", *comando[1:]]
+    proceso = subprocess.Popen(comando, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True, errors="replace",
+                               creationflags=flags_creacion())
+    if al_iniciar_proceso:
+        al_iniciar_proceso(proceso)
+
+    # stderr se vacía en otro hilo para que ninguna tubería se llene y bloquee a FFmpeg
+    ultimas_lineas = deque(maxlen=40)
+    lector_errores = threading.Thread(target=lambda: ultimas_lineas.extend(l.rstrip() for l in proceso.stderr),
+                                      daemon=True)
+    lector_errores.start()
+
+    inicio = time.perf_counter()
+    bloque = {}
+    for linea in proceso.stdout:
+        clave, _, valor = linea.strip().partition("=")
+        bloque[clave] = valor
+        if clave == "progress":
+            if al_progresar:
+                al_progresar(evento_desde_bloque(bloque, archivo, duracion, time.perf_counter() - inicio))
+            bloque = {}
+    codigo = proceso.wait()
+    lector_errores.join()
+    if codigo != 0:
+        raise subprocess.CalledProcessError(codigo, comando, stderr="\n".join(ultimas_lineas))
+
+
+def nivel_calidad(calidad):
+    """Posición del nivel de calidad (0 = alta calidad, 2 = alta compresión)"""
+    niveles = list(CALIDADES)
+    return niveles.index(calidad) if calidad in niveles else niveles.index(CALIDAD_POR_DEFECTO)
+
+
+def comprimir_video(archivo, calidad=CALIDAD_POR_DEFECTO, carpeta_salida=OUTPUT_DIR, hilos=None,
+                    ffmpeg_path=None, archivo_salida=None, al_iniciar_proceso=None, al_progresar=None,
+                    codificador=None, opciones=(), modo=MODO_AUTO, escalado=None):
+    """Comprime un MP4 con FFmpeg y retorna un ResultadoVideo
+
+    codificador: nombre del catálogo, "rapido"/"pequeño" o None para x264 medium.
+    modo: MODO_AUTO analiza el archivo con ffprobe y solo recodifica lo que hace falta;
+          MODO_COMPLETO fuerza la codificación completa.
+    escalado: destino ("web", "mensajeria"...) o Escalado; None conserva resolución y fps.
+    al_progresar(evento) recibe un EventoProgreso cada ~0.5 s (porcentaje, fps, velocidad, ETA).
+    """
+    ffmpeg_path = ffmpeg_path or obtener_ffmpeg_path()
+    codificador = resolver_codificador(codificador)
+    escalado = resolver_escalado(escalado) if escalado else None
+    nivel = nivel_calidad(calidad)
+    archivo_salida = archivo_salida or nombre_salida(archivo, calidad, carpeta_salida)
+    os.makedirs(os.path.dirname(archivo_salida) or ".", exist_ok=True)
+    info = sondear_video(archivo) if modo == MODO_AUTO or al_progresar or escalado else None
+    if modo == MODO_AUTO:
+        modo, motivo = decidir_modo(info, nivel, codificador, escalado)
+    else:
+        motivo = "codificación completa solicitada"
+    filtro_video = escalado.filtro(info) if escalado else None
+    if filtro_video and info and modo == MODO_COMPLETO and not motivo.startswith("se reduce"):
+        motivo += f" · {escalado.resumen(info)}"
+
+    inicio = time.perf_counter()
+    comando = construir_comando(ffmpeg_path, archivo, archivo_salida, codificador, nivel, hilos, opciones, modo,
+                                copiar_audio=info is not None and audio_aceptable(info), filtro_video=filtro_video)
+    ejecutar_ffmpeg(comando, al_iniciar_proceso, archivo, info.duracion if info else 0.0, al_progresar)
+    return ResultadoVideo(
+        archivo=archivo,
+        archivo_salida=archivo_salida,
+        tamaño_original=os.path.getsize(archivo),
+        tamaño_final=os.path.getsize(archivo_salida),
+        segundos=time.perf_counter() - inicio,
+        codificador=codificador.nombre if modo == MODO_COMPLETO else "copia",
+        modo=modo,
+        motivo=motivo,
+        pasadas=1 if modo == MODO_COMPLETO else 0
+    )
+
+
+def progreso_por_pasada(al_progresar, pasada, total_pasadas):
+    """Traduce el avance de una pasada al avance total (la pasada 1 de 2 cubre de 0 a 50 %)"""
+    if not al_progresar:
+        return None
+
+    def al_progresar_pasada(evento):
+        restantes = total_pasadas - pasada
+        duracion = evento.duracion * total_pasadas
+        eta = evento.eta_segundos + (restantes * evento.duracion / evento.velocidad if evento.velocidad else 0.0)
+        al_progresar(replace(evento, segundos_procesados=evento.segundos_procesados + (pasada - 1) * evento.duracion,
+                             duracion=duracion, eta_segundos=eta, terminado=evento.terminado and not restantes))
+    return al_progresar_pasada
+
+
+def presupuesto_bitrate(info, tamaño_objetivo, codificador):
+    """Reparte el tamaño objetivo entre video y audio; retorna (kbps de video, argumentos de audio)"""
+    margen = MARGEN_CONTENEDOR + (0 if codificador.dos_pasadas else MARGEN_UNA_PASADA)
+    total_kbps = tamaño_objetivo * 8 / info.duracion / 1000 * (1 - margen)
+    limite_audio = total_kbps * FRACCION_AUDIO
+    if not info.codec_audio:
+        audio_kbps, argumentos_audio = 0, []
+    elif audio_aceptable(info) and info.bitrate_audio <= limite_audio:
+        audio_kbps, argumentos_audio = info.bitrate_audio, ["-c:a", "copy"]
+    else:
+        audio_kbps = int(max(AUDIO_MIN_KBPS, min(AUDIO_KBPS, limite_audio)))
+        argumentos_audio = ["-c:a", "aac", "-b:a", f"{audio_kbps}k"]
+    video_kbps = total_kbps - audio_kbps
+    if video_kbps < VIDEO_MIN_KBPS:
+        raise ValueError(f"{tamaño_objetivo / (1024 * 1024):.2f} MB no alcanzan para "
+                         f"{formatear_segundos(info.duracion)} de video ({video_kbps:.0f} kbit/s disponibles)")
+    return video_kbps, argumentos_audio
+
+
+def comprimir_a_tamaño(archivo, tamaño_objetivo_mb, carpeta_salida=OUTPUT_DIR, hilos=None, ffmpeg_path=None,
+                       archivo_salida=None, al_iniciar_proceso=None, al_progresar=None, codificador=None,
+                       escalado="mensajeria", carpeta_trabajo=None, al_terminar_pasada=None):
+    """Codifica para quedar por debajo de `tamaño_objetivo_mb` (p. ej. el límite de un adjunto)
+
+    El bitrate sale de la duración de ffprobe; con x264/x265/VP9 se hace en dos pasadas (la primera
+    solo analiza). Si aun así se pasa del límite, se repite una sola vez la última pasada con el
+    bitrate corregido. ResultadoVideo.pasadas indica cuántas codificaciones se hicieron.
+    Por defecto se limita a 720p/30 fps: con pocos kbit/s rinde más repartirlos en menos píxeles.
+
+    Con `carpeta_trabajo` el registro de la primera pasada queda en esa carpeta: si el proceso se
+    interrumpe durante la segunda, la siguiente llamada con la misma carpeta no repite la primera.
+    al_terminar_pasada(numero) se llama al terminar la primera pasada.
+    """
+    ffmpeg_path = ffmpeg_path or obtener_ffmpeg_path()
+    codificador = resolver_codificador(codificador)
+    escalado = resolver_escalado(escalado) if escalado else None
+    tamaño_objetivo = int(tamaño_objetivo_mb * 1024 * 1024)
+    archivo_salida = archivo_salida or nombre_salida(archivo, f"{tamaño_objetivo_mb:g}mb", carpeta_salida)
+    os.makedirs(os.path.dirname(archivo_salida) or ".", exist_ok=True)
+    inicio = time.perf_counter()
+
+    def resultado(modo, motivo, pasadas):
+        return ResultadoVideo(archivo, archivo_salida, os.path.getsize(archivo), os.path.getsize(archivo_salida),
+                              time.perf_counter() - inicio, codificador.nombre if pasadas else "copia",
+                              modo, motivo, pasadas)
+
+    info = sondear_video(archivo)
+    if os.path.getsize(archivo) <= tamaño_objetivo:
+        comando = construir_comando(ffmpeg_path, archivo, archivo_salida, codificador, 0, modo=MODO_REMUX)
+        ejecutar_ffmpeg(comando, al_iniciar_proceso, archivo, info.duracion if info else 0.0, al_progresar)
+        return resultado(MODO_REMUX, "el original ya cabe en el tamaño objetivo", 0)
+    if info is None or not info.duracion:
+        raise ValueError("No se pudo leer la duración del video con ffprobe")
+
+    video_kbps, argumentos_audio = presupuesto_bitrate(info, tamaño_objetivo, codificador)
+    filtro = argumentos_filtro(escalado.filtro(info) if escalado else None)
+    total_pasadas = 2 if codificador.dos_pasadas else 1
+    pasadas = 0
+    if carpeta_trabajo:
+        os.makedirs(carpeta_trabajo, exist_ok=True)
+    with contextlib.nullcontext(carpeta_trabajo) if carpeta_trabajo else \
+            tempfile.TemporaryDirectory(prefix="pasadas-mp4-") as carpeta:
+        registro = os.path.join(carpeta, "ffmpeg2pass")
+        # La marca se crea al terminar la primera pasada: sin ella el registro puede estar a medias
+        marca_primera = os.path.join(carpeta, f"pasada-1-{codificador.nombre}-{video_kbps:.0f}k")
+        if codificador.dos_pasadas and not os.path.exists(marca_primera):
+            # Primera pasada: solo estadísticas, sin audio ni archivo de salida
+            comando = [ffmpeg_path, "-i", archivo, *filtro,
+                       *codificador.argumentos_bitrate(video_kbps, hilos, 1, registro),
+                       "-an", "-f", "null", "-y", os.devnull]
+            ejecutar_ffmpeg(comando, al_iniciar_proceso, archivo, info.duracion,
+                            progreso_por_pasada(al_progresar, 1, total_pasadas))
+            pasadas += 1
+            open(marca_primera, "w").close()
+            if al_terminar_pasada:
+                al_terminar_pasada(1)
+
+        for _ in range(2):
+            pasada = 2 if codificador.dos_pasadas else None
+            comando = [ffmpeg_path, "-i", archivo, *filtro,
+                       *codificador.argumentos_bitrate(video_kbps, hilos, pasada, registro),
+                       *argumentos_audio, "-movflags", "+faststart", "-y", archivo_salida]
+            ejecutar_ffmpeg(comando, al_iniciar_proceso, archivo, info.duracion,
+                            progreso_por_pasada(al_progresar, total_pasadas, total_pasadas))
+            pasadas += 1
+            tamaño_final = os.path.getsize(archivo_salida)
+            if tamaño_final <= tamaño_objetivo:
+                break
+            # Corrección única: se reduce el bitrate de video en la proporción del exceso
+            video_kbps *= tamaño_objetivo / tamaño_final * 0.97
+        else:
+            raise ValueError(f"No se logró bajar de {tamaño_objetivo_mb:g} MB "
+                             f"({tamaño_final / (1024 * 1024):.1f} MB tras {pasadas} pasadas)")
+    if carpeta_trabajo:
+        shutil.rmtree(carpeta_trabajo, ignore_errors=True)
+
+    cambios = escalado.resumen(info) if escalado else ""
+    return resultado(MODO_COMPLETO, f"{video_kbps:.0f} kbit/s de video para {tamaño_objetivo_mb:g} MB"
+                                    + (f" · {cambios}" if cambios else ""), pasadas)
+
+
+# ==== Un video largo repartido entre núcleos ====
+def dividir_en_segmentos(ffmpeg_path, archivo, carpeta, segundos_segmento, al_iniciar_proceso=None):
+    """Corta solo el video en tramos sin recodificar; el muxer segment corta en el keyframe más cercano"""
+    patron = os.path.join(carpeta, "original-%04d.mp4")
+    comando = [ffmpeg_path, "-i", archivo, "-map", "0:v:0", "-c", "copy", "-f", "segment",
+               "-segment_time", f"{segundos_segmento:.3f}", "-reset_timestamps", "1", patron]
+    ejecutar_ffmpeg(comando, al_iniciar_proceso)
+    return sorted(glob.glob(os.path.join(carpeta, "original-*.mp4")))
+
+
+def comprimir_por_segmentos(archivo, calidad=CALIDAD_POR_DEFECTO, carpeta_salida=OUTPUT_DIR, procesos=None,
+                            hilos=None, ffmpeg_path=None, archivo_salida=None, al_iniciar_proceso=None,
+                            al_progresar=None, codificador=None, modo=MODO_AUTO, escalado=None,
+                            carpeta_trabajo=None, al_terminar_segmento=None):
+    """Codifica un video largo en tramos paralelos y los une sin pérdida con el demuxer concat
+
+    1. Divide la pista de video en tramos por keyframes (-c copy, solo E/S).
+    2. Codifica los tramos en `procesos` FFmpeg simultáneos con núcleos / procesos hilos cada uno.
+    3. Procesa el audio una sola vez, en paralelo con los tramos.
+    4. Une tramos + audio con -f concat -c copy.
+    Si el video es corto o no necesita recodificarse, delega en comprimir_video.
+
+    Con `carpeta_trabajo` los tramos quedan en esa carpeta en lugar de una temporal: si el proceso se
+    interrumpe, la siguiente llamada con la misma carpeta salta los tramos ya codificados.
+    al_terminar_segmento(indice) se llama al terminar cada tramo.
+    """
+    ffmpeg_path = ffmpeg_path or obtener_ffmpeg_path()
+    codificador = resolver_codificador(codificador)
+    escalado = resolver_escalado(escalado) if escalado else None
+    nivel = nivel_calidad(calidad)
+    procesos = procesos or os.cpu_count() or 1
+    info = sondear_video(archivo)
+    modo_decidido = decidir_modo(info, nivel, codificador, escalado)[0] if modo == MODO_AUTO else modo
+    if modo_decidido != MODO_COMPLETO or procesos < 2 or not info or info.duracion < DURACION_MINIMA_SEGMENTOS:
+        return comprimir_video(archivo, calidad, carpeta_salida, hilos, ffmpeg_path, archivo_salida,
+                               al_iniciar_proceso, al_progresar, codificador.nombre, modo=modo, escalado=escalado)
+    filtro = argumentos_filtro(escalado.filtro(info) if escalado else None)
+
+    archivo_salida = archivo_salida or nombre_salida(archivo, calidad, carpeta_salida)
+    os.makedirs(os.path.dirname(archivo_salida) or ".", exist_ok=True)
+    hilos_segmento = max(1, (hilos or os.cpu_count() or 1) // procesos)
+    segundos_segmento = max(SEGUNDOS_MINIMOS_SEGMENTO, info.duracion / (procesos * SEGMENTOS_POR_PROCESO))
+    inicio = time.perf_counter()
+
+    # Cada proceso lanzado se registra para poder detener todos si uno falla o se cancela
+    abiertos = []
+    candado = threading.Lock()
+
+    def registrar(proceso):
+        with candado:
+            abiertos.append(proceso)
+        if al_iniciar_proceso:
+            al_iniciar_proceso(proceso)
+
+    avance = {}
+
+    def progreso_segmento(indice):
+        def al_progresar_segmento(evento):
+            with candado:
+                avance[indice] = evento.segundos_procesados
+                procesados = sum(avance.values())
+            if al_progresar:
+                transcurrido = time.perf_counter() - inicio
+                velocidad = procesados / transcurrido if transcurrido else 0.0
+                al_progresar(replace(evento, archivo=archivo, segundos_procesados=procesados, duracion=info.duracion,
+                                     velocidad=velocidad, terminado=False,
+                                     eta_segundos=(info.duracion - procesados) / velocidad if velocidad else 0.0))
+        return al_progresar_segmento
+
+    def codificar(comando, destino, indice):
+        # Se escribe en un .parcial y se renombra al terminar: un tramo con su nombre final está completo
+        parcial = f"{destino[:-4]}.parcial{destino[-4:]}"
+        al_progresar_segmento = progreso_segmento(indice) if indice is not None else None
+        ejecutar_ffmpeg([*comando, "-y", parcial], registrar, archivo, 0.0, al_progresar_segmento)
+        os.replace(parcial, destino)
+        if indice is not None and al_terminar_segmento:
+            al_terminar_segmento(indice)
+
+    if carpeta_trabajo:
+        os.makedirs(carpeta_trabajo, exist_ok=True)
+    with contextlib.nullcontext(carpeta_trabajo) if carpeta_trabajo else \
+            tempfile.TemporaryDirectory(prefix="segmentos-mp4-") as carpeta:
+        marca_division = os.path.join(carpeta, "division-terminada")
+        if os.path.exists(marca_division):
+            originales = sorted(glob.glob(os.path.join(carpeta, "original-*.mp4")))
+        else:
+            for restante in glob.glob(os.path.join(carpeta, "original-*.mp4")):
+                os.remove(restante)  # división cortada a la mitad: se repite (es solo copia)
+            originales = dividir_en_segmentos(ffmpeg_path, archivo, carpeta, segundos_segmento, registrar)
+            open(marca_division, "w").close()
+        audio = os.path.join(carpeta, "audio.m4a")
+        argumentos_audio = ["-c:a", "copy"] if audio_aceptable(info) else ARGUMENTOS_AUDIO
+
+        trabajos = []
+        if info.codec_audio and not os.path.exists(audio):
+            trabajos.append(([ffmpeg_path, "-i", archivo, "-vn", "-map", "0:a:0", *argumentos_audio], audio, None))
+        codificados = []
+        reanudados = 0
+        for indice, original in enumerate(originales):
+            codificado = os.path.join(carpeta, f"codificado-{indice:04d}.mp4")
+            codificados.append(codificado)
+            if os.path.exists(codificado):
+                reanudados += 1
+                avance[indice] = min(segundos_segmento, info.duracion)
+                continue
+            trabajos.append(([ffmpeg_path, "-i", original, *filtro, *codificador.argumentos(nivel, hilos_segmento),
+                              "-an"], codificado, indice))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=procesos) as ejecutor:
+            futuros = [ejecutor.submit(codificar, comando, destino, indice) for comando, destino, indice in trabajos]
+            try:
+                for futuro in concurrent.futures.as_completed(futuros):
+                    futuro.result()
+            except BaseException:
+                for futuro in futuros:
+                    futuro.cancel()
+                with candado:
+                    for proceso in abiertos:
+                        if proceso.poll() is None:
+                            proceso.kill()
+                raise
+
+        lista = os.path.join(carpeta, "lista.txt")
+        with open(lista, "w", encoding="utf-8") as f:
+            for codificado in codificados:
+                # El demuxer concat resuelve las rutas relativas desde la carpeta de la lista: siempre absolutas
+                ruta = os.path.abspath(codificado).replace("'", "'\\''")
+                f.write(f"file '{ruta}'\n")
+        comando = [ffmpeg_path, "-f", "concat", "-safe", "0", "-i", lista]
+        if info.codec_audio:
+            comando += ["-i", audio, "-map", "0:v:0", "-map", "1:a:0"]
+        ejecutar_ffmpeg([*comando, "-c", "copy", "-movflags", "+faststart", "-y", archivo_salida], registrar)
+    if carpeta_trabajo:
+        shutil.rmtree(carpeta_trabajo, ignore_errors=True)
+
+    if al_progresar:
+        al_progresar(EventoProgreso(archivo, info.duracion, info.duracion, 0.0, 0.0, 0.0,
+                                    os.path.getsize(archivo_salida), 0.0, terminado=True))
+    return ResultadoVideo(archivo, archivo_salida, os.path.getsize(archivo), os.path.getsize(archivo_salida),
+                          time.perf_counter() - inicio, codificador.nombre, MODO_COMPLETO,
+                          f"{len(codificados)} tramos en {procesos} procesos × {hilos_segmento} hilos"
+                          + (f" ({reanudados} reanudados)" if reanudados else ""), 1)
+
+
+def comparar_segmentos(archivo, calidad=CALIDAD_POR_DEFECTO, procesos=None, codificador=None, escalado=None):
+    """Mide el tiempo real de un solo proceso contra el modo por segmentos sobre el mismo video"""
+    procesos = procesos or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix="comparar-segmentos-") as carpeta:
+        unico = comprimir_video(archivo, calidad, archivo_salida=os.path.join(carpeta, "unico.mp4"),
+                                hilos=os.cpu_count(), codificador=codificador, modo=MODO_COMPLETO, escalado=escalado)
+        segmentado = comprimir_por_segmentos(archivo, calidad, procesos=procesos,
+                                             archivo_salida=os.path.join(carpeta, "segmentos.mp4"),
+                                             codificador=codificador, modo=MODO_COMPLETO, escalado=escalado)
+    return {
+        "archivo": archivo,
+        "procesos": procesos,
+        "segundos_un_proceso": unico.segundos,
+        "segundos_segmentos": segmentado.segundos,
+        "aceleracion": unico.segundos / segmentado.segundos if segmentado.segundos else 0.0,
+        "bytes_un_proceso": unico.tamaño_final,
+        "bytes_segmentos": segmentado.tamaño_final,
+        "detalle_segmentos": segmentado.motivo,
+    }
+
+
+# ==== Vista previa por muestras ====
+@dataclass
+class PrevisualizacionCalidad:
+    """Tamaño y tiempo extrapolados para un nivel de calidad a partir de las muestras"""
+    calidad: str
+    valor_calidad: str
+    tamaño_estimado: int
+    segundos_estimados: float
+    proporcion: float
+    metrica: str = ""
+    puntaje: float = None
+
+
+def posiciones_muestras(duracion, muestras=MUESTRAS_PREVIA, segundos=SEGUNDOS_MUESTRA):
+    """Inicios de tramos repartidos uniformemente (centrados en cada tramo de la duración)"""
+    if duracion <= muestras * segundos:
+        return [0.0]
+    return [max(0.0, (indice + 0.5) * duracion / muestras - segundos / 2) for indice in range(muestras)]
+
+
+def puntaje_metrica(ffmpeg_path, archivo, codificado, inicio, segundos, metrica, filtro_video=None):
+    """SSIM (0–1) o VMAF (0–100) del tramo codificado contra el mismo tramo del original
+
+    Si hubo escalado, el original pasa por el mismo filtro para comparar fotogramas del mismo tamaño.
+    """
+    filtro = METRICAS[metrica]
+    if filtro not in filtros_compilados(ffmpeg_path, flags_creacion()):
+        raise ValueError(f"Este FFmpeg no incluye el filtro {filtro} (necesario para {metrica.upper()})")
+    comando = [ffmpeg_path, "-hide_banner", "-i", codificado, "-ss", f"{inicio:.3f}", "-t", f"{segundos:.3f}",
+               "-i", archivo, "-lavfi", f"[0:v]setpts=PTS-STARTPTS[a];[1:v]{filtro_video + ',' if filtro_video else ''}"
+                                        f"setpts=PTS-STARTPTS[b];[a][b]{filtro}",
+               "-f", "null", "-"]
+    salida = subprocess.run(comando, capture_output=True, text=True, errors="replace",
+                            creationflags=flags_creacion())
+    coincidencia = (PATRON_SSIM if metrica == "ssim" else PATRON_VMAF).search(salida.stderr)
+    if salida.returncode != 0 or not coincidencia:
+        raise subprocess.CalledProcessError(salida.returncode, comando, stderr=salida.stderr[-2000:])
+    return float(coincidencia.group(1))
+
+
+def metrica_disponible(metrica):
+    """Indica si el FFmpeg actual incluye el filtro de la métrica ("ssim" o "vmaf")"""
+    return METRICAS[metrica] in filtros_compilados(obtener_ffmpeg_path(), flags_creacion())
+
+
+def previsualizar(archivo, calidades=None, muestras=MUESTRAS_PREVIA, segundos=SEGUNDOS_MUESTRA, metrica=None,
+                  codificador=None, hilos=None, ffmpeg_path=None, escalado=None):
+    """Codifica unos pocos tramos del video en cada calidad y extrapola tamaño y tiempo del video completo
+
+    metrica: None, "ssim" o "vmaf" (calculada localmente con los filtros de FFmpeg).
+    Retorna una lista de PrevisualizacionCalidad en el orden de `calidades`.
+    """
+    ffmpeg_path = ffmpeg_path or obtener_ffmpeg_path()
+    codificador = resolver_codificador(codificador)
+    calidades = calidades or list(CALIDADES)
+    info = sondear_video(archivo)
+    if info is None or not info.duracion:
+        raise ValueError("No se pudo leer la duración del video con ffprobe")
+    filtro_video = resolver_escalado(escalado).filtro(info) if escalado else None
+    posiciones = posiciones_muestras(info.duracion, muestras, segundos)
+    segundos_muestreados = min(info.duracion, segundos * len(posiciones))
+    # El audio se copia si ya está bien; si no, se estima con el bitrate AAC de destino
+    audio_kbps = info.bitrate_audio if audio_aceptable(info) else (AUDIO_KBPS if info.codec_audio else 0)
+    bytes_audio = audio_kbps * 1000 / 8 * info.duracion
+
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="previa-mp4-") as carpeta:
+        for calidad in calidades:
+            nivel = nivel_calidad(calidad)
+            bytes_video = 0
+            tiempo = 0.0
+            puntajes = []
+            for indice, inicio in enumerate(posiciones):
+                codificado = os.path.join(carpeta, f"{nivel}-{indice}.mp4")
+                # -ss antes de -i: busca directo al tramo sin decodificar lo anterior
+                comando = [ffmpeg_path, "-ss", f"{inicio:.3f}", "-t", f"{segundos:.3f}", "-i", archivo,
+                           *argumentos_filtro(filtro_video), *codificador.argumentos(nivel, hilos), "-an", "-y",
+                           codificado]
+                comienzo = time.perf_counter()
+                ejecutar_ffmpeg(comando)
+                tiempo += time.perf_counter() - comienzo
+                bytes_video += os.path.getsize(codificado)
+                if metrica:
+                    puntajes.append(puntaje_metrica(ffmpeg_path, archivo, codificado, inicio, segundos, metrica,
+                                                    filtro_video))
+
+            escala = info.duracion / segundos_muestreados
+            tamaño = int(bytes_video * escala + bytes_audio)
+            resultados.append(PrevisualizacionCalidad(
+                calidad=calidad,
+                valor_calidad=str(codificador.calidad[nivel]),
+                tamaño_estimado=tamaño,
+                segundos_estimados=tiempo * escala,
+                proporcion=tamaño / os.path.getsize(archivo),
+                metrica=metrica or "",
+                puntaje=sum(puntajes) / len(puntajes) if puntajes else None
+            ))
+    return resultados
+
+
+def medir_codificadores(muestra, segundos=10, calidad=CALIDAD_POR_DEFECTO, nombres=None):
+    """Codifica los primeros segundos de la muestra con cada codificador disponible
+
+    Retorna {nombre: {"velocidad", "tamaño", "segundos", "bytes"}} con velocidad y tamaño
+    relativos a x264 medium, listo para guardar_mediciones().
+    """
+    candidatos = [nombre for nombre in disponibles() if not nombres or nombre in nombres]
+    if CODIFICADOR_POR_DEFECTO in disponibles() and CODIFICADOR_POR_DEFECTO not in candidatos:
+        candidatos.insert(0, CODIFICADOR_POR_DEFECTO)  # referencia para los valores relativos
+
+    medidas = {}
+    with tempfile.TemporaryDirectory(prefix="codificadores-mp4-") as carpeta:
+        for nombre in candidatos:
+            resultado = comprimir_video(muestra, calidad, archivo_salida=os.path.join(carpeta, f"{nombre}.mp4"),
+                                        codificador=nombre, opciones=["-t", str(segundos), "-an"],
+                                        modo=MODO_COMPLETO)
+            medidas[nombre] = {"segundos": resultado.segundos, "bytes": resultado.tamaño_final}
+
+    referencia = medidas.get(CODIFICADOR_POR_DEFECTO) or next(iter(medidas.values()))
+    for medida in medidas.values():
+        medida["velocidad"] = round(referencia["segundos"] / medida["segundos"], 3) if medida["segundos"] else 0.0
+        medida["tamaño"] = round(medida["bytes"] / referencia["bytes"], 3) if referencia["bytes"] else 0.0
+    return medidas
+
+
+# ==== Póster y hoja de contactos ====
+def extraer_cuadro(ffmpeg_path, archivo, segundo, destino, ancho, al_iniciar_proceso=None):
+    """Guarda como JPG el keyframe más cercano antes de `segundo`
+
+    Con -ss antes de -i FFmpeg salta por el índice directo al keyframe, y -skip_frame nokey evita
+    decodificar los cuadros intermedios: se lee solo un GOP por imagen, no el video entero.
+    """
+    comando = [ffmpeg_path, "-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{segundo:.3f}", "-i", archivo,
+               "-map", "0:v:0", "-frames:v", "1", "-vf", f"scale=w='min(iw,{ancho})':h=-2", "-q:v", "3",
+               "-y", destino]
+    ejecutar_ffmpeg(comando, al_iniciar_proceso)
+    return os.path.exists(destino)
+
+
+def generar_miniaturas(archivo, carpeta_salida=None, cuadros=CUADROS_HOJA, columnas=COLUMNAS_HOJA,
+                       ffmpeg_path=None, al_iniciar_proceso=None):
+    """Crea {nombre}_poster.jpg y {nombre}_hoja.jpg (cuadrícula de miniaturas); retorna las rutas
+
+    Por defecto las imágenes quedan junto al video (p. ej. en videos-comprimidos, al lado del resultado).
+    """
+    ffmpeg_path = ffmpeg_path or obtener_ffmpeg_path()
+    info = sondear_video(archivo)
+    if info is None or not info.duracion:
+        raise ValueError("No se pudo leer la duración del video con ffprobe")
+    carpeta_salida = carpeta_salida or os.path.dirname(archivo) or "."
+    os.makedirs(carpeta_salida, exist_ok=True)
+    base = os.path.join(carpeta_salida, os.path.splitext(os.path.basename(archivo))[0])
+    imagenes = []
+
+    poster = f"{base}_poster.jpg"
+    if extraer_cuadro(ffmpeg_path, archivo, info.duracion * POSICION_POSTER, poster, ANCHO_POSTER,
+                      al_iniciar_proceso):
+        imagenes.append(poster)
+
+    with tempfile.TemporaryDirectory(prefix="miniaturas-mp4-") as carpeta:
+        def extraer(indice):
+            destino = os.path.join(carpeta, f"cuadro-{indice:03d}.jpg")
+            segundo = info.duracion * (indice + 0.5) / cuadros
+            return destino if extraer_cuadro(ffmpeg_path, archivo, segundo, destino, ANCHO_MINIATURA,
+                                             al_iniciar_proceso) else None
+
+        # Cada cuadro es un FFmpeg corto dominado por la lectura: unos pocos a la vez alcanzan
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(4, cuadros)) as ejecutor:
+            extraidos = [destino for destino in ejecutor.map(extraer, range(cuadros)) if destino]
+        if extraidos:
+            # El demuxer image2 necesita una secuencia sin huecos
+            for indice, destino in enumerate(extraidos):
+                os.replace(destino, os.path.join(carpeta, f"hoja-{indice:03d}.jpg"))
+            hoja = f"{base}_hoja.jpg"
+            filas = math.ceil(len(extraidos) / columnas)
+            ejecutar_ffmpeg([ffmpeg_path, "-framerate", "1", "-i", os.path.join(carpeta, "hoja-%03d.jpg"),
+                             "-vf", f"tile={min(columnas, len(extraidos))}x{filas}:padding=4:margin=4",
+                             "-frames:v", "1", "-q:v", "3", "-y", hoja], al_iniciar_proceso)
+            imagenes.append(hoja)
+    return imagenes
+
+
+# ==== Cola de trabajos ====
+@dataclass
+class TrabajoVideo:
+    """Un video en la cola con su prioridad, estado e intentos"""
+    id: int
+    archivo: str
+    calidad: str = CALIDAD_POR_DEFECTO
+    prioridad: int = 0
+    hilos: int = None
+    codificador: str = None
+    modo: str = MODO_AUTO
+    tamaño_objetivo_mb: float = None
+    segmentos: int = None
+    escalado: object = None
+    miniaturas: bool = False
+    # Identificador estable en el diario (sobrevive a reinicios, a diferencia de `id`)
+    clave: str = None
+    estado: str = PENDIENTE
+    intentos: int = 0
+    error: str = ""
+    resultado: ResultadoVideo = None
+    progreso: EventoProgreso = None
+    procesos: list = field(default_factory=list, repr=False, compare=False)
+    cancelar: bool = field(default=False, repr=False, compare=False)
+
+
+def concurrencia_por_defecto():
+    """Cantidad de codificaciones simultáneas: una cada 4 núcleos (x264 escala bien hasta ahí)"""
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+class ColaVideos:
+    """Cola con prioridad que comprime varios videos en paralelo
+
+    Cada trabajo usa como máximo `hilos_por_trabajo` hilos de x264, de modo que
+    concurrencia × hilos_por_trabajo ≈ núcleos disponibles.
+    al_progresar(trabajo, evento) recibe el avance de cada codificación en curso.
+    Con un `diario` (DiarioTrabajos) los trabajos y sus tramos terminados quedan registrados en disco
+    y se pueden reanudar con `reanudar()` tras cerrar la aplicación o reiniciar la máquina.
+    """
+
+    def __init__(self, concurrencia=None, hilos_por_trabajo=None, carpeta_salida=OUTPUT_DIR, max_reintentos=0,
+                 al_cambiar_estado=None, al_progresar=None, diario=None):
+        self.concurrencia = concurrencia or concurrencia_por_defecto()
+        self.hilos_por_trabajo = hilos_por_trabajo or max(1, (os.cpu_count() or 1) // self.concurrencia)
+        self.carpeta_salida = carpeta_salida
+        self.max_reintentos = max_reintentos
+        self.al_cambiar_estado = al_cambiar_estado
+        self.al_progresar = al_progresar
+        self.diario = diario
+        self.trabajos = {}
+        self._pendientes = queue.PriorityQueue()
+        self._secuencia = itertools.count()
+        self._candado = threading.Lock()
+        self._hilos = []
+        self._inicio = None
+        self._fin = None
+        self._detenida = False
+
+    # ---- Gestión de trabajos ----
+    def agregar(self, archivo, calidad=CALIDAD_POR_DEFECTO, prioridad=0, hilos=None, codificador=None,
+                modo=MODO_AUTO, tamaño_objetivo_mb=None, segmentos=None, escalado=None, miniaturas=False,
+                clave=None):
+        """Encola un video; a mayor prioridad, antes se procesa
+
+        Con `tamaño_objetivo_mb` se ignora la calidad y se codifica para no pasar de ese tamaño.
+        Con `segmentos` los videos largos se codifican en esa cantidad de procesos en paralelo.
+        `escalado` limita resolución y fps (destino "web", "mensajeria"... o un Escalado).
+        Con `miniaturas` se agregan un póster y una hoja de contactos junto al resultado.
+        """
+        with self._candado:
+            trabajo = TrabajoVideo(len(self.trabajos) + 1, archivo, calidad, prioridad, hilos, codificador, modo,
+                                   tamaño_objetivo_mb, segmentos, escalado, miniaturas,
+                                   clave or uuid.uuid4().hex[:12])
+            self.trabajos[trabajo.id] = trabajo
+        if self.diario:
+            self.diario.registrar(trabajo)
+        self._encolar(trabajo)
+        return trabajo
+
+    def reanudar(self, carpeta=None):
+        """Vuelve a encolar los trabajos que el diario tiene sin terminar (solo los de `carpeta` si se indica)
+
+        Lo ya hecho solo se aprovecha donde hay un punto de control: los trabajos por tramos saltan
+        los tramos terminados y los de tamaño objetivo en dos pasadas, la primera pasada. Una
+        codificación de una sola pasada (o la pasada final) empieza de cero: un MP4 a medio escribir
+        no se puede continuar. Retorna los trabajos agregados.
+        """
+        if not self.diario:
+            return []
+        carpeta = os.path.abspath(carpeta) if carpeta else None
+        return [self.agregar(**ajustes, clave=clave) for clave, ajustes in self.diario.pendientes()
+                if os.path.isfile(ajustes["archivo"])
+                and (carpeta is None or os.path.dirname(ajustes["archivo"]) == carpeta)]
+
+    def _encolar(self, trabajo):
+        trabajo.estado = PENDIENTE
+        trabajo.cancelar = False
+        self._pendientes.put((-trabajo.prioridad, next(self._secuencia), trabajo.id))
+        self._notificar(trabajo)
+
+    def cancelar(self, id_trabajo):
+        """Cancela un trabajo pendiente o detiene el FFmpeg de uno en curso"""
+        trabajo = self.trabajos[id_trabajo]
+        trabajo.cancelar = True
+        if trabajo.estado == PENDIENTE:
+            trabajo.estado = CANCELADO
+            self._notificar(trabajo)
+        elif trabajo.estado == PROCESANDO:
+            for proceso in list(trabajo.procesos):
+                if proceso.poll() is None:
+                    proceso.kill()
+
+    def cancelar_todo(self):
+        for id_trabajo in list(self.trabajos):
+            self.cancelar(id_trabajo)
+
+    def detener(self):
+        """Mata los FFmpeg en curso sin marcar los trabajos como cancelados en el diario
+
+        Se usa al cerrar la aplicación o con Ctrl+C: los trabajos quedan pendientes en el diario y
+        `reanudar()` continúa desde el último tramo o pasada terminados (ver sus límites).
+        """
+        self._detenida = True
+        self.cancelar_todo()
+
+    def reintentar(self, id_trabajo):
+        """Vuelve a encolar un trabajo con error o cancelado"""
+        trabajo = self.trabajos[id_trabajo]
+        if trabajo.estado in (ERROR, CANCELADO):
+            trabajo.error = ""
+            self._encolar(trabajo)
+            self.iniciar()
+        return trabajo
+
+    # ---- Ejecución ----
+    def iniciar(self):
+        """Arranca los hilos de trabajo que falten hasta llegar a la concurrencia configurada"""
+        with self._candado:
+            if self._inicio is None:
+                self._inicio = time.perf_counter()
+            self._fin = None
+            self._hilos = [hilo for hilo in self._hilos if hilo.is_alive()]
+            while len(self._hilos) < self.concurrencia:
+                hilo = threading.Thread(target=self._trabajar, daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+
+    def esperar(self):
+        """Bloquea hasta que no queden trabajos pendientes ni en curso"""
+        self._pendientes.join()
+        return self.resumen()
+
+    def _trabajar(self):
+        while True:
+            try:
+                _, _, id_trabajo = self._pendientes.get(timeout=0.5)
+            except queue.Empty:
+                return
+            trabajo = self.trabajos[id_trabajo]
+            try:
+                if trabajo.estado == PENDIENTE and not trabajo.cancelar:
+                    self._procesar(trabajo)
+            finally:
+                self._pendientes.task_done()
+                if self._pendientes.unfinished_tasks == 0:
+                    self._fin = time.perf_counter()
+
+    def _procesar(self, trabajo):
+        trabajo.estado = PROCESANDO
+        trabajo.intentos += 1
+        self._notificar(trabajo)
+
+        def registrar_proceso(proceso):
+            trabajo.procesos.append(proceso)
+            if trabajo.cancelar:
+                proceso.kill()
+
+        def al_progresar(evento):
+            trabajo.progreso = evento
+            if self.al_progresar:
+                self.al_progresar(trabajo, evento)
+
+        try:
+            if trabajo.tamaño_objetivo_mb:
+                trabajo.resultado = comprimir_a_tamaño(trabajo.archivo, trabajo.tamaño_objetivo_mb,
+                                                       self.carpeta_salida, trabajo.hilos or self.hilos_por_trabajo,
+                                                       al_iniciar_proceso=registrar_proceso,
+                                                       al_progresar=al_progresar, codificador=trabajo.codificador,
+                                                       escalado=trabajo.escalado or "mensajeria",
+                                                       carpeta_trabajo=self.diario.carpeta_trabajo(trabajo.clave)
+                                                       if self.diario else None,
+                                                       al_terminar_pasada=(lambda numero: self.diario.pasada(
+                                                           trabajo.clave, numero)) if self.diario else None)
+            elif trabajo.segmentos:
+                trabajo.resultado = comprimir_por_segmentos(
+                    trabajo.archivo, trabajo.calidad, self.carpeta_salida, trabajo.segmentos,
+                    trabajo.hilos or self.hilos_por_trabajo, al_iniciar_proceso=registrar_proceso,
+                    al_progresar=al_progresar, codificador=trabajo.codificador, modo=trabajo.modo,
+                    escalado=trabajo.escalado,
+                    carpeta_trabajo=self.diario.carpeta_trabajo(trabajo.clave) if self.diario else None,
+                    al_terminar_segmento=(lambda indice: self.diario.segmento(trabajo.clave, indice))
+                    if self.diario else None)
+            else:
+                trabajo.resultado = comprimir_video(trabajo.archivo, trabajo.calidad, self.carpeta_salida,
+                                                    trabajo.hilos or self.hilos_por_trabajo,
+                                                    al_iniciar_proceso=registrar_proceso, al_progresar=al_progresar,
+                                                    codificador=trabajo.codificador, modo=trabajo.modo,
+                                                    escalado=trabajo.escalado)
+            if trabajo.miniaturas:
+                self._agregar_miniaturas(trabajo, registrar_proceso)
+            trabajo.estado = TERMINADO
+        except Exception as e:
+            if trabajo.cancelar:
+                trabajo.estado = CANCELADO
+                salida = self.salida_de(trabajo)
+                if os.path.exists(salida):
+                    os.remove(salida)  # no dejar un MP4 a medio escribir
+            elif trabajo.intentos <= self.max_reintentos:
+                self._encolar(trabajo)
+                return
+            else:
+                trabajo.estado = ERROR
+                trabajo.error = getattr(e, "stderr", None) or str(e)
+        finally:
+            trabajo.procesos.clear()
+        self._notificar(trabajo)
+
+    def _agregar_miniaturas(self, trabajo, registrar_proceso):
+        # Se toman del resultado: ya tiene el índice al inicio y es más liviano de recorrer que el original
+        try:
+            trabajo.resultado.imagenes = generar_miniaturas(trabajo.resultado.archivo_salida,
+                                                            al_iniciar_proceso=registrar_proceso)
+        except (subprocess.CalledProcessError, ValueError) as e:
+            if trabajo.cancelar:
+                raise
+            # El video ya está listo: un fallo en las imágenes no debe repetir la compresión
+            detalle = (getattr(e, "stderr", None) or str(e)).splitlines() or [""]
+            trabajo.resultado.motivo += f" · sin miniaturas: {detalle[-1]}"
+
+    def salida_de(self, trabajo):
+        """Ruta del MP4 que genera el trabajo"""
+        etiqueta = f"{trabajo.tamaño_objetivo_mb:g}mb" if trabajo.tamaño_objetivo_mb else trabajo.calidad
+        return nombre_salida(trabajo.archivo, etiqueta, self.carpeta_salida)
+
+    def _notificar(self, trabajo):
+        if self.diario and not self._detenida:
+            self.diario.estado(trabajo)
+        if self.al_cambiar_estado:
+            self.al_cambiar_estado(trabajo, self)
+
+    # ---- Resumen ----
+    def conteo(self):
+        """Cantidad de trabajos por estado"""
+        conteo = {estado: 0 for estado in (PENDIENTE, PROCESANDO, TERMINADO, ERROR, CANCELADO)}
+        for trabajo in list(self.trabajos.values()):
+            conteo[trabajo.estado] += 1
+        return conteo
+
+    def resumen(self):
+        """Rendimiento de la cola: videos/min, MB/s procesados y bytes ahorrados"""
+        terminados = [t.resultado for t in self.trabajos.values() if t.estado == TERMINADO]
+        fin = self._fin or time.perf_counter()
+        segundos = fin - self._inicio if self._inicio else 0.0
+        bytes_originales = sum(r.tamaño_original for r in terminados)
+        bytes_finales = sum(r.tamaño_final for r in terminados)
+        return {
+            **self.conteo(),
+            "por_modo": {modo: sum(1 for r in terminados if r.modo == modo) for modo in NOTAS_MODO},
+            "pasadas": sum(r.pasadas for r in terminados),
+            "concurrencia": self.concurrencia,
+            "hilos_por_trabajo": self.hilos_por_trabajo,
+            "segundos": segundos,
+            "videos_por_minuto": 60 * len(terminados) / segundos if segundos else 0.0,
+            "mb_por_segundo": bytes_originales / (1024 * 1024) / segundos if segundos else 0.0,
+            "bytes_originales": bytes_originales,
+            "bytes_finales": bytes_finales,
+            "bytes_ahorrados": bytes_originales - bytes_finales,
+        }
+
+
+# ==== Registro de progreso (JSON Lines) ====
+class RegistroJsonl:
+    """Escribe un evento JSON por línea, seguro para varios hilos (para tail -f o ingestión)"""
+
+    def __init__(self, ruta):
+        self.archivo = open(ruta, "a", encoding="utf-8")
+        self._candado = threading.Lock()
+
+    def escribir(self, tipo, **datos):
+        linea = json.dumps({"hora": time.time(), "evento": tipo, **datos}, ensure_ascii=False)
+        with self._candado:
+            self.archivo.write(linea + "\n")
+            self.archivo.flush()
+
+    def progreso(self, trabajo, evento):
+        self.escribir("progreso", id=trabajo.id, **asdict(evento), porcentaje=round(evento.porcentaje, 1))
+
+    def estado(self, trabajo, cola=None):
+        datos = {"id": trabajo.id, "archivo": trabajo.archivo, "estado": trabajo.estado, "intentos": trabajo.intentos}
+        if trabajo.resultado and trabajo.estado == TERMINADO:
+            datos["resultado"] = asdict(trabajo.resultado)
+        if trabajo.error:
+            datos["error"] = trabajo.error.splitlines()[-1]
+        self.escribir("estado", **datos)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+# ==== Diario de trabajos (para reanudar) ====
+class DiarioTrabajos:
+    """Diario persistente en JSON Lines: ajustes de cada trabajo, tramos y pasadas terminados y último estado
+
+    Solo se agregan líneas (con fsync), así un cierre abrupto pierde como mucho la última. Al abrirlo
+    se reescribe conservando solo los trabajos sin terminar, y se borran los tramos de los demás.
+    """
+
+    def __init__(self, ruta=os.path.join(OUTPUT_DIR, ARCHIVO_DIARIO)):
+        self.ruta = ruta
+        self.ajustes = {}
+        self.estados = {}
+        self.segmentos = {}
+        self.pasadas = {}
+        self._candado = threading.Lock()
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        if os.path.exists(ruta):
+            self._leer()
+            self._compactar()
+        self.archivo = open(ruta, "a", encoding="utf-8")
+
+    def _leer(self):
+        with open(self.ruta, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    entrada = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue  # línea cortada por un cierre abrupto
+                clave = entrada.get("clave")
+                if entrada.get("evento") == "trabajo":
+                    self.ajustes[clave] = entrada["ajustes"]
+                    self.estados[clave] = entrada.get("estado", PENDIENTE)
+                    self.segmentos[clave] = set(entrada.get("segmentos", ()))
+                    self.pasadas[clave] = entrada.get("pasadas", 0)
+                elif clave in self.ajustes and entrada.get("evento") == "segmento":
+                    self.segmentos[clave].add(entrada["indice"])
+                elif clave in self.ajustes and entrada.get("evento") == "pasada":
+                    self.pasadas[clave] = max(self.pasadas[clave], entrada["numero"])
+                elif clave in self.ajustes and entrada.get("evento") == "estado":
+                    self.estados[clave] = entrada["estado"]
+
+    def _compactar(self):
+        for clave in [clave for clave in self.ajustes if not self._sin_terminar(clave)]:
+            shutil.rmtree(self.carpeta_trabajo(clave), ignore_errors=True)
+            del self.ajustes[clave], self.estados[clave], self.segmentos[clave], self.pasadas[clave]
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            for clave, ajustes in self.ajustes.items():
+                f.write(json.dumps({"hora": time.time(), "evento": "trabajo", "clave": clave, "ajustes": ajustes,
+                                    "estado": self.estados[clave], "segmentos": sorted(self.segmentos[clave]),
+                                    "pasadas": self.pasadas[clave]},
+                                   ensure_ascii=False) + "\n")
+        os.replace(temporal, self.ruta)
+
+    def _sin_terminar(self, clave):
+        return self.estados[clave] in (PENDIENTE, PROCESANDO)
+
+    def _escribir(self, tipo, **datos):
+        linea = json.dumps({"hora": time.time(), "evento": tipo, **datos}, ensure_ascii=False)
+        with self._candado:
+            self.archivo.write(linea + "\n")
+            self.archivo.flush()
+            os.fsync(self.archivo.fileno())
+
+    def carpeta_trabajo(self, clave):
+        """Carpeta donde quedan los tramos (o el registro de la primera pasada) del trabajo hasta que termina"""
+        return os.path.abspath(os.path.join(os.path.dirname(self.ruta) or ".", CARPETA_EN_CURSO, clave))
+
+    def registrar(self, trabajo):
+        if trabajo.clave in self.ajustes:
+            return  # trabajo reanudado: ya está en el diario
+        ajustes = {
+            "archivo": os.path.abspath(trabajo.archivo), "calidad": trabajo.calidad, "prioridad": trabajo.prioridad,
+            "hilos": trabajo.hilos, "codificador": trabajo.codificador, "modo": trabajo.modo,
+            "tamaño_objetivo_mb": trabajo.tamaño_objetivo_mb, "segmentos": trabajo.segmentos,
+            "escalado": asdict(trabajo.escalado) if is_dataclass(trabajo.escalado) else trabajo.escalado,
+            "miniaturas": trabajo.miniaturas,
+        }
+        self.ajustes[trabajo.clave] = ajustes
+        self.estados[trabajo.clave] = PENDIENTE
+        self.segmentos[trabajo.clave] = set()
+        self.pasadas[trabajo.clave] = 0
+        self._escribir("trabajo", clave=trabajo.clave, ajustes=ajustes)
+
+    def segmento(self, clave, indice):
+        self.segmentos[clave].add(indice)
+        self._escribir("segmento", clave=clave, indice=indice)
+
+    def pasada(self, clave, numero):
+        self.pasadas[clave] = max(self.pasadas[clave], numero)
+        self._escribir("pasada", clave=clave, numero=numero)
+
+    def estado(self, trabajo):
+        if self.estados.get(trabajo.clave) == trabajo.estado:
+            return
+        self.estados[trabajo.clave] = trabajo.estado
+        self._escribir("estado", clave=trabajo.clave, estado=trabajo.estado)
+        if trabajo.estado == CANCELADO:
+            shutil.rmtree(self.carpeta_trabajo(trabajo.clave), ignore_errors=True)
+
+    def pendientes(self):
+        """(clave, ajustes) de los trabajos sin terminar, listos para ColaVideos.agregar"""
+        resultado = []
+        for clave, ajustes in self.ajustes.items():
+            if self._sin_terminar(clave):
+                escalado = ajustes["escalado"]
+                resultado.append((clave, {**ajustes, "escalado": Escalado(**escalado)
+                                          if isinstance(escalado, dict) else escalado}))
+        return resultado
+
+    def tramos_listos(self, clave):
+        return len(self.segmentos.get(clave, ()))
+
+    def pasadas_listas(self, clave):
+        return self.pasadas.get(clave, 0)
+
+    def descartar(self, clave):
+        """Marca un trabajo sin terminar como cancelado y borra sus tramos"""
+        self.estados[clave] = CANCELADO
+        self._escribir("estado", clave=clave, estado=CANCELADO)
+        shutil.rmtree(self.carpeta_trabajo(clave), ignore_errors=True)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+def formatear_segundos(segundos):
+    minutos, segundos = divmod(int(segundos), 60)
+    return f"{minutos}:{segundos:02d}"
+
+
+# ==== Búsqueda de archivos ====
+def es_lote(origen):
+    """Indica si el origen es una carpeta o un patrón glob en lugar de un único video"""
+    return os.path.isdir(origen) or glob.has_magic(origen)
+
+
+def listar_videos(origen):
+    """Retorna los MP4 de una carpeta (recursivo) o los que coinciden con un patrón glob"""
+    patron = os.path.join(origen, "**", "*") if os.path.isdir(origen) else origen
+    return sorted(
+        ruta for ruta in glob.glob(patron, recursive=True)
+        if os.path.isfile(ruta) and ruta.lower().endswith(".mp4")
+    )
+
+
+# ==== Interfaz de línea de comandos ====
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m motor_mp4",
+        description="Comprime videos MP4 con FFmpeg sin abrir la interfaz gráfica."
+    )
+    parser.add_argument("origenes", nargs="*", help="videos, carpetas o patrones glob (entre comillas)")
+    parser.add_argument("-c", "--calidad", choices=list(CALIDADES_CLI), default="28",
+                        help="nivel como CRF de x264: 20 (alta calidad), 28 (media), 35 (alta compresión); "
+                             "se traduce a la escala de cada codificador")
+    parser.add_argument("-m", "--tamaño-mb", type=float, default=None,
+                        help="tamaño máximo del resultado en MB (ignora --calidad; dos pasadas con x264/x265/VP9)")
+    parser.add_argument("-s", "--segmentos", type=int, default=None, metavar="PROCESOS",
+                        help="videos de más de 5 min: divide en tramos y los codifica en PROCESOS FFmpeg a la vez")
+    parser.add_argument("--comparar-segmentos", action="store_true",
+                        help="mide un solo proceso contra el modo por segmentos con el primer video")
+    parser.add_argument("--previsualizar", action="store_true",
+                        help="codifica unos tramos cortos en cada calidad y estima tamaño y tiempo del video completo")
+    parser.add_argument("--metrica", choices=list(METRICAS), default=None,
+                        help="con --previsualizar: calcula SSIM o VMAF de las muestras")
+    parser.add_argument("--muestras", type=int, default=MUESTRAS_PREVIA,
+                        help=f"tramos para --previsualizar (por defecto: {MUESTRAS_PREVIA} de {SEGUNDOS_MUESTRA} s)")
+    parser.add_argument("-d", "--destino", choices=list(DESTINOS), default=None,
+                        help="límite de resolución y fps: " + ", ".join(f"{e.nombre} = {e.descripcion}"
+                                                                         for e in DESTINOS.values())
+                             + f" (por defecto: {DESTINO_POR_DEFECTO}; con --tamaño-mb: mensajeria)")
+    parser.add_argument("--alto-max", type=int, default=None, help="lado corto máximo en píxeles (p. ej. 720)")
+    parser.add_argument("--fps-max", type=float, default=None, help="fotogramas por segundo máximos (p. ej. 30)")
+    parser.add_argument("--escalador", choices=list(ESCALADORES), default=None,
+                        help="algoritmo de escalado: rapido (fast_bilinear), equilibrado (bicubic), calidad (lanczos)")
+    parser.add_argument("-e", "--codificador", choices=[*CODIFICADORES, *OBJETIVOS], default=None,
+                        help="codificador del catálogo, o 'rapido'/'pequeño' para elegir el mejor disponible "
+                             f"(por defecto: {CODIFICADOR_POR_DEFECTO})")
+    parser.add_argument("--siempre-recodificar", action="store_true",
+                        help="no copia videos que ya están bien comprimidos: los recodifica todos")
+    parser.add_argument("--analizar", action="store_true",
+                        help="solo muestra qué se haría con cada video (remux, solo audio o recodificar)")
+    parser.add_argument("--listar-codificadores", action="store_true",
+                        help="muestra los codificadores del catálogo y cuáles trae este FFmpeg")
+    parser.add_argument("--medir-codificadores", action="store_true",
+                        help="codifica un tramo del video de muestra con cada codificador disponible y guarda "
+                             "velocidad/tamaño en mediciones-codificadores.json")
+    parser.add_argument("--segundos-muestra", type=float, default=10, help="duración del tramo medido (por defecto: 10)")
+    parser.add_argument("-o", "--salida", default=OUTPUT_DIR, help=f"carpeta de salida (por defecto: {OUTPUT_DIR})")
+    parser.add_argument("-j", "--concurrencia", type=int, default=None,
+                        help="videos codificados a la vez (por defecto: 1 cada 4 núcleos)")
+    parser.add_argument("-t", "--hilos", type=int, default=None,
+                        help="hilos de x264 por video (por defecto: núcleos / concurrencia)")
+    parser.add_argument("--reintentos", type=int, default=0, help="reintentos automáticos por video fallido")
+    parser.add_argument("--prioridad-menores", action="store_true",
+                        help="procesa primero los videos más livianos (resultados más rápidos)")
+    parser.add_argument("--progreso", action="store_true",
+                        help="muestra porcentaje, fps, velocidad y tiempo restante de cada video")
+    parser.add_argument("--registro", metavar="ARCHIVO.jsonl",
+                        help="agrega los eventos de progreso y de estado a un archivo JSON Lines")
+    parser.add_argument("--json", action="store_true", help="imprime el resumen en JSON")
+    parser.add_argument("--miniaturas", action="store_true",
+                        help="al terminar cada video, guarda junto al resultado un póster (_poster.jpg) y una "
+                             "hoja de contactos (_hoja.jpg)")
+    parser.add_argument("--solo-miniaturas", action="store_true",
+                        help="solo genera póster y hoja de contactos de los videos indicados (sin comprimir)")
+    parser.add_argument("--cuadros", type=int, default=CUADROS_HOJA,
+                        help=f"con --solo-miniaturas: miniaturas en la hoja (por defecto: {CUADROS_HOJA})")
+    parser.add_argument("--columnas", type=int, default=COLUMNAS_HOJA,
+                        help=f"con --solo-miniaturas: columnas de la hoja (por defecto: {COLUMNAS_HOJA})")
+    parser.add_argument("--reanudar", action="store_true",
+                        help=f"continúa los trabajos que quedaron sin terminar en {ARCHIVO_DIARIO} (carpeta de "
+                             "salida); los videos por segmentos siguen desde el último tramo terminado")
+    parser.add_argument("--sin-diario", action="store_true",
+                        help="no registra los trabajos en el diario (no se podrán reanudar)")
+    return parser
+
+
+def imprimir_progreso(trabajo, evento):
+    print(f"  {os.path.basename(evento.archivo)}: {evento.porcentaje:5.1f}% · {evento.fps:.0f} fps · "
+          f"{evento.velocidad:.2f}x · {evento.bitrate_kbps:.0f} kbit/s · "
+          f"restante {formatear_segundos(evento.eta_segundos)}", file=sys.stderr, flush=True)
+
+
+def imprimir_codificadores():
+    utilizables = disponibles()
+    mediciones = cargar_mediciones()
+    for nombre, codificador in CODIFICADORES.items():
+        medida = mediciones.get(nombre, {})
+        marca = "✓" if nombre in utilizables else " "
+        print(f"{marca} {nombre:14} {codificador.encoder:11} velocidad {medida.get('velocidad', codificador.velocidad):5.2f}x"
+              f"  tamaño {medida.get('tamaño', codificador.tamaño):4.2f}  {'(medido) ' if medida else ''}"
+              f"{codificador.descripcion}")
+    for objetivo in OBJETIVOS:
+        if utilizables:
+            print(f"--codificador {objetivo} → {elegir_codificador(objetivo, utilizables, mediciones)}")
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    calidad = CALIDADES_CLI[args.calidad]
+    if args.listar_codificadores:
+        imprimir_codificadores()
+        return 0
+    if not args.origenes and not args.reanudar:
+        crear_parser().error("indica al menos un video, carpeta o patrón (o --reanudar)")
+    videos = []
+    for origen in args.origenes:
+        videos += listar_videos(origen) if es_lote(origen) else [origen]
+    faltantes = [video for video in videos if not os.path.isfile(video)]
+    if faltantes or not (videos or args.reanudar):
+        print(f"No se encontraron videos: {', '.join(faltantes) or ' '.join(args.origenes)}", file=sys.stderr)
+        return 1
+    if not verificar_ffmpeg():
+        print("FFmpeg no está disponible.", file=sys.stderr)
+        return 2
+    if args.codificador:
+        try:
+            args.codificador = resolver_codificador(args.codificador).nombre
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+    destino = args.destino or ("mensajeria" if args.tamaño_mb else DESTINO_POR_DEFECTO)
+    escalado = resolver_escalado(destino, args.alto_max, args.fps_max, args.escalador)
+    if args.analizar:
+        codificador = resolver_codificador(args.codificador)
+        for video in videos:
+            modo, motivo = decidir_modo(sondear_video(video), nivel_calidad(calidad), codificador, escalado)
+            print(f"{modo:12} {video}: {motivo}")
+        return 0
+    if args.previsualizar:
+        for video in videos:
+            try:
+                previas = previsualizar(video, muestras=args.muestras, metrica=args.metrica,
+                                        codificador=args.codificador, escalado=escalado)
+            except ValueError as e:
+                print(f"{video}: {e}", file=sys.stderr)
+                return 2
+            if args.json:
+                print(json.dumps([asdict(previa) for previa in previas], ensure_ascii=False, indent=2))
+                continue
+            print(f"{video} ({os.path.getsize(video) / (1024 * 1024):.1f} MB)")
+            for previa in previas:
+                puntaje = f" · {previa.metrica.upper()} {previa.puntaje:.3f}" if previa.puntaje is not None else ""
+                print(f"  {previa.calidad:30} {previa.tamaño_estimado / (1024 * 1024):8.1f} MB "
+                      f"({previa.proporcion:.0%}) · ~{formatear_segundos(previa.segundos_estimados)}{puntaje}")
+        return 0
+    if args.solo_miniaturas:
+        for video in videos:
+            try:
+                imagenes = generar_miniaturas(video, args.salida, args.cuadros, args.columnas)
+            except (subprocess.CalledProcessError, ValueError) as e:
+                print(f"{video}: {(getattr(e, 'stderr', None) or str(e)).strip().splitlines()[-1]}", file=sys.stderr)
+                continue
+            print(f"{video}: {', '.join(imagenes)}")
+        return 0
+    if args.comparar_segmentos:
+        comparacion = comparar_segmentos(videos[0], calidad, args.segmentos, args.codificador, escalado)
+        if args.json:
+            print(json.dumps(comparacion, ensure_ascii=False, indent=2))
+        else:
+            print(f"Un proceso:  {comparacion['segundos_un_proceso']:.1f} s · "
+                  f"{comparacion['bytes_un_proceso'] / (1024 * 1024):.1f} MB\n"
+                  f"Segmentos:   {comparacion['segundos_segmentos']:.1f} s · "
+                  f"{comparacion['bytes_segmentos'] / (1024 * 1024):.1f} MB ({comparacion['detalle_segmentos']})\n"
+                  f"Aceleración: {comparacion['aceleracion']:.2f}x")
+        return 0
+    if args.medir_codificadores:
+        medidas = medir_codificadores(videos[0], args.segundos_muestra, calidad)
+        guardar_mediciones(medidas)
+        for nombre, medida in sorted(medidas.items(), key=lambda item: item[1]["tamaño"]):
+            print(f"{nombre:14} velocidad {medida['velocidad']:5.2f}x  tamaño {medida['tamaño']:4.2f}  "
+                  f"({medida['segundos']:.1f} s, {medida['bytes'] / 1024:.0f} KB)")
+        return 0
+
+    registro = RegistroJsonl(args.registro) if args.registro else None
+
+    def al_progresar(trabajo, evento):
+        if args.progreso:
+            imprimir_progreso(trabajo, evento)
+        if registro:
+            registro.progreso(trabajo, evento)
+
+    def al_cambiar_estado(trabajo, cola):
+        if registro:
+            registro.estado(trabajo)
+        if args.json or trabajo.estado in (PENDIENTE, PROCESANDO):
+            return
+        conteo = cola.conteo()
+        detalle = trabajo.error.splitlines()[-1] if trabajo.error else ""
+        if trabajo.resultado and trabajo.estado == TERMINADO:
+            detalle = (f"{trabajo.resultado.tamaño_original / (1024 * 1024):.1f} MB → "
+                       f"{trabajo.resultado.tamaño_final / (1024 * 1024):.1f} MB en {trabajo.resultado.segundos:.0f} s"
+                       f"{NOTAS_MODO[trabajo.resultado.modo]} · {trabajo.resultado.pasadas} pasada(s)"
+                       + (f" · {len(trabajo.resultado.imagenes)} imagen(es)" if trabajo.resultado.imagenes else ""))
+        print(f"[{conteo[TERMINADO] + conteo[ERROR] + conteo[CANCELADO]}/{len(cola.trabajos)}] "
+              f"{trabajo.estado:10} {trabajo.archivo} {detalle}")
+
+    diario = None if args.sin_diario else DiarioTrabajos(os.path.join(args.salida, ARCHIVO_DIARIO))
+    cola = ColaVideos(args.concurrencia, args.hilos, args.salida, args.reintentos, al_cambiar_estado,
+                      al_progresar if args.progreso or registro else None, diario)
+    if args.reanudar:
+        reanudados = cola.reanudar()
+        print(f"Reanudando {len(reanudados)} trabajo(s) del diario", file=sys.stderr)
+    for video in videos:
+        prioridad = -os.path.getsize(video) if args.prioridad_menores else 0
+        cola.agregar(video, calidad, prioridad, codificador=args.codificador,
+                     modo=MODO_COMPLETO if args.siempre_recodificar else MODO_AUTO,
+                     tamaño_objetivo_mb=args.tamaño_mb, segmentos=args.segmentos, escalado=escalado,
+                     miniaturas=args.miniaturas)
+    cola.iniciar()
+    try:
+        resumen = cola.esperar()
+    except KeyboardInterrupt:
+        # Ctrl+C detiene los FFmpeg sin perder lo hecho: queda en el diario para --reanudar
+        cola.detener()
+        resumen = cola.esperar()
+        if diario:
+            print("Interrumpido: usa --reanudar para continuar donde quedó.", file=sys.stderr)
+    if diario:
+        diario.cerrar()
+    if registro:
+        registro.escribir("resumen", **resumen)
+        registro.cerrar()
+
+    if args.json:
+        resumen["trabajos"] = [
+            {"archivo": t.archivo, "estado": t.estado, "intentos": t.intentos, "error": t.error,
+             "resultado": asdict(t.resultado) if t.resultado else None}
+            for t in cola.trabajos.values()
+        ]
+        print(json.dumps(resumen, ensure_ascii=False, indent=2))
+    else:
+        print(f"Cola: {resumen[TERMINADO]} terminados, {resumen[ERROR]} con error, {resumen[CANCELADO]} cancelados · "
+              f"{resumen['videos_por_minuto']:.1f} videos/min · {resumen['mb_por_segundo']:.1f} MB/s · "
+              f"{resumen['bytes_ahorrados'] / (1024 * 1024):.1f} MB ahorrados "
+              f"({resumen['concurrencia']} × {resumen['hilos_por_trabajo']} hilos)")
+        print("Modos: " + ", ".join(f"{modo} {cantidad}" for modo, cantidad in resumen["por_modo"].items())
+              + f" · {resumen['pasadas']} pasadas de FFmpeg en total")
+    return 0 if resumen[ERROR] == 0 and resumen[CANCELADO] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+# ================================================================
+# 👀 CARPETA VIGILADA (COMPRESIÓN AUTOMÁTICA SIN VENTANA)
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Vigila una carpeta de entrada y comprime cada MP4 que
+#              llega, sin que nadie tenga que pulsar "Buscar" y
+#              "Comprimir Video". En Linux usa inotify; en los demás
+#              sistemas (o si inotify falla) revisa la carpeta cada pocos
+#              segundos.
+#
+# Un archivo se encola cuando deja de crecer: mismo tamaño y fecha
+# durante SEGUNDOS_ESTABLE y se puede abrir para lectura (en Windows
+# una copia en curso está bloqueada). Al terminar, el MP4 comprimido
+# queda en videos-comprimidos y el original pasa a bandeja/procesados;
+# si falla, el original va a bandeja/cuarentena con el error en un .txt.
+#
+# Uso:
+#   python -m vigilante_mp4 bandeja/ --calidad 28 --destino web
+#   Compresor_MP4.exe --vigilar bandeja/
+# Licencia: MIT
+# ================================================================
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import shutil
+import sys
+import threading
+import time
+
+from motor_mp4 import (OUTPUT_DIR, ARCHIVO_DIARIO, CALIDADES_CLI, CODIFICADORES, DESTINOS, DESTINO_POR_DEFECTO,
+                       CANCELADO, ERROR, OBJETIVOS, TERMINADO, MODO_AUTO, ColaVideos, DiarioTrabajos, RegistroJsonl,
+                       resolver_codificador, resolver_escalado, verificar_ffmpeg)
+
+CARPETA_PROCESADOS = "procesados"
+CARPETA_CUARENTENA = "cuarentena"
+# Segundos sin cambios de tamaño antes de considerar que la copia terminó
+SEGUNDOS_ESTABLE = 5
+# Cada cuánto se revisa la carpeta sin inotify (o mientras hay archivos creciendo)
+INTERVALO_SONDEO = 2
+# Revisión de respaldo con inotify si no llega ningún evento (p. ej. carpetas de red)
+ESPERA_INOTIFY = 60
+
+
+class Inotify:
+    """Aviso del kernel de Linux cuando un archivo termina de escribirse o llega a la carpeta
+
+    Solo se piden IN_CLOSE_WRITE e IN_MOVED_TO: con IN_MODIFY cada escritura de una subida grande
+    despertaría el bucle. Mientras un archivo crece, lo sigue el sondeo de estabilidad.
+    """
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+
+    def __init__(self, carpeta):
+        if platform.system() != "Linux":
+            raise OSError("inotify solo existe en Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        mascara = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(carpeta), mascara) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"no se pudo vigilar {carpeta}")
+        # Tubería propia: despertar() corta la espera sin esperar un evento ni el tiempo límite
+        self._lectura, self._escritura = os.pipe()
+        os.set_blocking(self._lectura, False)
+        os.set_blocking(self._escritura, False)
+
+    @staticmethod
+    def _vaciar(fd):
+        try:
+            while os.read(fd, 65536):
+                pass  # solo interesa saber que hubo cambios: se vacía el búfer
+        except BlockingIOError:
+            pass
+
+    def esperar(self, segundos):
+        """Bloquea hasta que haya eventos, se llame a despertar() o pase el tiempo; retorna True si no expiró"""
+        listos, _, _ = select.select([self.fd, self._lectura], [], [], segundos)
+        for fd in listos:
+            self._vaciar(fd)
+        return bool(listos)
+
+    def despertar(self):
+        try:
+            os.write(self._escritura, b"\0")
+        except BlockingIOError:
+            pass  # la tubería ya tiene un aviso pendiente
+        except OSError:
+            pass  # ya se cerró: el bucle terminó y no hay a quién despertar
+
+    def cerrar(self):
+        for fd in (self.fd, self._lectura, self._escritura):
+            os.close(fd)
+
+
+def se_puede_leer(ruta):
+    try:
+        with open(ruta, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+def mover_sin_pisar(ruta, carpeta):
+    """Mueve el archivo a la carpeta; si ya existe uno con ese nombre, agrega un número"""
+    os.makedirs(carpeta, exist_ok=True)
+    base, extension = os.path.splitext(os.path.basename(ruta))
+    destino = os.path.join(carpeta, base + extension)
+    numero = 1
+    while os.path.exists(destino):
+        numero += 1
+        destino = os.path.join(carpeta, f"{base}-{numero}{extension}")
+    shutil.move(ruta, destino)
+    return destino
+
+
+class VigilanteCarpeta:
+    """Encola en una ColaVideos cada MP4 que llega a `bandeja` una vez que deja de crecer
+
+    `ajustes` son los argumentos de ColaVideos.agregar (calidad, codificador, escalado...).
+    """
+
+    def __init__(self, bandeja, cola, ajustes=None, segundos_estable=SEGUNDOS_ESTABLE, sondeo=False,
+                 al_mensaje=None):
+        self.bandeja = os.path.abspath(bandeja)
+        self.cola = cola
+        self.ajustes = ajustes or {}
+        self.segundos_estable = segundos_estable
+        self.al_mensaje = al_mensaje or (lambda texto: print(texto, flush=True))
+        self.procesados = os.path.join(self.bandeja, CARPETA_PROCESADOS)
+        self.cuarentena = os.path.join(self.bandeja, CARPETA_CUARENTENA)
+        # ruta → (tamaño, fecha de modificación, desde cuándo no cambia)
+        self._vistos = {}
+        self._encolados = set()
+        self._candado = threading.Lock()
+        self.detener = threading.Event()
+        self.inotify = None
+        if not sondeo:
+            try:
+                self.inotify = Inotify(self.bandeja)
+            except (OSError, AttributeError) as e:
+                self.al_mensaje(f"inotify no disponible ({e}); se revisará la carpeta cada {INTERVALO_SONDEO} s")
+
+    def al_cambiar_estado(self, trabajo, cola):
+        """Conectar a ColaVideos(al_cambiar_estado=...): mueve el original según el resultado
+
+        Un trabajo cancelado deja el original en la bandeja y se vuelve a encolar en la próxima revisión.
+        """
+        if trabajo.estado not in (TERMINADO, ERROR, CANCELADO):
+            return
+        ruta = os.path.abspath(trabajo.archivo)
+        if os.path.dirname(ruta) != self.bandeja:
+            return  # un video agregado a la misma cola desde otro lado: no se toca
+        with self._candado:
+            self._encolados.discard(ruta)
+            self._vistos.pop(ruta, None)
+        if trabajo.estado == CANCELADO:
+            inotify = self.inotify  # ejecutar() lo pone en None al terminar, desde otro hilo
+            if inotify and not self.detener.is_set():
+                inotify.despertar()  # el archivo no cambió: sin esto no habría evento que lo reencole
+            return
+        if not os.path.exists(ruta):
+            return
+        if trabajo.estado == TERMINADO:
+            mover_sin_pisar(ruta, self.procesados)
+            self.al_mensaje(f"✓ {os.path.basename(ruta)} → {trabajo.resultado.archivo_salida}")
+            return
+        salida = cola.salida_de(trabajo)
+        if os.path.exists(salida):
+            os.remove(salida)  # no dejar un MP4 a medio escribir en la carpeta de salida
+        destino = mover_sin_pisar(ruta, self.cuarentena)
+        with open(destino + ".error.txt", "w", encoding="utf-8") as f:
+            f.write(trabajo.error)
+        self.al_mensaje(f"✗ {os.path.basename(ruta)} → {destino} ({(trabajo.error.splitlines() or [''])[-1]})")
+
+    def marcar_encolados(self, trabajos):
+        """Registra trabajos ya encolados (p. ej. reanudados del diario) para no encolarlos dos veces"""
+        with self._candado:
+            self._encolados.update(os.path.abspath(trabajo.archivo) for trabajo in trabajos)
+
+    def revisar(self):
+        """Encola los MP4 estables; retorna cuántos siguen creciendo"""
+        ahora = time.monotonic()
+        creciendo = 0
+        presentes = set()
+        with os.scandir(self.bandeja) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file() or not entrada.name.lower().endswith(".mp4"):
+                    continue
+                ruta = os.path.abspath(entrada.path)
+                presentes.add(ruta)
+                with self._candado:
+                    if ruta in self._encolados:
+                        continue
+                try:
+                    datos = entrada.stat()
+                except OSError:
+                    continue  # se movió o borró mientras se revisaba
+                firma = (datos.st_size, datos.st_mtime)
+                anterior = self._vistos.get(ruta)
+                if anterior is None or anterior[:2] != firma:
+                    self._vistos[ruta] = (*firma, ahora)
+                    creciendo += 1
+                elif (ahora - anterior[2] >= self.segundos_estable and datos.st_size > 0
+                      and se_puede_leer(ruta)):
+                    self._encolar(ruta)
+                else:
+                    creciendo += 1
+        for ruta in set(self._vistos) - presentes:
+            self._vistos.pop(ruta, None)
+        return creciendo
+
+    def _encolar(self, ruta):
+        with self._candado:
+            self._encolados.add(ruta)
+        self.cola.agregar(ruta, **self.ajustes)
+        self.cola.iniciar()
+        self.al_mensaje(f"→ en cola: {os.path.basename(ruta)}")
+
+    def parar(self):
+        """Termina el bucle de ejecutar() enseguida, aunque esté esperando eventos de inotify"""
+        self.detener.set()
+        inotify = self.inotify
+        if inotify:
+            inotify.despertar()
+
+    def ejecutar(self):
+        """Bucle principal; termina al llamar a parar()"""
+        self.al_mensaje(f"Vigilando {self.bandeja} ({'inotify' if self.inotify else 'sondeo'})")
+        try:
+            while not self.detener.is_set():
+                creciendo = self.revisar()
+                if self.inotify:
+                    # Con archivos a medio copiar se vuelve a mirar pronto aunque no lleguen eventos
+                    self.inotify.esperar(INTERVALO_SONDEO if creciendo else ESPERA_INOTIFY)
+                else:
+                    self.detener.wait(INTERVALO_SONDEO)
+        finally:
+            # Primero detener: los avisos que lleguen después (p. ej. cancelaciones por Ctrl+C) no despiertan nada
+            self.detener.set()
+            inotify, self.inotify = self.inotify, None
+            if inotify:
+                inotify.cerrar()
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m vigilante_mp4",
+        description="Vigila una carpeta y comprime automáticamente cada MP4 que llega."
+    )
+    parser.add_argument("bandeja", help="carpeta de entrada a vigilar")
+    parser.add_argument("-c", "--calidad", choices=list(CALIDADES_CLI), default="28",
+                        help="20 (alta calidad), 28 (media), 35 (alta compresión)")
+    parser.add_argument("-m", "--tamaño-mb", type=float, default=None, help="tamaño máximo del resultado en MB")
+    parser.add_argument("-d", "--destino", choices=list(DESTINOS), default=None,
+                        help=f"límite de resolución y fps (por defecto: {DESTINO_POR_DEFECTO})")
+    parser.add_argument("-e", "--codificador", choices=[*CODIFICADORES, *OBJETIVOS], default=None,
+                        help="codificador del catálogo, o 'rapido'/'pequeño'")
+    parser.add_argument("-s", "--segmentos", type=int, default=None, metavar="PROCESOS",
+                        help="videos de más de 5 min: tramos codificados en PROCESOS FFmpeg a la vez")
+    parser.add_argument("--miniaturas", action="store_true",
+                        help="guarda también póster y hoja de contactos junto a cada resultado")
+    parser.add_argument("-o", "--salida", default=OUTPUT_DIR, help=f"carpeta de salida (por defecto: {OUTPUT_DIR})")
+    parser.add_argument("-j", "--concurrencia", type=int, default=None, help="videos codificados a la vez")
+    parser.add_argument("-t", "--hilos", type=int, default=None, help="hilos del codificador por video")
+    parser.add_argument("--reintentos", type=int, default=1, help="reintentos antes de la cuarentena (por defecto: 1)")
+    parser.add_argument("--estable", type=float, default=SEGUNDOS_ESTABLE,
+                        help=f"segundos sin cambios de tamaño para dar la copia por terminada "
+                             f"(por defecto: {SEGUNDOS_ESTABLE})")
+    parser.add_argument("--sondeo", action="store_true", help="revisa la carpeta periódicamente en vez de usar inotify")
+    parser.add_argument("--registro", metavar="ARCHIVO.jsonl", help="agrega los eventos a un archivo JSON Lines")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if not os.path.isdir(args.bandeja):
+        print(f"No existe la carpeta: {args.bandeja}", file=sys.stderr)
+        return 1
+    if not verificar_ffmpeg():
+        print("FFmpeg no está disponible.", file=sys.stderr)
+        return 2
+    codificador = resolver_codificador(args.codificador).nombre if args.codificador else None
+    destino = args.destino or ("mensajeria" if args.tamaño_mb else DESTINO_POR_DEFECTO)
+    ajustes = {"calidad": CALIDADES_CLI[args.calidad], "codificador": codificador, "modo": MODO_AUTO,
+               "tamaño_objetivo_mb": args.tamaño_mb, "segmentos": args.segmentos,
+               "escalado": resolver_escalado(destino), "miniaturas": args.miniaturas}
+
+    registro = RegistroJsonl(args.registro) if args.registro else None
+    diario = DiarioTrabajos(os.path.join(args.salida, ARCHIVO_DIARIO))
+    vigilante = None
+
+    def al_cambiar_estado(trabajo, cola):
+        if registro:
+            registro.estado(trabajo)
+        if vigilante:
+            vigilante.al_cambiar_estado(trabajo, cola)
+
+    cola = ColaVideos(args.concurrencia, args.hilos, args.salida, args.reintentos, al_cambiar_estado, diario=diario)
+    vigilante = VigilanteCarpeta(args.bandeja, cola, ajustes, args.estable, args.sondeo)
+    # Lo que quedó a medias de la carpeta vigilada en una ejecución anterior sigue donde quedó
+    vigilante.marcar_encolados(cola.reanudar(vigilante.bandeja))
+    cola.iniciar()
+    try:
+        vigilante.ejecutar()
+    except KeyboardInterrupt:
+        cola.detener()
+        cola.esperar()
+    finally:
+        diario.cerrar()
+        if registro:
+            registro.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# ================================================================
+# 🎯 CALIDAD AUTOMÁTICA POR OBJETIVO PERCEPTUAL (SSIM)
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: En lugar de una calidad fija para todas las imágenes, busca
+#              por bisección la calidad más baja cuyo resultado mantiene un
+#              SSIM mínimo frente al original. La métrica se calcula con
+#              NumPy sobre copias reducidas (lado mayor de 512 px), así cada
+#              intento cuesta poco más que la codificación.
+#              La calidad encontrada se guarda por hash del contenido: si la
+#              misma imagen vuelve a llegar se codifica una sola vez.
+#
+# NumPy es opcional: sin él la app funciona igual, solo sin este modo.
+# Licencia: MIT
+# ================================================================
+
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ==== Configuración por defecto ====
+SSIM_OBJETIVO = 0.98
+CALIDAD_MINIMA = 40
+CALIDAD_MAXIMA = 95
+INTENTOS_MAXIMOS = 6  # bisección sobre 40-95: 6 intentos bastan para llegar a la calidad exacta
+LADO_METRICA = 512
+VENTANA_SSIM = 8
+TAMAÑO_BLOQUE = 1024 * 1024
+CARPETA_CACHE = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "conversor-imagenes", "calidad"
+)
+
+
+@dataclass
+class BusquedaCalidad:
+    """Calidad elegida para una imagen y los bytes ya codificados con ella"""
+    calidad: int
+    ssim: float
+    intentos: int
+    datos: bytes
+    desde_cache: bool = False
+
+
+def numpy_disponible():
+    return np is not None
+
+
+def requerir_numpy():
+    if np is None:
+        raise RuntimeError("La calidad automática necesita NumPy: pip install numpy")
+
+
+def hash_archivo(ruta):
+    """Calcula el SHA-256 del contenido leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMAÑO_BLOQUE), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+# ==== Métrica ====
+def tamaño_metrica(tamaño, lado=LADO_METRICA):
+    """Tamaño reducido (sin agrandar) en el que se compara original y codificada"""
+    ancho, alto = tamaño
+    escala = min(1.0, lado / max(ancho, alto))
+    return max(1, round(ancho * escala)), max(1, round(alto * escala))
+
+
+def matriz_metrica(img, tamaño):
+    """Luminancia de la imagen reducida a `tamaño`, como matriz float64; la transparencia se aplana sobre blanco"""
+    if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        reducida = img.resize(tamaño, Image.BOX, reducing_gap=2.0)
+        fondo = Image.new("RGBA", tamaño, (255, 255, 255, 255))
+        reducida = Image.alpha_composite(fondo, reducida)
+    else:
+        reducida = img.resize(tamaño, Image.BOX, reducing_gap=2.0) if img.size != tamaño else img
+    return np.asarray(reducida.convert("L"), dtype=np.float64)
+
+
+def media_ventana(matriz, lado):
+    """Media de cada ventana lado×lado (solo las que caben enteras) con una imagen integral"""
+    integral = np.pad(matriz.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+    suma = integral[lado:, lado:] - integral[:-lado, lado:] - integral[lado:, :-lado] + integral[:-lado, :-lado]
+    return suma / (lado * lado)
+
+
+def ssim(a, b, ventana=VENTANA_SSIM):
+    """SSIM medio entre dos matrices de luminancia del mismo tamaño (1.0 = idénticas)"""
+    ventana = max(1, min(ventana, *a.shape))
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    media_a, media_b = media_ventana(a, ventana), media_ventana(b, ventana)
+    varianza_a = media_ventana(a * a, ventana) - media_a ** 2
+    varianza_b = media_ventana(b * b, ventana) - media_b ** 2
+    covarianza = media_ventana(a * b, ventana) - media_a * media_b
+    mapa = (((2 * media_a * media_b + c1) * (2 * covarianza + c2))
+            / ((media_a ** 2 + media_b ** 2 + c1) * (varianza_a + varianza_b + c2)))
+    return float(mapa.mean())
+
+
+# ==== Búsqueda ====
+def buscar_calidad(img, codificar, objetivo=SSIM_OBJETIVO, minima=CALIDAD_MINIMA, maxima=CALIDAD_MAXIMA,
+                   intentos_maximos=INTENTOS_MAXIMOS, calidad_conocida=None):
+    """Retorna la calidad más baja cuyo resultado alcanza `objetivo` de SSIM
+
+    codificar(calidad) debe retornar los bytes de la imagen codificada. Si ninguna calidad
+    probada alcanza el objetivo se usa `maxima`. Con `calidad_conocida` (caché) no se busca:
+    se codifica una sola vez con ella.
+    """
+    if calidad_conocida is not None:
+        return BusquedaCalidad(calidad_conocida, None, 1, codificar(calidad_conocida), desde_cache=True)
+
+    requerir_numpy()
+    tamaño = tamaño_metrica(img.size)
+    referencia = matriz_metrica(img, tamaño)
+
+    def medir(calidad):
+        datos = codificar(calidad)
+        with Image.open(io.BytesIO(datos)) as candidata:
+            if candidata.format == "JPEG":
+                candidata.draft("L", tamaño)  # solo hace falta la luminancia reducida
+            return datos, ssim(referencia, matriz_metrica(candidata, tamaño))
+
+    bajo, alto, intentos = minima, maxima, 0
+    mejor = ultimo = None
+    while bajo <= alto and intentos < intentos_maximos:
+        calidad = (bajo + alto) // 2
+        datos, valor = medir(calidad)
+        intentos += 1
+        ultimo = (calidad, valor, datos)
+        if valor >= objetivo:
+            mejor, alto = ultimo, calidad - 1
+        else:
+            bajo = calidad + 1
+
+    if mejor is None:
+        if ultimo and ultimo[0] == maxima:
+            mejor = ultimo
+        else:
+            mejor = (maxima, *medir(maxima))
+            intentos += 1
+    calidad, valor, datos = mejor
+    return BusquedaCalidad(calidad, valor, intentos, datos)
+
+
+# ==== Caché por hash de imagen ====
+class CacheCalidad:
+    """Calidad encontrada por imagen, un JSON por entrada para que varios procesos escriban sin pisarse"""
+
+    def __init__(self, carpeta=CARPETA_CACHE):
+        self.carpeta = carpeta
+        os.makedirs(self.carpeta, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.carpeta, f"{clave}.json")
+
+    def clave(self, archivo, *variante):
+        """Clave de la entrada: hash del contenido + formato, objetivo y rango de calidades"""
+        digest = hashlib.sha256(hash_archivo(archivo).encode())
+        for parte in variante:
+            digest.update(b"\0" + str(parte).encode())
+        return digest.hexdigest()
+
+    def obtener(self, clave):
+        try:
+            with open(self._ruta(clave), encoding="utf-8") as f:
+                return int(json.load(f)["calidad"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def guardar(self, clave, busqueda):
+        temporal = f"{self._ruta(clave)}.tmp-{os.getpid()}"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"calidad": busqueda.calidad, "ssim": busqueda.ssim, "intentos": busqueda.intentos}, f)
+        os.replace(temporal, self._ruta(clave))
@@ -1,11 +1,17 @@
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image
 import threading
 import platform
 import sys
 import webbrowser
+import multiprocessing
+
+import motor_imagenes
+from motor_imagenes import (OUTPUT_DIR, FORMATOS, EXTENSIONES_VALIDAS, ANCHOS_POR_DEFECTO, FORMATOS_RESPONSIVE,
+                            obtener_tamaño_archivo, es_lote, listar_imagenes, raiz_de_origen)
+from calidad_imagenes import SSIM_OBJETIVO, numpy_disponible
+from memoria_imagenes import MEMORIA_POR_DEFECTO_MB
 
 # ================================================================
 # 🖼️ CONVERSOR DE IMÁGENES A WEBP/AVIF - APLICACIÓN DE ESCRITORIO
@@ -16,6 +22,7 @@ import webbrowser
 # 🏷 Marca personal: MRStudio (https://mrstudio.dev)
 # Descripción: Conversor de imágenes a formatos web modernos (WebP/AVIF)
 #              Optimizado para performance web y Core Web Vitals
+#              (la lógica de conversión vive en motor_imagenes.py)
 # Versión: 1.0.0 - Diciembre 2025
 # Licencia: MIT
 # ================================================================
@@ -27,7 +34,6 @@ def ruta_recurso(relative_path):
     return os.path.join(os.path.abspath("."), relative_path)
 
 # ==== Carpeta de salida ====
-OUTPUT_DIR = "imagenes-convertidas"
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
@@ -39,75 +45,46 @@ def centrar_ventana(ventana, ancho, alto):
     y = int((pantalla_alto / 2) - (alto / 2))
     ventana.geometry(f"{ancho}x{alto}+{x}+{y}")
 
-def obtener_tamaño_archivo(ruta):
-    """Retorna el tamaño del archivo en KB o MB"""
-    tamaño = os.path.getsize(ruta)
-    if tamaño < 1024 * 1024:
-        return f"{tamaño / 1024:.1f} KB"
-    return f"{tamaño / (1024 * 1024):.1f} MB"
+def abrir_carpeta_salida():
+    """Abre la carpeta de salida en el explorador del sistema"""
+    if platform.system() == "Windows":
+        os.startfile(os.path.abspath(OUTPUT_DIR))
+    elif platform.system() == "Darwin":  # macOS
+        os.system(f'open "{os.path.abspath(OUTPUT_DIR)}"')
+    else:  # Linux
+        os.system(f'xdg-open "{os.path.abspath(OUTPUT_DIR)}"')
 
-def convertir_imagen(archivo, formato_salida, calidad, ventana_modal):
+def convertir_imagen(archivo, formato_salida, calidad, objetivo_ssim, memoria_mb, ventana_modal):
     """Convierte una imagen al formato seleccionado"""
     try:
-        # Validar archivo
-        if not os.path.exists(archivo):
-            raise FileNotFoundError("El archivo no existe")
-        
-        # Obtener información del archivo original
-        tamaño_original = obtener_tamaño_archivo(archivo)
-        
-        # Abrir imagen
-        img = Image.open(archivo)
-        
-        # Convertir RGBA a RGB si es necesario para JPEG o formatos sin transparencia
-        if img.mode in ('RGBA', 'LA', 'P') and formato_salida.lower() in ['jpg', 'jpeg']:
-            fondo = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            fondo.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = fondo
-        
-        # Generar nombre de archivo de salida
-        nombre_base = os.path.splitext(os.path.basename(archivo))[0]
-        extension_salida = formato_salida.lower()
-        archivo_salida = os.path.join(OUTPUT_DIR, f"{nombre_base}_converted.{extension_salida}")
-        
-        # Configuración según formato
-        if formato_salida.upper() == "WEBP":
-            img.save(archivo_salida, "WEBP", quality=calidad, method=6)
-        elif formato_salida.upper() == "AVIF":
-            img.save(archivo_salida, "AVIF", quality=calidad)
-        elif formato_salida.upper() == "PNG":
-            img.save(archivo_salida, "PNG", optimize=True)
-        elif formato_salida.upper() in ["JPG", "JPEG"]:
-            img.save(archivo_salida, "JPEG", quality=calidad, optimize=True)
-        
-        # Obtener información del archivo convertido
-        tamaño_convertido = obtener_tamaño_archivo(archivo_salida)
-        reduccion = ((os.path.getsize(archivo) - os.path.getsize(archivo_salida)) / os.path.getsize(archivo)) * 100
-        
+        resultado = motor_imagenes.convertir_imagen(archivo, formato_salida, calidad, OUTPUT_DIR,
+                                                    objetivo_ssim=objetivo_ssim, memoria_mb=memoria_mb)
+
         ventana_modal.destroy()
-        
+
         # Mostrar resultado
         mensaje_resultado = f"✅ Imagen convertida exitosamente\n\n"
-        mensaje_resultado += f"📊 Original: {tamaño_original}\n"
-        mensaje_resultado += f"📊 Convertida: {tamaño_convertido}\n"
-        mensaje_resultado += f"💾 Reducción: {reduccion:.1f}%\n\n"
+        mensaje_resultado += f"📊 Original: {obtener_tamaño_archivo(archivo)}\n"
+        mensaje_resultado += f"📊 Convertida: {obtener_tamaño_archivo(resultado.archivo_salida)}\n"
+        mensaje_resultado += f"💾 Reducción: {resultado.reduccion:.1f}%\n"
+        if resultado.desde_cache:
+            mensaje_resultado += f"🎯 Calidad automática: {resultado.calidad}% (ya analizada antes)\n"
+        elif resultado.ssim is not None:
+            mensaje_resultado += (f"🎯 Calidad automática: {resultado.calidad}% · SSIM {resultado.ssim:.3f} "
+                                  f"en {resultado.intentos} intentos\n")
+        if resultado.pico_memoria:
+            mensaje_resultado += f"🐘 Pico de memoria: {resultado.pico_memoria / (1024 * 1024):.0f} MB"
+            mensaje_resultado += f" · {resultado.escalada}\n" if resultado.escalada else "\n"
+        mensaje_resultado += "\n"
         mensaje_resultado += f"📂 Guardado en: {OUTPUT_DIR}"
-        
+
         label_estado.config(
             text=mensaje_resultado,
             fg="#F5B83A", 
             font=("Segoe UI", 9, "bold")
         )
-        
-        # Abrir carpeta de salida
-        if platform.system() == "Windows":
-            os.startfile(os.path.abspath(OUTPUT_DIR))
-        elif platform.system() == "Darwin":  # macOS
-            os.system(f'open "{os.path.abspath(OUTPUT_DIR)}"')
-        else:  # Linux
-            os.system(f'xdg-open "{os.path.abspath(OUTPUT_DIR)}"')
+
+        abrir_carpeta_salida()
 
     except Exception as e:
         ventana_modal.destroy()
@@ -115,9 +92,59 @@ def convertir_imagen(archivo, formato_salida, calidad, ventana_modal):
     finally:
         btn_convertir.config(state=tk.NORMAL)
 
+def convertir_lote(archivos, raiz, formato_salida, calidad, objetivo_ssim, memoria_mb, responsive, incremental,
+                   ventana_modal, barra, lista_resultados):
+    """Convierte el lote en procesos paralelos y muestra cada resultado al terminar"""
+    try:
+        def al_terminar_archivo(archivo, estado, detalle, resumen):
+            procesados = resumen["correctos"] + resumen["errores"]
+            icono = "✅" if estado == "ok" else "❌"
+            texto = f"{icono} {os.path.basename(archivo)}  {detalle}"
+            ventana.after(0, lambda: (barra.config(value=procesados), lista_resultados.insert(tk.END, texto),
+                                      lista_resultados.see(tk.END)))
+
+        if responsive:
+            resumen = motor_imagenes.generar_responsive_lote(archivos, calidad=calidad, carpeta_salida=OUTPUT_DIR,
+                                                             al_terminar_archivo=al_terminar_archivo,
+                                                             incremental=incremental, raiz=raiz)
+        else:
+            resumen = motor_imagenes.convertir_lote(archivos, formato_salida, calidad, carpeta_salida=OUTPUT_DIR,
+                                                    al_terminar_archivo=al_terminar_archivo,
+                                                    objetivo_ssim=objetivo_ssim, incremental=incremental,
+                                                    memoria_mb=memoria_mb, raiz=raiz)
+
+        if incremental:
+            omitidas = (f"⏭ {resumen['sin_cambios']} sin cambios (omitidas) · "
+                        f"🧹 {resumen['salidas_eliminadas']} salidas huérfanas eliminadas\n")
+            ventana.after(0, lambda: (barra.config(maximum=max(1, resumen["archivos"]), value=resumen["archivos"]),
+                                      lista_resultados.insert(tk.END, omitidas.strip())))
+        else:
+            omitidas = ""
+
+        ventana.after(0, lambda: label_estado.config(
+            text=(f"✅ Lote terminado: {resumen['correctos']} de {resumen['archivos']} imágenes "
+                  f"({resumen['errores']} con error)\n"
+                  f"⚡ {resumen['imagenes_por_segundo']:.1f} imágenes/s con {resumen['workers']} procesos · "
+                  f"💾 Ahorro: {resumen['bytes_ahorrados'] / (1024 * 1024):.1f} MB\n"
+                  f"{omitidas}"
+                  f"📂 Guardado en: {OUTPUT_DIR}"),
+            fg="#F5B83A", font=("Segoe UI", 9, "bold")
+        ))
+        ventana.after(0, lambda: ventana_modal.title("Lote terminado"))
+        abrir_carpeta_salida()
+
+    except Exception as e:
+        ventana.after(0, ventana_modal.destroy)
+        ventana.after(0, lambda: messagebox.showerror("Error", f"Ocurrió un problema con el lote:\n{e}"))
+    finally:
+        ventana.after(0, lambda: btn_convertir.config(state=tk.NORMAL))
+
 def iniciar_conversion():
     """Inicia el proceso de conversión en un hilo separado"""
     archivo = entry_archivo.get()
+    if archivo and (es_lote(archivo) or var_responsive.get()):
+        iniciar_conversion_lote(archivo)
+        return
     
     # Validaciones
     if not archivo or not os.path.exists(archivo):
@@ -125,14 +152,15 @@ def iniciar_conversion():
         return
     
     # Validar extensión
-    extensiones_validas = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp']
     extension = os.path.splitext(archivo)[1].lower()
-    if extension not in extensiones_validas:
+    if extension not in EXTENSIONES_VALIDAS:
         messagebox.showerror("Error", "Formato de imagen no soportado.\nFormatos válidos: JPG, PNG, BMP, GIF, TIFF, WebP")
         return
     
     formato_salida = combo_formato.get()
     calidad = int(slider_calidad.get())
+    objetivo_ssim = objetivo_calidad()
+    memoria_mb = MEMORIA_POR_DEFECTO_MB if var_enormes.get() else None
     
     # Ventana modal de progreso
     modal = tk.Toplevel(ventana)
@@ -145,7 +173,7 @@ def iniciar_conversion():
     tk.Label(modal, text="🔄 Convirtiendo imagen, por favor espere...",
              font=("Segoe UI", 10), fg="white", bg="#003DA6").pack(pady=10)
     
-    tk.Label(modal, text=f"Formato destino: {formato_salida} | Calidad: {calidad}%",
+    tk.Label(modal, text=f"Formato destino: {formato_salida} | {texto_calidad(calidad, objetivo_ssim)}",
              font=("Segoe UI", 9), fg="#F5B83A", bg="#003DA6").pack(pady=5)
     
     barra = ttk.Progressbar(modal, mode="indeterminate", length=300)
@@ -158,7 +186,59 @@ def iniciar_conversion():
     # Iniciar conversión en hilo separado
     threading.Thread(
         target=convertir_imagen, 
-        args=(archivo, formato_salida, calidad, modal), 
+        args=(archivo, formato_salida, calidad, objetivo_ssim, memoria_mb, modal), 
+        daemon=True
+    ).start()
+
+def iniciar_conversion_lote(origen):
+    """Convierte todas las imágenes de una carpeta (recursivo) o patrón glob; el set responsive también
+    usa esta ventana para una sola imagen"""
+    archivos = listar_imagenes(origen) if es_lote(origen) else [origen]
+    if not archivos or not os.path.exists(archivos[0]):
+        messagebox.showerror("Error", "No se encontraron imágenes en la carpeta o patrón indicado.")
+        return
+
+    formato_salida = combo_formato.get()
+    calidad = int(slider_calidad.get())
+    objetivo_ssim = objetivo_calidad()
+    memoria_mb = MEMORIA_POR_DEFECTO_MB if var_enormes.get() else None
+    responsive = var_responsive.get()
+    incremental = var_incremental.get()
+    if responsive:
+        destino = (f"Set responsive: {'/'.join(map(str, ANCHOS_POR_DEFECTO))} px en "
+                   f"{' + '.join(FORMATOS_RESPONSIVE)} | Calidad: {calidad}%")
+    else:
+        destino = f"Formato destino: {formato_salida} | {texto_calidad(calidad, objetivo_ssim)}"
+
+    # Ventana con la lista de resultados por archivo (queda abierta al terminar)
+    modal = tk.Toplevel(ventana)
+    modal.title("Convirtiendo lote de imágenes...")
+    modal.configure(bg="#003DA6")
+    centrar_ventana(modal, 520, 360)
+
+    tk.Label(modal, text=f"🔄 Convirtiendo {len(archivos)} imágenes con {os.cpu_count() or 1} procesos...",
+             font=("Segoe UI", 10), fg="white", bg="#003DA6").pack(pady=10)
+    tk.Label(modal, text=destino, font=("Segoe UI", 9), fg="#F5B83A", bg="#003DA6").pack()
+
+    barra = ttk.Progressbar(modal, mode="determinate", length=460, maximum=len(archivos))
+    barra.pack(pady=10)
+
+    frame_lista = tk.Frame(modal, bg="#003DA6")
+    frame_lista.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+    scroll = tk.Scrollbar(frame_lista)
+    scroll.pack(side=tk.RIGHT, fill="y")
+    lista_resultados = tk.Listbox(frame_lista, font=("Segoe UI", 9), yscrollcommand=scroll.set,
+                                  relief="flat", activestyle="none")
+    lista_resultados.pack(side=tk.LEFT, fill="both", expand=True)
+    scroll.config(command=lista_resultados.yview)
+
+    btn_convertir.config(state=tk.DISABLED)
+    label_estado.config(text="")
+
+    threading.Thread(
+        target=convertir_lote,
+        args=(archivos, raiz_de_origen(origen), formato_salida, calidad, objetivo_ssim, memoria_mb, responsive,
+              incremental, modal, barra, lista_resultados),
         daemon=True
     ).start()
 
@@ -180,192 +260,296 @@ def seleccionar_imagen():
         tamaño = obtener_tamaño_archivo(archivo)
         label_info_archivo.config(text=f"📊 Tamaño actual: {tamaño}")
 
+def seleccionar_carpeta():
+    """Abre el diálogo para seleccionar una carpeta completa (modo lote)"""
+    carpeta = filedialog.askdirectory()
+    if carpeta:
+        entry_archivo.delete(0, tk.END)
+        entry_archivo.insert(0, carpeta)
+        label_info_archivo.config(text=f"📊 Imágenes encontradas (incluye subcarpetas): {len(listar_imagenes(carpeta))}")
+
+def objetivo_calidad():
+    """SSIM objetivo si la calidad automática está activa, o None para usar el slider"""
+    return SSIM_OBJETIVO if var_auto.get() else None
+
+def texto_calidad(calidad, objetivo_ssim):
+    return f"Calidad: automática (SSIM ≥ {objetivo_ssim})" if objetivo_ssim else f"Calidad: {calidad}%"
+
+def alternar_calidad_auto():
+    """El slider no se usa mientras la calidad automática está activa"""
+    slider_calidad.config(state=tk.DISABLED if var_auto.get() else tk.NORMAL)
+
 def actualizar_label_calidad(valor):
     """Actualiza el label de calidad al mover el slider"""
     label_calidad_valor.config(text=f"{int(float(valor))}%")
 
-# ==== Interfaz principal ====
-ventana = tk.Tk()
-ventana.title("Conversor de Imágenes WebP/AVIF - Miguel Ramos A. (MRStudio)")
-ventana.configure(bg="#003DA6")
-centrar_ventana(ventana, 680, 520)
-ventana.resizable(False, False)
-
-fuente = ("Segoe UI", 11)
-fuente_boton = ("Segoe UI", 10, "bold")
-fuente_small = ("Segoe UI", 9)
-
-# ==== Título ====
-tk.Label(
-    ventana, 
-    text="🖼️ Conversor de Imágenes a Formatos Web Modernos",
-    font=("Segoe UI", 12, "bold"), 
-    bg="#003DA6", 
-    fg="white"
-).pack(pady=(15, 5))
-
-# ==== Selección de archivo ====
-tk.Label(
-    ventana, 
-    text="📁 Seleccione una imagen para convertir:",
-    font=fuente, 
-    bg="#003DA6", 
-    fg="white"
-).pack(pady=(15, 5))
-
-frame_input = tk.Frame(ventana, bg="#003DA6")
-frame_input.pack()
-
-entry_archivo = tk.Entry(frame_input, width=50, font=fuente, bd=2, relief="solid")
-entry_archivo.pack(side=tk.LEFT, padx=(0, 5))
-
-tk.Button(
-    frame_input, 
-    text="Buscar", 
-    command=seleccionar_imagen, 
-    bg="white", 
-    fg="#003DA6",
-    font=fuente_small,
-    cursor="hand2",
-    relief="flat",
-    padx=15
-).pack(side=tk.LEFT)
-
-# Label info archivo
-label_info_archivo = tk.Label(
-    ventana, 
-    text="", 
-    font=fuente_small, 
-    fg="#F5B83A", 
-    bg="#003DA6"
-)
-label_info_archivo.pack(pady=(5, 0))
-
-# ==== Formato de salida ====
-tk.Label(
-    ventana, 
-    text="🎯 Seleccione el formato de salida:",
-    font=fuente, 
-    bg="#003DA6", 
-    fg="white"
-).pack(pady=(15, 5))
-
-combo_formato = ttk.Combobox(
-    ventana,
-    values=["WEBP", "AVIF", "PNG", "JPG"],
-    state="readonly",
-    font=fuente,
-    width=20
-)
-combo_formato.set("WEBP")
-combo_formato.pack()
-
-# Descripción de formatos
-frame_info = tk.Frame(ventana, bg="#003DA6")
-frame_info.pack(pady=(5, 0))
-
-info_text = "💡 WebP: Mejor compatibilidad | AVIF: Mayor compresión | PNG: Sin pérdida"
-tk.Label(
-    frame_info, 
-    text=info_text,
-    font=("Segoe UI", 8), 
-    fg="white", 
-    bg="#003DA6"
-).pack()
-
-# ==== Control de calidad ====
-tk.Label(
-    ventana, 
-    text="⚙️ Ajuste la calidad de conversión:",
-    font=fuente, 
-    bg="#003DA6", 
-    fg="white"
-).pack(pady=(15, 5))
-
-frame_calidad = tk.Frame(ventana, bg="#003DA6")
-frame_calidad.pack()
-
-slider_calidad = tk.Scale(
-    frame_calidad,
-    from_=60,
-    to=100,
-    orient=tk.HORIZONTAL,
-    length=300,
-    bg="#003DA6",
-    fg="white",
-    highlightthickness=0,
-    troughcolor="#4A90E2",
-    command=actualizar_label_calidad
-)
-slider_calidad.set(85)
-slider_calidad.pack(side=tk.LEFT, padx=(0, 10))
-
-label_calidad_valor = tk.Label(
-    frame_calidad,
-    text="85%",
-    font=("Segoe UI", 11, "bold"),
-    fg="#F5B83A",
-    bg="#003DA6",
-    width=5
-)
-label_calidad_valor.pack(side=tk.LEFT)
-
-tk.Label(
-    ventana, 
-    text="🛈 Calidad recomendada: 80-90% (balance entre peso y calidad visual)",
-    font=("Segoe UI", 8), 
-    fg="white", 
-    bg="#003DA6"
-).pack(pady=(5, 10))
-
-# ==== Botón convertir ====
-btn_convertir = tk.Button(
-    ventana, 
-    text="🔄 Convertir Imagen",
-    font=fuente_boton, 
-    bg="#4A90E2", 
-    fg="white",
-    activebackground="#3c78c9", 
-    relief="flat",
-    cursor="hand2", 
-    command=iniciar_conversion,
-    padx=30,
-    pady=10
-)
-btn_convertir.pack(pady=(10, 10))
-
-# ==== Label de estado ====
-label_estado = tk.Label(
-    ventana, 
-    text="", 
-    font=("Segoe UI", 9), 
-    fg="white", 
-    bg="#003DA6",
-    justify=tk.LEFT
-)
-label_estado.pack(pady=(5, 10))
-
-# ==== Footer ====
-footer = tk.Frame(ventana, bg="#003DA6")
-footer.pack(fill="x", side=tk.BOTTOM, pady=(10, 5))
-
-tk.Label(
-    footer, 
-    text="Dev. Miguel Ramos Alarcón - MRStudio",
-    font=("Segoe UI", 9), 
-    fg="#F5B83A", 
-    bg="#003DA6"
-).pack(side=tk.LEFT, padx=10)
-
-link = tk.Label(
-    footer, 
-    text="GitHub", 
-    font=("Segoe UI", 9, "underline"),
-    fg="white", 
-    bg="#003DA6", 
-    cursor="hand2"
-)
-link.pack(side=tk.RIGHT, padx=(0, 10))
-link.bind("<Button-1>", lambda e: webbrowser.open_new("https://github.com/miguelramosalarcon"))
-
-ventana.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    # Necesario con ProcessPoolExecutor: en Windows/PyInstaller cada proceso del lote
+    # vuelve a importar este script y, sin esta guarda, abriría otra ventana
+    multiprocessing.freeze_support()
+
+    # ==== Interfaz principal ====
+    ventana = tk.Tk()
+    ventana.title("Conversor de Imágenes WebP/AVIF - Miguel Ramos A. (MRStudio)")
+    ventana.configure(bg="#003DA6")
+    centrar_ventana(ventana, 680, 700)
+    ventana.resizable(False, False)
+
+    fuente = ("Segoe UI", 11)
+    fuente_boton = ("Segoe UI", 10, "bold")
+    fuente_small = ("Segoe UI", 9)
+
+    # ==== Título ====
+    tk.Label(
+        ventana, 
+        text="🖼️ Conversor de Imágenes a Formatos Web Modernos",
+        font=("Segoe UI", 12, "bold"), 
+        bg="#003DA6", 
+        fg="white"
+    ).pack(pady=(15, 5))
+
+    # ==== Selección de archivo ====
+    tk.Label(
+        ventana, 
+        text="📁 Seleccione una imagen o una carpeta para convertir:",
+        font=fuente, 
+        bg="#003DA6", 
+        fg="white"
+    ).pack(pady=(15, 5))
+
+    frame_input = tk.Frame(ventana, bg="#003DA6")
+    frame_input.pack()
+
+    entry_archivo = tk.Entry(frame_input, width=44, font=fuente, bd=2, relief="solid")
+    entry_archivo.pack(side=tk.LEFT, padx=(0, 5))
+
+    tk.Button(
+        frame_input, 
+        text="Buscar", 
+        command=seleccionar_imagen, 
+        bg="white", 
+        fg="#003DA6",
+        font=fuente_small,
+        cursor="hand2",
+        relief="flat",
+        padx=15
+    ).pack(side=tk.LEFT)
+
+    tk.Button(
+        frame_input, 
+        text="Carpeta", 
+        command=seleccionar_carpeta, 
+        bg="white", 
+        fg="#003DA6",
+        font=fuente_small,
+        cursor="hand2",
+        relief="flat",
+        padx=10
+    ).pack(side=tk.LEFT, padx=(5, 0))
+
+    tk.Label(
+        ventana, 
+        text="🗂️ También acepta patrones como catalogo/**/*.jpg (lote en paralelo, un proceso por núcleo)",
+        font=("Segoe UI", 8), 
+        fg="white", 
+        bg="#003DA6"
+    ).pack(pady=(5, 0))
+
+    # Label info archivo
+    label_info_archivo = tk.Label(
+        ventana, 
+        text="", 
+        font=fuente_small, 
+        fg="#F5B83A", 
+        bg="#003DA6"
+    )
+    label_info_archivo.pack(pady=(5, 0))
+
+    # ==== Formato de salida ====
+    tk.Label(
+        ventana, 
+        text="🎯 Seleccione el formato de salida:",
+        font=fuente, 
+        bg="#003DA6", 
+        fg="white"
+    ).pack(pady=(15, 5))
+
+    combo_formato = ttk.Combobox(
+        ventana,
+        values=list(FORMATOS),
+        state="readonly",
+        font=fuente,
+        width=20
+    )
+    combo_formato.set("WEBP")
+    combo_formato.pack()
+
+    # Descripción de formatos
+    frame_info = tk.Frame(ventana, bg="#003DA6")
+    frame_info.pack(pady=(5, 0))
+
+    info_text = "💡 WebP: Mejor compatibilidad | AVIF: Mayor compresión | PNG: Sin pérdida"
+    tk.Label(
+        frame_info, 
+        text=info_text,
+        font=("Segoe UI", 8), 
+        fg="white", 
+        bg="#003DA6"
+    ).pack()
+
+    # ==== Control de calidad ====
+    tk.Label(
+        ventana, 
+        text="⚙️ Ajuste la calidad de conversión:",
+        font=fuente, 
+        bg="#003DA6", 
+        fg="white"
+    ).pack(pady=(15, 5))
+
+    frame_calidad = tk.Frame(ventana, bg="#003DA6")
+    frame_calidad.pack()
+
+    slider_calidad = tk.Scale(
+        frame_calidad,
+        from_=60,
+        to=100,
+        orient=tk.HORIZONTAL,
+        length=300,
+        bg="#003DA6",
+        fg="white",
+        highlightthickness=0,
+        troughcolor="#4A90E2",
+        command=actualizar_label_calidad
+    )
+    slider_calidad.set(85)
+    slider_calidad.pack(side=tk.LEFT, padx=(0, 10))
+
+    label_calidad_valor = tk.Label(
+        frame_calidad,
+        text="85%",
+        font=("Segoe UI", 11, "bold"),
+        fg="#F5B83A",
+        bg="#003DA6",
+        width=5
+    )
+    label_calidad_valor.pack(side=tk.LEFT)
+
+    tk.Label(
+        ventana, 
+        text="🛈 Calidad recomendada: 80-90% (balance entre peso y calidad visual)",
+        font=("Segoe UI", 8), 
+        fg="white", 
+        bg="#003DA6"
+    ).pack(pady=(5, 5))
+
+    # ==== Calidad automática ====
+    var_auto = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        ventana,
+        text=(f"🎯 Calidad automática: la más baja que mantiene SSIM ≥ {SSIM_OBJETIVO} en cada imagen"
+              if numpy_disponible() else "🎯 Calidad automática (requiere NumPy: pip install numpy)"),
+        variable=var_auto,
+        command=alternar_calidad_auto,
+        state=tk.NORMAL if numpy_disponible() else tk.DISABLED,
+        font=("Segoe UI", 9),
+        fg="white",
+        bg="#003DA6",
+        selectcolor="#003DA6",
+        activebackground="#003DA6",
+        activeforeground="white"
+    ).pack()
+
+    # ==== Set responsive ====
+    var_responsive = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        ventana,
+        text=(f"📐 Set responsive: {'/'.join(map(str, ANCHOS_POR_DEFECTO))} px en "
+              f"{' + '.join(FORMATOS_RESPONSIVE)} con fragmento <picture>"),
+        variable=var_responsive,
+        font=("Segoe UI", 9),
+        fg="white",
+        bg="#003DA6",
+        selectcolor="#003DA6",
+        activebackground="#003DA6",
+        activeforeground="white"
+    ).pack()
+
+    # ==== Modo incremental ====
+    var_incremental = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        ventana,
+        text="⏭ Lotes: convertir solo imágenes nuevas o modificadas y borrar salidas huérfanas",
+        variable=var_incremental,
+        font=("Segoe UI", 9),
+        fg="white",
+        bg="#003DA6",
+        selectcolor="#003DA6",
+        activebackground="#003DA6",
+        activeforeground="white"
+    ).pack()
+
+    # ==== Imágenes enormes ====
+    var_enormes = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        ventana,
+        text=f"🐘 Imágenes enormes (escaneos, panorámicas): máx. {MEMORIA_POR_DEFECTO_MB} MB de memoria por imagen",
+        variable=var_enormes,
+        font=("Segoe UI", 9),
+        fg="white",
+        bg="#003DA6",
+        selectcolor="#003DA6",
+        activebackground="#003DA6",
+        activeforeground="white"
+    ).pack()
+
+    # ==== Botón convertir ====
+    btn_convertir = tk.Button(
+        ventana, 
+        text="🔄 Convertir Imagen",
+        font=fuente_boton, 
+        bg="#4A90E2", 
+        fg="white",
+        activebackground="#3c78c9", 
+        relief="flat",
+        cursor="hand2", 
+        command=iniciar_conversion,
+        padx=30,
+        pady=10
+    )
+    btn_convertir.pack(pady=(10, 10))
+
+    # ==== Label de estado ====
+    label_estado = tk.Label(
+        ventana, 
+        text="", 
+        font=("Segoe UI", 9), 
+        fg="white", 
+        bg="#003DA6",
+        justify=tk.LEFT
+    )
+    label_estado.pack(pady=(5, 10))
+
+    # ==== Footer ====
+    footer = tk.Frame(ventana, bg="#003DA6")
+    footer.pack(fill="x", side=tk.BOTTOM, pady=(10, 5))
+
+    tk.Label(
+        footer, 
+        text="Dev. Miguel Ramos Alarcón - MRStudio",
+        font=("Segoe UI", 9), 
+        fg="#F5B83A", 
+        bg="#003DA6"
+    ).pack(side=tk.LEFT, padx=10)
+
+    link = tk.Label(
+        footer, 
+        text="GitHub", 
+        font=("Segoe UI", 9, "underline"),
+        fg="white", 
+        bg="#003DA6", 
+        cursor="hand2"
+    )
+    link.pack(side=tk.RIGHT, padx=(0, 10))
+    link.bind("<Button-1>", lambda e: webbrowser.open_new("https://github.com/miguelramosalarcon"))
+
+    ventana.mainloop()
@@ -0,0 +1,119 @@
+# ================================================================
+# 🧾 MANIFIESTO DE CONVERSIÓN INCREMENTAL
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Registra en la carpeta de salida qué imagen de origen
+#              generó qué archivos y con qué ajustes, para que al volver a
+#              ejecutar el lote solo se conviertan las imágenes nuevas o
+#              modificadas. Tamaño + fecha de modificación sirven de vía
+#              rápida; si no coinciden, el hash del contenido confirma si
+#              la imagen cambió de verdad (p. ej. un checkout de git que
+#              solo tocó la fecha). Las salidas cuya imagen de origen ya
+#              no existe se eliminan, solo dentro de la carpeta de origen
+#              del lote actual (otra carpeta puede compartir la salida).
+# Licencia: MIT
+# ================================================================
+
+import json
+import os
+
+from calidad_imagenes import hash_archivo
+
+# ==== Configuración por defecto ====
+ARCHIVO_MANIFIESTO = ".manifiesto-conversion.json"
+VERSION_MANIFIESTO = 1
+
+# Estados de cada imagen frente al manifiesto
+NUEVA = "nueva"
+MODIFICADA = "modificada"
+SIN_CAMBIOS = "sin cambios"
+
+
+class ManifiestoConversion:
+    """Origen → salidas + ajustes + huella (tamaño, mtime, hash) de cada imagen ya convertida"""
+
+    def __init__(self, carpeta_salida):
+        self.ruta = os.path.join(carpeta_salida, ARCHIVO_MANIFIESTO)
+        self.entradas = self._leer()
+        self.hashes_confirmados = 0
+
+    def _leer(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return datos.get("entradas", {}) if datos.get("version") == VERSION_MANIFIESTO else {}
+
+    @staticmethod
+    def _clave(archivo):
+        return os.path.normcase(os.path.abspath(archivo))
+
+    def estado(self, archivo, ajustes):
+        """NUEVA, MODIFICADA o SIN_CAMBIOS; solo calcula el hash si tamaño o fecha no coinciden"""
+        entrada = self.entradas.get(self._clave(archivo))
+        if entrada is None:
+            return NUEVA
+        if entrada["ajustes"] != ajustes or not all(os.path.exists(salida) for salida in entrada["salidas"]):
+            return MODIFICADA
+        info = os.stat(archivo)
+        if info.st_size == entrada["tamaño"] and info.st_mtime_ns == entrada["mtime_ns"]:
+            return SIN_CAMBIOS
+        if info.st_size != entrada["tamaño"]:
+            return MODIFICADA
+        self.hashes_confirmados += 1
+        if hash_archivo(archivo) != entrada["hash"]:
+            return MODIFICADA
+        entrada["mtime_ns"] = info.st_mtime_ns  # mismo contenido con otra fecha: la próxima vez basta la vía rápida
+        return SIN_CAMBIOS
+
+    def registrar(self, archivo, ajustes, salidas):
+        """Guarda la entrada de una imagen recién convertida y borra las salidas anteriores que ya no se generan"""
+        clave = self._clave(archivo)
+        salidas = [os.path.abspath(salida) for salida in salidas]
+        anterior = self.entradas.get(clave)
+        if anterior:
+            self._borrar(set(anterior["salidas"]) - set(salidas))
+        info = os.stat(archivo)
+        self.entradas[clave] = {"tamaño": info.st_size, "mtime_ns": info.st_mtime_ns, "hash": hash_archivo(archivo),
+                                "ajustes": ajustes, "salidas": salidas}
+
+    def podar(self, raiz):
+        """Elimina las salidas de imágenes de origen bajo `raiz` que ya no existen y retorna las rutas borradas
+
+        Las entradas de otras carpetas de origen que comparten la salida no se tocan: que no se
+        encuentren puede significar solo que su disco no está montado.
+        """
+        raiz = self._clave(raiz)
+        huerfanas = [clave for clave in self.entradas if self._dentro_de(clave, raiz) and not os.path.exists(clave)]
+        borradas = []
+        for clave in huerfanas:
+            borradas += self._borrar(self.entradas.pop(clave)["salidas"])
+        return borradas
+
+    @staticmethod
+    def _dentro_de(clave, raiz):
+        try:
+            return os.path.commonpath([clave, raiz]) == raiz
+        except ValueError:
+            return False  # otra unidad en Windows
+
+    @staticmethod
+    def _borrar(salidas):
+        borradas = []
+        for salida in salidas:
+            try:
+                os.remove(salida)
+                borradas.append(salida)
+            except FileNotFoundError:
+                pass
+        return borradas
+
+    def guardar(self):
+        """Escribe el manifiesto de forma atómica (un corte a mitad no deja un JSON roto)"""
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        temporal = f"{self.ruta}.tmp-{os.getpid()}"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION_MANIFIESTO, "entradas": self.entradas}, f, ensure_ascii=False)
+        os.replace(temporal, self.ruta)
@@ -0,0 +1,264 @@
+# ================================================================
+# 🐘 CONVERSIÓN DE IMÁGENES ENORMES CON MEMORIA ACOTADA
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Escaneos TIFF y panorámicas de cientos de megapíxeles pueden
+#              ocupar varios GB al decodificarse y tumbar el pool de procesos.
+#              Aquí cada imagen trabaja con un presupuesto de memoria:
+#              - JPEG se decodifica ya reducido con draft() (1/2, 1/4, 1/8)
+#              - El resto se decodifica solo si cabe en el presupuesto y se
+#                reduce enseguida, liberando el original
+#              - El reescalado y el paso RGBA → RGB (fondo blanco para JPG)
+#                se hacen por franjas, sin copias del tamaño completo
+#              - Se mide el pico de memoria (RSS) de cada archivo
+#
+# Pillow guarda RGB, RGBA y CMYK con 4 bytes por píxel: una foto de
+# 100 megapíxeles ocupa 400 MB decodificada, aunque el archivo pese 30 MB.
+# Licencia: MIT
+# ================================================================
+
+import contextlib
+import math
+import os
+import re
+import sys
+
+from PIL import Image
+
+# ==== Configuración por defecto ====
+MEMORIA_POR_DEFECTO_MB = 1024
+FRANJA_FILAS = 512
+# Parte del presupuesto que se reserva a los búferes del decodificador/codificador y al intérprete
+MARGEN_PRESUPUESTO = 0.15
+# Lado máximo que admite cada codificador (WebP no pasa de 16383 px)
+LADO_MAXIMO_FORMATO = {"WEBP": 16383, "JPG": 65535, "JPEG": 65535, "PNG": 2 ** 31 - 1, "AVIF": 65536}
+# Memoria de trabajo de cada codificador en bytes por píxel, con las opciones de guardar_imagen
+# (medida con Pillow 12; WebP method=6 y AVIF son los que más piden)
+COSTE_CODIFICADOR = {"JPG": 4, "JPEG": 4, "WEBP": 19, "AVIF": 28, "PNG": 5}
+# Extra cuando la salida conserva transparencia (el plano alfa de WebP se codifica aparte)
+COSTE_ALFA = {"WEBP": 20}
+# Copias de cada franja al reescalar: recorte, premultiplicada (RGBA) y paso intermedio
+COPIAS_POR_FRANJA = 3
+# Calidad automática: cada candidata se decodifica al tamaño de salida para medir el SSIM
+# (JPEG no: draft() la decodifica ya reducida y en gris). Con alfa se suma la copia de la referencia.
+COSTE_METRICA = {"WEBP": 16, "AVIF": 8}
+COSTE_METRICA_ALFA = 8
+BYTES_POR_MODO = {"1": 1, "L": 1, "P": 1, "LA": 4, "PA": 4, "I;16": 2, "I": 4, "F": 4}
+
+
+# ==== Medición de memoria ====
+def reiniciar_pico_memoria():
+    """Pone a cero el pico de RSS del proceso (solo Linux); retorna False si no es posible"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def pico_memoria():
+    """Pico de RSS del proceso en bytes, o None si el sistema no lo expone"""
+    try:
+        with open("/proc/self/status") as f:
+            return int(re.search(r"VmHWM:\s+(\d+) kB", f.read()).group(1)) * 1024
+    except (OSError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class CONTADORES_MEMORIA(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        contadores = CONTADORES_MEMORIA()
+        contadores.cb = ctypes.sizeof(contadores)
+        proceso = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.kernel32.K32GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+            return contadores.PeakWorkingSetSize
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024  # macOS informa bytes; el resto, KB
+
+
+def memoria_total():
+    """Memoria física del equipo en bytes, o None si no se puede consultar"""
+    if sys.platform == "win32":
+        import ctypes
+
+        class ESTADO_MEMORIA(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        estado = ESTADO_MEMORIA()
+        estado.dwLength = ctypes.sizeof(estado)
+        return estado.ullTotalPhys if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(estado)) else None
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def workers_para_memoria(memoria_mb, workers=None):
+    """Procesos que caben a la vez con `memoria_mb` cada uno, dejando un cuarto de la RAM al sistema"""
+    workers = workers or os.cpu_count() or 1
+    total = memoria_total()
+    if not total:
+        return workers
+    return max(1, min(workers, int(total * 0.75) // (memoria_mb * 1024 * 1024)))
+
+
+# ==== Decodificación acotada ====
+def bytes_por_pixel(modo):
+    return BYTES_POR_MODO.get(modo, 4)
+
+
+def tamaño_objetivo(tamaño, pixeles_maximos, lado_maximo=None):
+    """Tamaño más grande (sin agrandar) con a lo sumo `pixeles_maximos` y lado mayor ≤ `lado_maximo`"""
+    ancho, alto = tamaño
+    escala = min(1.0, math.sqrt(pixeles_maximos / (ancho * alto)))
+    if lado_maximo:
+        escala = min(escala, lado_maximo / max(ancho, alto))
+    return max(1, int(ancho * escala)), max(1, int(alto * escala))
+
+
+@contextlib.contextmanager
+def sin_limite_de_pixeles():
+    """El presupuesto reemplaza la protección de Pillow contra "bombas de descompresión" (~89 MP)"""
+    anterior = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        yield
+    finally:
+        Image.MAX_IMAGE_PIXELS = anterior
+
+
+def redimensionar_por_franjas(img, tamaño, filas=FRANJA_FILAS):
+    """resize() LANCZOS franja a franja, sin las copias completas que hace Pillow
+
+    Pillow premultiplica RGBA en una copia del tamaño completo antes de reescalar y guarda un
+    paso intermedio de ancho final × alto original. Aquí cada franja de salida se calcula desde
+    un recorte del origen con margen para el núcleo de LANCZOS; `box` ubica la franja dentro del
+    recorte, así el resultado coincide con un solo resize() (salvo redondeos) y no quedan
+    costuras. `filas` cuenta filas del origen: la memoria por franja no depende de cuánto se reduce.
+    """
+    escala = img.height / tamaño[1]
+    margen = math.ceil(3 * max(escala, 1)) + 1  # LANCZOS mira 3 píxeles (escalados) a cada lado
+    filas_salida = max(1, int(filas / escala))
+    resultado = Image.new(img.mode, tamaño)
+    for arriba in range(0, tamaño[1], filas_salida):
+        abajo = min(tamaño[1], arriba + filas_salida)
+        origen_arriba, origen_abajo = arriba * escala, abajo * escala
+        corte_arriba = max(0, math.floor(origen_arriba) - margen)
+        corte_abajo = min(img.height, math.ceil(origen_abajo) + margen)
+        franja = img.crop((0, corte_arriba, img.width, corte_abajo))
+        caja = (0, origen_arriba - corte_arriba, img.width, origen_abajo - corte_arriba)
+        resultado.paste(franja.resize((tamaño[0], abajo - arriba), Image.LANCZOS, box=caja), (0, arriba))
+    return resultado
+
+
+def aplanar_por_franjas(img, color=(255, 255, 255), filas=FRANJA_FILAS):
+    """RGBA/LA/P → RGB sobre `color` franja a franja: nunca existe una copia RGBA ni una máscara completa"""
+    resultado = Image.new("RGB", img.size, color)
+    for arriba in range(0, img.height, filas):
+        caja = (0, arriba, img.width, min(img.height, arriba + filas))
+        franja = img.crop(caja).convert("RGBA")
+        resultado.paste(franja, caja, franja)
+    return resultado
+
+
+def plan_decodificacion(img, formato, presupuesto, lado_maximo=None, calidad_automatica=False):
+    """Elige la escala de decodificación (1, 1/2, 1/4, 1/8 en JPEG; 1 en el resto) y el tamaño final
+
+    Cuenta la imagen decodificada, las franjas del reescalado y, por cada píxel de salida, la
+    imagen de salida, la copia RGB/RGBA cuando hace falta, la memoria de trabajo del codificador
+    y, con `calidad_automatica`, la decodificación de cada candidata para medir el SSIM. Se queda
+    con la salida más grande que cabe en `presupuesto`; a igual salida, la escala de
+    decodificación menor.
+    Retorna (tamaño_decodificado, tamaño_final) o None si ni siquiera así cabe.
+    """
+    copia = 4 if img.mode in ("P", "PA") or (formato in ("JPG", "JPEG") and img.mode in ("RGBA", "LA")) else 0
+    alfa = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+    por_pixel_salida = 4 + copia + COSTE_CODIFICADOR.get(formato, 4) + (COSTE_ALFA.get(formato, 0) if alfa else 0)
+    if calidad_automatica:
+        por_pixel_salida += COSTE_METRICA.get(formato, 0)
+        if alfa and formato not in ("JPG", "JPEG"):
+            por_pixel_salida += COSTE_METRICA_ALFA
+    limite_lado = min(lado_maximo or math.inf, LADO_MAXIMO_FORMATO.get(formato, 65535))
+    mejor = None
+    for escala in ((1, 2, 4, 8) if img.format == "JPEG" else (1,)):
+        decodificada = (math.ceil(img.width / escala), math.ceil(img.height / escala))
+        libre = presupuesto - decodificada[0] * decodificada[1] * bytes_por_pixel(img.mode)
+        if libre < por_pixel_salida:
+            continue
+        final = tamaño_objetivo(decodificada, libre / por_pixel_salida, limite_lado)
+        if final != decodificada:
+            # Franja de FRANJA_FILAS filas del origen más el margen de LANCZOS a cada lado
+            filas_origen = min(decodificada[1], 2 * FRANJA_FILAS)
+            libre -= decodificada[0] * filas_origen * 4 * COPIAS_POR_FRANJA
+            if libre < por_pixel_salida:
+                continue
+            final = tamaño_objetivo(decodificada, libre / por_pixel_salida, limite_lado)
+        if mejor is None or final[0] * final[1] >= mejor[1][0] * mejor[1][1]:
+            mejor = (decodificada, final)
+    return mejor
+
+
+def abrir_acotada(img, formato, memoria_mb=MEMORIA_POR_DEFECTO_MB, lado_maximo=None, calidad_automatica=False):
+    """Decodifica `img` (recién abierta, sin cargar) sin pasar de `memoria_mb` y la deja lista para `formato`
+
+    Retorna la imagen cargada, reducida si hacía falta y en RGB si el formato no admite
+    transparencia. Lanza MemoryError si la imagen no cabe en el presupuesto ni reduciéndola al
+    decodificar (mejor un error en ese archivo que un proceso del pool caído).
+    """
+    formato = formato.upper()
+    util = int(memoria_mb * 1024 * 1024 * (1 - MARGEN_PRESUPUESTO))
+    plan = plan_decodificacion(img, formato, util, lado_maximo, calidad_automatica)
+    if plan is None:
+        necesarios = img.width * img.height * bytes_por_pixel(img.mode)
+        motivo = ("ni reduciendo al decodificar" if img.format == "JPEG"
+                  else f"{img.format} no permite reducir al decodificar")
+        raise MemoryError(f"Decodificar {img.width}x{img.height} px necesita ~{necesarios / (1024 * 1024):.0f} MB "
+                          f"y del presupuesto de {memoria_mb} MB quedan {util / (1024 * 1024):.0f} MB para la imagen "
+                          f"({motivo})")
+    decodificada, objetivo = plan
+    if decodificada != img.size:
+        img.draft(img.mode if img.mode in ("L", "RGB") else None, decodificada)
+    img.load()
+    original = img
+
+    if img.mode in ("P", "PA"):
+        transparente = img.mode == "PA" or "transparency" in img.info
+        img = img.convert("RGBA" if transparente else "RGB")
+
+    if img.size != objetivo:
+        factor = min(img.width // objetivo[0], img.height // objetivo[1])
+        # reduce() solo asigna la salida, salvo con alfa (también premultiplica una copia completa)
+        if factor >= 2 and img.mode not in ("RGBA", "LA"):
+            try:
+                img = img.reduce(factor)
+            except ValueError:
+                pass  # modos sin reduce() (p. ej. TIFF de 16 bits): todo el tramo se hace por franjas
+        if img.size != objetivo:
+            img = redimensionar_por_franjas(img, objetivo)
+
+    if formato in ("JPG", "JPEG") and img.mode in ("RGBA", "LA"):
+        img = aplanar_por_franjas(img)
+    elif formato in ("JPG", "JPEG") and img.mode not in ("RGB", "L", "CMYK"):
+        img = img.convert("RGB")
+    if img is not original:
+        # Quien llamó sigue teniendo la imagen abierta: close() libera ya el decodificado completo
+        original.close()
+    return img
@@ -0,0 +1,622 @@
+# ================================================================
+# ⚙️ MOTOR DE CONVERSIÓN DE IMÁGENES (SIN INTERFAZ GRÁFICA)
+# ------------------------------------------------
+# Desarrollado por: Miguel Ramos Alarcón
+# 💻 GitHub: https://github.com/miguelramosalarcon
+# Descripción: Conversión a WebP/AVIF/PNG/JPG con Pillow, reutilizable
+#              desde la app de escritorio, scripts o servidores sin
+#              pantalla. El modo lote reparte las imágenes entre procesos
+#              (uno por núcleo): los codificadores WebP method=6 y AVIF
+#              retienen el GIL, así que con hilos solo se usaría un núcleo.
+#
+# Uso desde consola (dentro de la carpeta conversor-imagenes):
+#   python -m motor_imagenes foto.jpg
+#   python -m motor_imagenes catalogo/ --formato AVIF --calidad 80
+#   python -m motor_imagenes "productos/**/*.png" --workers 8 --json
+#   python -m motor_imagenes catalogo/ --responsive --anchos 320,640,1024,1920
+#   python -m motor_imagenes catalogo/ --formato AVIF --auto --ssim 0.98
+#   python -m motor_imagenes assets/ --incremental   (solo nuevas o modificadas)
+#   python -m motor_imagenes escaneos/ --memoria 1024 (imágenes enormes)
+#
+# Licencia: MIT
+# ================================================================
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from html import escape
+
+from PIL import Image
+
+from calidad_imagenes import (SSIM_OBJETIVO, CALIDAD_MINIMA, CALIDAD_MAXIMA, CacheCalidad, buscar_calidad,
+                              numpy_disponible)
+from manifiesto_imagenes import ARCHIVO_MANIFIESTO, SIN_CAMBIOS, ManifiestoConversion
+from memoria_imagenes import (MEMORIA_POR_DEFECTO_MB, abrir_acotada, pico_memoria, reiniciar_pico_memoria,
+                              sin_limite_de_pixeles, workers_para_memoria)
+
+try:
+    import pillow_avif  # noqa: F401  (registra AVIF en versiones de Pillow sin soporte propio)
+except ImportError:
+    pass
+
+# ==== Configuración general ====
+OUTPUT_DIR = "imagenes-convertidas"
+FORMATOS = ("WEBP", "AVIF", "PNG", "JPG")
+FORMATO_POR_DEFECTO = "WEBP"
+CALIDAD_POR_DEFECTO = 85
+GUARDAR_MANIFIESTO_CADA = 100  # imágenes convertidas entre escrituras del manifiesto en modo incremental
+EXTENSIONES_VALIDAS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif', '.webp')
+
+# Set responsive: anchos del srcset y formatos, del más moderno al más compatible
+ANCHOS_POR_DEFECTO = (320, 640, 1024, 1920)
+FORMATOS_RESPONSIVE = ("AVIF", "WEBP")
+SIZES_POR_DEFECTO = "100vw"
+TIPOS_MIME = {"AVIF": "image/avif", "WEBP": "image/webp", "PNG": "image/png", "JPG": "image/jpeg"}
+
+
+@dataclass
+class ResultadoImagen:
+    """Resultado de convertir una imagen"""
+    archivo: str
+    archivo_salida: str
+    tamaño_original: int
+    tamaño_final: int
+    segundos: float
+    calidad: int = None
+    ssim: float = None  # solo en calidad automática
+    intentos: int = 1
+    desde_cache: bool = False
+    pico_memoria: int = None  # bytes; solo con presupuesto de memoria
+    escalada: str = None  # "20000x15000 → 6000x4500" si hubo que reducirla para respetar el presupuesto
+
+    @property
+    def bytes_ahorrados(self):
+        return self.tamaño_original - self.tamaño_final
+
+    @property
+    def reduccion(self):
+        return 100.0 * self.bytes_ahorrados / self.tamaño_original if self.tamaño_original else 0.0
+
+    @property
+    def salidas(self):
+        return [self.archivo_salida]
+
+    @property
+    def detalle(self):
+        texto = f"{self.tamaño_original / 1024:.0f} KB → {self.tamaño_final / 1024:.0f} KB ({self.reduccion:.1f}%)"
+        if self.desde_cache:
+            texto += f" · calidad {self.calidad} (caché)"
+        elif self.ssim is not None:
+            texto += f" · calidad {self.calidad}, SSIM {self.ssim:.3f} en {self.intentos} intentos"
+        if self.escalada:
+            texto += f" · {self.escalada}"
+        if self.pico_memoria:
+            texto += f" · pico {self.pico_memoria / (1024 * 1024):.0f} MB"
+        return texto
+
+
+@dataclass
+class VarianteImagen:
+    """Un ancho en un formato dentro de un set responsive"""
+    ancho: int
+    alto: int
+    formato: str
+    archivo_salida: str
+    tamaño: int
+
+
+@dataclass
+class SetResponsive:
+    """Resultado de generar todas las variantes (ancho × formato) de una imagen"""
+    archivo: str
+    archivo_html: str
+    html: str
+    tamaño_original: int
+    segundos: float
+    variantes: list = field(default_factory=list)
+
+    @property
+    def tamaño_final(self):
+        """Peso de las variantes más grandes (lo que descarga una pantalla ancha), comparable con el original"""
+        mayores = {}
+        for variante in self.variantes:
+            if variante.ancho >= mayores.get(variante.formato, variante).ancho:
+                mayores[variante.formato] = variante
+        return min((v.tamaño for v in mayores.values()), default=0)
+
+    @property
+    def bytes_ahorrados(self):
+        return self.tamaño_original - self.tamaño_final
+
+    @property
+    def salidas(self):
+        return [variante.archivo_salida for variante in self.variantes] + [self.archivo_html]
+
+    @property
+    def detalle(self):
+        anchos = sorted({v.ancho for v in self.variantes})
+        return (f"{len(self.variantes)} variantes de {anchos[0]} a {anchos[-1]} px · "
+                f"{self.tamaño_original / 1024:.0f} KB → {self.tamaño_final / 1024:.0f} KB la mayor")
+
+
+def obtener_tamaño_archivo(ruta):
+    """Retorna el tamaño del archivo en KB o MB"""
+    tamaño = os.path.getsize(ruta)
+    if tamaño < 1024 * 1024:
+        return f"{tamaño / 1024:.1f} KB"
+    return f"{tamaño / (1024 * 1024):.1f} MB"
+
+
+def nombre_salida(archivo, formato, carpeta_salida=OUTPUT_DIR):
+    nombre_base = os.path.splitext(os.path.basename(archivo))[0]
+    return os.path.join(carpeta_salida, f"{nombre_base}_converted.{formato.lower()}")
+
+
+def preparar_imagen(img, formato):
+    """Convierte RGBA a RGB (fondo blanco) si el formato de salida no admite transparencia"""
+    if img.mode in ('RGBA', 'LA', 'P') and formato.lower() in ['jpg', 'jpeg']:
+        fondo = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        fondo.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = fondo
+    return img
+
+
+def guardar_imagen(img, archivo_salida, formato, calidad, hilos=None):
+    """Guarda con la configuración de cada formato; `hilos` limita los hilos del codificador AVIF"""
+    formato = formato.upper()
+    if formato == "WEBP":
+        img.save(archivo_salida, "WEBP", quality=calidad, method=6)
+    elif formato == "AVIF":
+        opciones = {"max_threads": hilos} if hilos else {}
+        img.save(archivo_salida, "AVIF", quality=calidad, **opciones)
+    elif formato == "PNG":
+        img.save(archivo_salida, "PNG", optimize=True)
+    elif formato in ["JPG", "JPEG"]:
+        img.save(archivo_salida, "JPEG", quality=calidad, optimize=True)
+    else:
+        raise ValueError(f"Formato de salida no soportado: {formato}")
+
+
+def elegir_calidad(archivo, img, formato, objetivo_ssim, hilos=None, usar_cache=True, memoria_mb=None,
+                   lado_maximo=None):
+    """Calidad automática: busca la más baja que alcanza `objetivo_ssim` (ver calidad_imagenes)
+
+    Con presupuesto de memoria la imagen puede haberse reducido: la caché distingue esos ajustes
+    para no aplicar a la imagen completa una calidad hallada para una copia más chica.
+    """
+    def codificar(calidad):
+        buffer = io.BytesIO()
+        guardar_imagen(img, buffer, formato, calidad, hilos)
+        return buffer.getvalue()
+
+    cache = CacheCalidad() if usar_cache else None
+    variante = (formato.upper(), objetivo_ssim, CALIDAD_MINIMA, CALIDAD_MAXIMA)
+    if memoria_mb:
+        variante += (memoria_mb, lado_maximo)
+    clave = cache.clave(archivo, *variante) if cache else None
+    busqueda = buscar_calidad(img, codificar, objetivo_ssim, calidad_conocida=cache.obtener(clave) if cache else None)
+    if cache and not busqueda.desde_cache:
+        cache.guardar(clave, busqueda)
+    return busqueda
+
+
+def convertir_imagen(archivo, formato=FORMATO_POR_DEFECTO, calidad=CALIDAD_POR_DEFECTO, carpeta_salida=OUTPUT_DIR,
+                     archivo_salida=None, hilos=None, objetivo_ssim=None, usar_cache=True, memoria_mb=None,
+                     lado_maximo=None):
+    """Convierte una imagen al formato indicado y retorna un ResultadoImagen
+
+    Con `objetivo_ssim` se ignora `calidad` y se usa la más baja que mantiene ese SSIM (PNG no
+    tiene calidad: se guarda igual que siempre). Con `memoria_mb` la imagen se decodifica y
+    prepara sin pasar de ese presupuesto (ver memoria_imagenes) y se informa el pico de memoria.
+    """
+    if not os.path.exists(archivo):
+        raise FileNotFoundError(f"El archivo no existe: {archivo}")
+    archivo_salida = archivo_salida or nombre_salida(archivo, formato, carpeta_salida)
+    os.makedirs(os.path.dirname(archivo_salida) or ".", exist_ok=True)
+
+    inicio = time.perf_counter()
+    ssim, intentos, desde_cache, pico, escalada = None, 1, False, None, None
+    if memoria_mb:
+        reiniciar_pico_memoria()
+    with sin_limite_de_pixeles() if memoria_mb else contextlib.nullcontext(), Image.open(archivo) as img:
+        if memoria_mb:
+            tamaño_origen = img.size
+            img = abrir_acotada(img, formato, memoria_mb, lado_maximo,
+                                calidad_automatica=bool(objetivo_ssim) and formato.upper() != "PNG")
+            if img.size != tamaño_origen:
+                escalada = f"{tamaño_origen[0]}x{tamaño_origen[1]} → {img.width}x{img.height}"
+        else:
+            img = preparar_imagen(img, formato)
+        if objetivo_ssim and formato.upper() != "PNG":
+            busqueda = elegir_calidad(archivo, img, formato, objetivo_ssim, hilos, usar_cache, memoria_mb, lado_maximo)
+            with open(archivo_salida, "wb") as f:
+                f.write(busqueda.datos)
+            calidad, ssim, intentos, desde_cache = (busqueda.calidad, busqueda.ssim, busqueda.intentos,
+                                                    busqueda.desde_cache)
+        else:
+            guardar_imagen(img, archivo_salida, formato, calidad, hilos)
+    if memoria_mb:
+        pico = pico_memoria()
+    return ResultadoImagen(archivo, archivo_salida, os.path.getsize(archivo), os.path.getsize(archivo_salida),
+                           time.perf_counter() - inicio, calidad, ssim, intentos, desde_cache, pico, escalada)
+
+
+# ==== Modo lote (carpeta o patrón glob) ====
+def es_lote(origen):
+    """Indica si el origen es una carpeta o un patrón glob en lugar de una única imagen"""
+    return os.path.isdir(origen) or glob.has_magic(origen)
+
+
+def listar_imagenes(origen):
+    """Retorna las imágenes de una carpeta (recursivo) o las que coinciden con un patrón glob"""
+    patron = os.path.join(origen, "**", "*") if os.path.isdir(origen) else origen
+    return sorted(
+        ruta for ruta in glob.glob(patron, recursive=True)
+        if os.path.isfile(ruta) and ruta.lower().endswith(EXTENSIONES_VALIDAS)
+    )
+
+
+def raiz_de_origen(origen):
+    """Carpeta elegida por el usuario como raíz del lote; None para un patrón glob o una sola imagen"""
+    return os.path.abspath(origen) if os.path.isdir(origen) else None
+
+
+def carpeta_comun(archivos):
+    """Carpeta común de los archivos; en la salida se repiten las subcarpetas a partir de ella"""
+    try:
+        return os.path.commonpath([os.path.dirname(os.path.abspath(archivo)) for archivo in archivos])
+    except ValueError:
+        return None  # unidades distintas en Windows: salida plana
+
+
+def ejecutar_lote(archivos, tarea, workers=None, carpeta_salida=OUTPUT_DIR, al_terminar_archivo=None,
+                  ajustes=None, incremental=False, proceso_por_imagen=False, raiz=None):
+    """Reparte las imágenes en un pool de `workers` procesos y retorna el resumen del lote
+
+    tarea(archivo, carpeta_salida=..., hilos=...) se ejecuta en otro proceso, así que debe ser una
+    función de módulo (o un functools.partial de una). Las subcarpetas de origen se conservan en
+    la salida para que dos "foto.jpg" de carpetas distintas no se pisen. al_terminar_archivo(archivo,
+    estado, detalle, resumen) se llama en el proceso principal al terminar cada imagen.
+
+    Con `incremental` solo se convierten las imágenes nuevas o modificadas (o cuyos `ajustes`
+    cambiaron) según el manifiesto de la carpeta de salida, y se eliminan las salidas cuya imagen
+    de origen ya no existe dentro de la raíz del lote (las de otros orígenes que comparten la
+    salida se conservan).
+
+    `raiz` es la carpeta de origen elegida (ver raiz_de_origen): las subcarpetas de salida y la
+    poda se calculan desde ella, así agregar o borrar imágenes no mueve la estructura. Sin ella
+    (patrón glob o una imagen) se usa la carpeta común de `archivos`.
+
+    Con `proceso_por_imagen` cada imagen usa un proceso nuevo: la memoria de una imagen enorme
+    vuelve al sistema al terminarla y el pico medido corresponde solo a ese archivo.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Un hilo de AVIF por proceso: los procesos ya ocupan todos los núcleos
+    hilos = max(1, (os.cpu_count() or 1) // workers)
+    # Sin carpeta elegida, la raíz sale de todas las imágenes (no solo las pendientes)
+    raiz = os.path.abspath(raiz) if raiz else (carpeta_comun(archivos) if archivos else None)
+
+    def carpeta_de(archivo):
+        relativa = os.path.relpath(os.path.dirname(os.path.abspath(archivo)), raiz) if raiz else "."
+        return os.path.normpath(os.path.join(carpeta_salida, relativa))
+
+    def ajustes_de(archivo):
+        return dict(ajustes or {}, carpeta=os.path.abspath(carpeta_de(archivo)))
+
+    inicio = time.perf_counter()
+    manifiesto = ManifiestoConversion(carpeta_salida) if incremental else None
+    pendientes, eliminadas = archivos, []
+    if manifiesto:
+        eliminadas = manifiesto.podar(raiz) if raiz else []
+        pendientes = [archivo for archivo in archivos if manifiesto.estado(archivo, ajustes_de(archivo)) != SIN_CAMBIOS]
+
+    resumen = {"archivos": len(pendientes), "correctos": 0, "errores": 0, "bytes_originales": 0,
+               "bytes_finales": 0, "resultados": [], "fallidos": {}}
+    if manifiesto:
+        resumen.update(sin_cambios=len(archivos) - len(pendientes), salidas_eliminadas=len(eliminadas),
+                       hashes_confirmados=manifiesto.hashes_confirmados)
+
+    try:
+        if pendientes:
+            opciones = {"max_tasks_per_child": 1} if proceso_por_imagen and sys.version_info >= (3, 11) else {}
+            with ProcessPoolExecutor(max_workers=workers, **opciones) as pool:
+                futuros = {pool.submit(tarea, archivo, carpeta_salida=carpeta_de(archivo), hilos=hilos): archivo
+                           for archivo in pendientes}
+                for futuro in as_completed(futuros):
+                    archivo = futuros[futuro]
+                    try:
+                        resultado = futuro.result()
+                        estado = "ok"
+                        resumen["correctos"] += 1
+                        resumen["bytes_originales"] += resultado.tamaño_original
+                        resumen["bytes_finales"] += resultado.tamaño_final
+                        resumen["resultados"].append(resultado)
+                        detalle = resultado.detalle
+                        if manifiesto:
+                            manifiesto.registrar(archivo, ajustes_de(archivo), resultado.salidas)
+                            if resumen["correctos"] % GUARDAR_MANIFIESTO_CADA == 0:
+                                manifiesto.guardar()
+                    except Exception as e:
+                        estado = "error"
+                        resumen["errores"] += 1
+                        resumen["fallidos"][archivo] = detalle = str(e)
+                    if al_terminar_archivo:
+                        al_terminar_archivo(archivo, estado, detalle, resumen)
+    finally:
+        # También al interrumpir: lo ya convertido no se repite en la próxima ejecución
+        if manifiesto:
+            manifiesto.guardar()
+
+    resumen["segundos"] = time.perf_counter() - inicio
+    resumen["imagenes_por_segundo"] = len(pendientes) / resumen["segundos"] if resumen["segundos"] else 0.0
+    resumen["bytes_ahorrados"] = resumen["bytes_originales"] - resumen["bytes_finales"]
+    resumen["workers"] = workers
+    return resumen
+
+
+def convertir_lote(archivos, formato=FORMATO_POR_DEFECTO, calidad=CALIDAD_POR_DEFECTO, workers=None,
+                   carpeta_salida=OUTPUT_DIR, al_terminar_archivo=None, objetivo_ssim=None, usar_cache=True,
+                   incremental=False, memoria_mb=None, lado_maximo=None, raiz=None):
+    """Convierte una lista de imágenes en paralelo (ver ejecutar_lote)
+
+    Con `memoria_mb` se lanzan solo los procesos que caben en la RAM con ese presupuesto cada uno.
+    """
+    tarea = partial(convertir_imagen, formato=formato, calidad=calidad, objetivo_ssim=objetivo_ssim,
+                    usar_cache=usar_cache, memoria_mb=memoria_mb, lado_maximo=lado_maximo)
+    ajustes = {"modo": "conversion", "formato": formato.upper(),
+               "calidad": None if objetivo_ssim else calidad, "ssim": objetivo_ssim}
+    if memoria_mb:
+        ajustes.update(memoria_mb=memoria_mb, lado_maximo=lado_maximo)
+        workers = workers_para_memoria(memoria_mb, workers)
+    return ejecutar_lote(archivos, tarea, workers, carpeta_salida, al_terminar_archivo, ajustes, incremental,
+                         proceso_por_imagen=bool(memoria_mb), raiz=raiz)
+
+
+# ==== Set responsive (srcset / <picture>) ====
+def anchos_validos(anchos, ancho_original):
+    """Anchos a generar sin agrandar: los mayores que el original se reemplazan por el original"""
+    return sorted({min(int(ancho), ancho_original) for ancho in anchos}, reverse=True)
+
+
+def alto_para(ancho, tamaño_original):
+    ancho_original, alto_original = tamaño_original
+    return max(1, round(ancho * alto_original / ancho_original))
+
+
+def abrir_reducida(img, ancho_maximo):
+    """Decodifica una sola vez, ya reducida si el formato lo permite
+
+    En JPEG, draft() pide al decodificador una escala 1/2, 1/4 u 1/8 que siga siendo igual o
+    mayor al ancho máximo pedido: se decodifican hasta 64 veces menos píxeles.
+    """
+    tamaño_original = img.size
+    if img.format == "JPEG":
+        img.draft(None, (ancho_maximo, alto_para(ancho_maximo, tamaño_original)))
+    img.load()
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        # Paletas y CMYK se pasan a un modo que se pueda reescalar con LANCZOS
+        transparente = img.mode == "PA" or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if transparente else "RGB")
+    return img
+
+
+def reducir_a(img, ancho, alto):
+    """reduce() (promedio por bloques, muy barato) hasta ~2x del destino y LANCZOS para el último tramo"""
+    factor = min(img.width // ancho, img.height // alto) // 2
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img if img.size == (ancho, alto) else img.resize((ancho, alto), Image.LANCZOS)
+
+
+def html_picture(variantes, formatos, alt="", sizes=SIZES_POR_DEFECTO, carpeta_html="."):
+    """Fragmento <picture> con un <source> por formato; el <img> usa el último (el más compatible)"""
+    def srcset(formato):
+        return ", ".join(f"{escape(os.path.relpath(v.archivo_salida, carpeta_html).replace(os.sep, '/'))} {v.ancho}w"
+                         for v in sorted(variantes, key=lambda v: v.ancho) if v.formato == formato)
+
+    respaldo = formatos[-1]
+    mayor = max((v for v in variantes if v.formato == respaldo), key=lambda v: v.ancho)
+    lineas = ["<picture>"]
+    lineas += [f'  <source type="{TIPOS_MIME[formato]}" srcset="{srcset(formato)}" sizes="{escape(sizes)}">'
+               for formato in formatos[:-1]]
+    lineas += [f'  <img src="{escape(os.path.relpath(mayor.archivo_salida, carpeta_html).replace(os.sep, "/"))}" '
+               f'srcset="{srcset(respaldo)}" sizes="{escape(sizes)}"',
+               f'       width="{mayor.ancho}" height="{mayor.alto}" alt="{escape(alt)}" loading="lazy" decoding="async">',
+               "</picture>"]
+    return "\n".join(lineas) + "\n"
+
+
+def generar_responsive(archivo, anchos=ANCHOS_POR_DEFECTO, formatos=FORMATOS_RESPONSIVE, calidad=CALIDAD_POR_DEFECTO,
+                       carpeta_salida=OUTPUT_DIR, sizes=SIZES_POR_DEFECTO, hilos=None):
+    """Genera cada ancho × formato de una imagen y su fragmento <picture>; retorna un SetResponsive
+
+    La imagen se decodifica una sola vez y cada ancho se obtiene del anterior (cascada de mayor a
+    menor), así reducir a 320 px parte de la versión de 640 px y no del original.
+    """
+    if not os.path.exists(archivo):
+        raise FileNotFoundError(f"El archivo no existe: {archivo}")
+    formatos = [formato.upper() for formato in formatos]
+    for formato in formatos:
+        if formato not in TIPOS_MIME:
+            raise ValueError(f"Formato de salida no soportado: {formato}")
+    os.makedirs(carpeta_salida, exist_ok=True)
+    nombre_base = os.path.splitext(os.path.basename(archivo))[0]
+
+    inicio = time.perf_counter()
+    variantes = []
+    with Image.open(archivo) as original:
+        tamaño_original = original.size
+        anchos = anchos_validos(anchos, tamaño_original[0])
+        actual = abrir_reducida(original, anchos[0])
+        for ancho in anchos:
+            alto = alto_para(ancho, tamaño_original)
+            actual = reducir_a(actual, ancho, alto)
+            for formato in formatos:
+                salida = os.path.join(carpeta_salida, f"{nombre_base}-{ancho}w.{formato.lower()}")
+                guardar_imagen(preparar_imagen(actual, formato), salida, formato, calidad, hilos)
+                variantes.append(VarianteImagen(ancho, alto, formato, salida, os.path.getsize(salida)))
+
+    archivo_html = os.path.join(carpeta_salida, f"{nombre_base}.html")
+    html = html_picture(variantes, formatos, alt=nombre_base.replace("-", " ").replace("_", " "), sizes=sizes,
+                        carpeta_html=carpeta_salida)
+    with open(archivo_html, "w", encoding="utf-8") as f:
+        f.write(html)
+    return SetResponsive(archivo, archivo_html, html, os.path.getsize(archivo), time.perf_counter() - inicio,
+                         variantes)
+
+
+def generar_responsive_lote(archivos, anchos=ANCHOS_POR_DEFECTO, formatos=FORMATOS_RESPONSIVE,
+                            calidad=CALIDAD_POR_DEFECTO, workers=None, carpeta_salida=OUTPUT_DIR,
+                            sizes=SIZES_POR_DEFECTO, al_terminar_archivo=None, incremental=False, raiz=None):
+    """Genera el set responsive de cada imagen en paralelo (ver ejecutar_lote)"""
+    tarea = partial(generar_responsive, anchos=tuple(anchos), formatos=tuple(formatos), calidad=calidad, sizes=sizes)
+    ajustes = {"modo": "responsive", "anchos": sorted(anchos), "formatos": [f.upper() for f in formatos],
+               "calidad": calidad, "sizes": sizes}
+    return ejecutar_lote(archivos, tarea, workers, carpeta_salida, al_terminar_archivo, ajustes, incremental,
+                         raiz=raiz)
+
+
+# ==== Interfaz de línea de comandos ====
+def lista_anchos(texto):
+    try:
+        anchos = [int(ancho) for ancho in texto.split(",") if ancho.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"anchos inválidos: {texto} (ej. 320,640,1024)")
+    if not anchos or min(anchos) < 1:
+        raise argparse.ArgumentTypeError(f"anchos inválidos: {texto} (ej. 320,640,1024)")
+    return anchos
+
+
+def lista_formatos(texto):
+    formatos = [formato.strip().upper() for formato in texto.split(",") if formato.strip()]
+    desconocidos = [formato for formato in formatos if formato not in FORMATOS]
+    if not formatos or desconocidos:
+        raise argparse.ArgumentTypeError(f"formatos inválidos: {texto} (usa {', '.join(FORMATOS)})")
+    return formatos
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m motor_imagenes",
+        description="Convierte imágenes a WebP/AVIF/PNG/JPG sin abrir la interfaz gráfica."
+    )
+    parser.add_argument("origen", help="imagen, carpeta o patrón glob (entre comillas) a convertir")
+    parser.add_argument("-f", "--formato", type=str.upper, choices=FORMATOS, default=FORMATO_POR_DEFECTO,
+                        help=f"formato de salida (por defecto: {FORMATO_POR_DEFECTO})")
+    parser.add_argument("-c", "--calidad", type=int, default=CALIDAD_POR_DEFECTO,
+                        help=f"calidad 1-100 para WebP/AVIF/JPG (por defecto: {CALIDAD_POR_DEFECTO})")
+    parser.add_argument("-o", "--salida", default=OUTPUT_DIR, help=f"carpeta de salida (por defecto: {OUTPUT_DIR})")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="procesos simultáneos en modo lote (por defecto: núcleos de CPU)")
+    parser.add_argument("-a", "--auto", action="store_true",
+                        help="calidad automática: la más baja que mantiene el SSIM objetivo (requiere NumPy)")
+    parser.add_argument("--ssim", type=float, default=SSIM_OBJETIVO,
+                        help=f"SSIM objetivo de --auto, de 0 a 1 (por defecto: {SSIM_OBJETIVO})")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="con --auto, repite la búsqueda aunque la imagen ya se haya analizado")
+    parser.add_argument("-r", "--responsive", action="store_true",
+                        help="genera un set srcset (cada ancho × formato) y su fragmento <picture>")
+    parser.add_argument("--anchos", type=lista_anchos, default=list(ANCHOS_POR_DEFECTO),
+                        help=f"anchos del set responsive (por defecto: {','.join(map(str, ANCHOS_POR_DEFECTO))})")
+    parser.add_argument("--formatos", type=lista_formatos, default=list(FORMATOS_RESPONSIVE),
+                        help=f"formatos del set responsive, el último es el de respaldo "
+                             f"(por defecto: {','.join(FORMATOS_RESPONSIVE)})")
+    parser.add_argument("--sizes", default=SIZES_POR_DEFECTO,
+                        help=f"atributo sizes del fragmento HTML (por defecto: {SIZES_POR_DEFECTO})")
+    parser.add_argument("-m", "--memoria", type=int, nargs="?", const=MEMORIA_POR_DEFECTO_MB, default=None,
+                        metavar="MB",
+                        help=f"modo imágenes enormes: presupuesto de memoria por imagen "
+                             f"(sin valor: {MEMORIA_POR_DEFECTO_MB} MB); reduce al decodificar si no cabe")
+    parser.add_argument("--lado-max", type=int, default=None, metavar="PX",
+                        help="con --memoria, lado mayor máximo de la salida")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help=f"solo convierte imágenes nuevas o modificadas y borra las salidas huérfanas "
+                             f"(manifiesto {ARCHIVO_MANIFIESTO} en la carpeta de salida)")
+    parser.add_argument("--json", action="store_true", help="imprime el resultado en JSON")
+    return parser
+
+
+def imprimir_resumen(resumen):
+    print(f"Lote: {resumen['correctos']}/{resumen['archivos']} correctas, {resumen['errores']} errores · "
+          f"{resumen['imagenes_por_segundo']:.1f} imágenes/s con {resumen['workers']} procesos · "
+          f"{resumen['bytes_originales'] / (1024 * 1024):.1f} MB → {resumen['bytes_finales'] / (1024 * 1024):.1f} MB "
+          f"({resumen['bytes_ahorrados'] / (1024 * 1024):.1f} MB ahorrados)")
+    if "sin_cambios" in resumen:
+        print(f"Incremental: {resumen['sin_cambios']} sin cambios (omitidas), "
+              f"{resumen['salidas_eliminadas']} salidas huérfanas eliminadas, "
+              f"{resumen['hashes_confirmados']} hashes calculados para confirmar cambios")
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if args.auto and not 0 < args.ssim < 1:
+        parser.error("--ssim debe estar entre 0 y 1")
+    if args.memoria is not None and args.memoria < 64:
+        parser.error("--memoria debe ser de al menos 64 MB")
+    if args.auto and not numpy_disponible():
+        parser.error("--auto necesita NumPy: pip install numpy")
+    objetivo = args.ssim if args.auto else None
+    try:
+        if es_lote(args.origen) or args.incremental:
+            archivos = listar_imagenes(args.origen) if es_lote(args.origen) else [args.origen]
+            if not archivos:
+                print(f"No se encontraron imágenes en: {args.origen}", file=sys.stderr)
+                return 1
+
+            def al_terminar_archivo(archivo, estado, detalle, resumen):
+                if not args.json:
+                    procesados = resumen["correctos"] + resumen["errores"]
+                    print(f"[{procesados}/{resumen['archivos']}] {estado:5} {archivo} ({detalle})")
+
+            if args.responsive:
+                resumen = generar_responsive_lote(archivos, args.anchos, args.formatos, args.calidad, args.workers,
+                                                  args.salida, args.sizes, al_terminar_archivo, args.incremental,
+                                                  raiz_de_origen(args.origen))
+            else:
+                resumen = convertir_lote(archivos, args.formato, args.calidad, args.workers, args.salida,
+                                         al_terminar_archivo, objetivo, not args.sin_cache, args.incremental,
+                                         args.memoria, args.lado_max, raiz_de_origen(args.origen))
+            if args.json:
+                resumen["resultados"] = [asdict(r) for r in resumen["resultados"]]
+                print(json.dumps(resumen, ensure_ascii=False, indent=2))
+            else:
+                imprimir_resumen(resumen)
+            return 1 if resumen["errores"] else 0
+
+        if args.responsive:
+            conjunto = generar_responsive(args.origen, args.anchos, args.formatos, args.calidad, args.salida, args.sizes)
+            if args.json:
+                print(json.dumps(asdict(conjunto), ensure_ascii=False, indent=2))
+            else:
+                print(f"{conjunto.archivo_html}: {conjunto.detalle} en {conjunto.segundos:.2f} s\n")
+                print(conjunto.html, end="")
+            return 0
+
+        resultado = convertir_imagen(args.origen, args.formato, args.calidad, args.salida, objetivo_ssim=objetivo,
+                                     usar_cache=not args.sin_cache, memoria_mb=args.memoria, lado_maximo=args.lado_max)
+        if args.json:
+            print(json.dumps(asdict(resultado), ensure_ascii=False, indent=2))
+        else:
+            print(f"{resultado.archivo_salida}: {resultado.detalle} en {resultado.segundos:.2f} s")
+        return 0
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 2
+    except (OSError, ValueError, MemoryError) as e:
+        print(f"No se pudo convertir: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())